@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for result formatting.
+
+Times the original per-value format_result() logic against
+task2.format_result() and calc_format.format_many() on the same random
+results, and checks that all of them produce identical text. Exits with
+status 1 if the bulk formatter is slower than the original, so it can be
+run as a regression guard:
+
+    python benchmarks/bench_format.py -n 500000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calc_format import format_many  # noqa: E402
+from task2 import format_result  # noqa: E402
+
+
+def original_format_result(result):
+    """format_result() as it was before calc_format existed (finite values only)."""
+    if result == int(result):
+        return str(int(result))
+    else:
+        return f"{result:.6f}".rstrip('0').rstrip('.')
+
+
+def make_results(n, seed=1):
+    rng = random.Random(seed)
+    values = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.3:
+            values.append(float(rng.randint(-10 ** 6, 10 ** 6)))
+        elif kind < 0.6:
+            values.append(rng.randint(-10 ** 6, 10 ** 6) / 100)
+        else:
+            values.append(rng.uniform(-1e6, 1e6))
+    return values
+
+
+def best_times(repeat, candidates):
+    """Best wall time of each candidate; runs are interleaved so noise hits all alike."""
+    best = dict.fromkeys(candidates, float('inf'))
+    for _ in range(repeat):
+        for name, func in candidates.items():
+            start = time.perf_counter()
+            func()
+            best[name] = min(best[name], time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark result formatting.")
+    parser.add_argument("-n", type=int, default=200000, help="results per run")
+    parser.add_argument("--repeat", type=int, default=7, help="runs per formatter (best is kept)")
+    args = parser.parse_args(argv)
+
+    values = make_results(args.n)
+    expected = [original_format_result(v) for v in values]
+    if [format_result(v) for v in values] != expected or format_many(values) != expected:
+        print("FAIL: formatters disagree with the original output")
+        return 1
+
+    timings = best_times(args.repeat, {
+        'original': lambda: [original_format_result(v) for v in values],
+        'format_result': lambda: [format_result(v) for v in values],
+        'format_many': lambda: format_many(values),
+        'format_many shortest': lambda: format_many(values, shortest=True),
+    })
+    for name, seconds in timings.items():
+        print(f"{name:<22}{args.n / seconds:>14,.0f} values/s")
+
+    if timings['format_many'] > timings['original']:
+        print("FAIL: format_many is slower than the original format_result")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Memory used per task by the To-Do list's task records.
+
+Writes a tasks.json of each size, then measures with tracemalloc what
+stays allocated after reading it two ways: as the plain dicts json.load
+returns (what the app kept before todo_task.Task) and as the Task
+records JournalStore.load() now hands out. Descriptions are counted in
+both, so the difference is the record overhead alone.
+
+    python benchmarks/bench_memory.py --sizes 10000,100000,500000
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from todo_store import JournalStore, atomic_write_json  # noqa: E402
+
+WORDS = ("report", "email", "invoice", "meeting", "review", "deploy", "groceries",
+         "call", "plan", "budget", "draft", "fix", "update", "book", "pay")
+
+
+def make_tasks(n, seed=1):
+    """Tasks as TaskEngine writes them: '%Y-%m-%d' dates over about a year."""
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    tasks = []
+    for i in range(1, n + 1):
+        created = start + timedelta(days=rng.randrange(365))
+        completed = rng.random() < 0.3
+        tasks.append({
+            'id': i,
+            'description': f"{rng.choice(WORDS)} {rng.choice(WORDS)} task {i}",
+            'priority': rng.choice(("High", "Medium", "Low")),
+            'status': "Completed" if completed else "Pending",
+            'created_date': created.isoformat(),
+            'completed_date': (created + timedelta(days=rng.randrange(30))).isoformat()
+            if completed else "",
+        })
+    return tasks
+
+
+def retained(load):
+    """Bytes still allocated by load()'s result once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = load()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def load_dicts(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_records(path):
+    store = JournalStore(path, fsync=False)
+    tasks = store.load()
+    store.close()
+    return tasks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000",
+                        help="comma-separated task counts (default 10000,100000)")
+    args = parser.parse_args(argv)
+
+    print(f"{'tasks':>10}{'dict B/task':>14}{'Task B/task':>14}{'saved':>8}")
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        workdir = tempfile.mkdtemp(prefix="todo-mem-")
+        try:
+            path = os.path.join(workdir, "tasks.json")
+            atomic_write_json(path, make_tasks(size))
+            dicts = retained(lambda: load_dicts(path)) / size
+            records = retained(lambda: load_records(path)) / size
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        print(f"{size:>10,}{dicts:>14,.0f}{records:>14,.0f}{1 - records / dicts:>8.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Compare the calculator's number backends.
+
+Times perform_calculation() + format_result() over the same operands in
+float, decimal and fraction mode, and the expression engine on a small
+formula, so the cost of exact arithmetic is visible before choosing it.
+
+    python benchmarks/bench_numeric.py -n 200000 --precision 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calc_expr import compile_expression  # noqa: E402
+from calc_numeric import MODES, NumberBackend  # noqa: E402
+from task2 import format_result, perform_calculation  # noqa: E402
+
+
+def make_operands(n, seed=1):
+    rng = random.Random(seed)
+    return [(f"{rng.uniform(-1000, 1000):.4f}", f"{rng.uniform(-1000, 1000):.4f}",
+             rng.choice("+-*/")) for _ in range(n)]
+
+
+def bench_pairs(backend, operands):
+    parse = backend.parse
+    pairs = [(parse(a), parse(b), op) for a, b, op in operands]
+    start = time.perf_counter()
+    with backend.context():
+        for a, b, op in pairs:
+            result, _ = perform_calculation(a, b, op)
+            if result is not None:
+                format_result(result)
+    return time.perf_counter() - start
+
+
+def bench_expression(backend, operands):
+    expr = compile_expression("(a + b) * a / (b + 7) - a ^ 2", backend.mode)
+    parse = backend.parse
+    rows = [{'a': parse(a), 'b': parse(b)} for a, b, _ in operands]
+    start = time.perf_counter()
+    with backend.context():
+        for value in expr.evaluate_many(rows):
+            format_result(value)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", type=int, default=100000, help="calculations per run")
+    parser.add_argument("--precision", type=int, help="decimal precision (default 28)")
+    args = parser.parse_args(argv)
+
+    operands = make_operands(args.n)
+    print(f"{'mode':<10}{'pairs/s':>14}{'exprs/s':>14}")
+    for mode in MODES:
+        backend = NumberBackend(mode, args.precision)
+        pairs = bench_pairs(backend, operands)
+        exprs = bench_expression(backend, operands)
+        print(f"{mode:<10}{args.n / pairs:>14,.0f}{args.n / exprs:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
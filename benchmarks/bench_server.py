@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Throughput of todo_server under many local clients.
+
+Starts a server on a fresh tasks.json in a temporary directory, then has
+--clients threads, each with its own connection, send a mix of adds,
+completes and edits. With --window 1 every client waits for each answer;
+a larger window keeps that many requests in flight per client
+(pipelining), which lets the server's writer group them into fewer
+store writes. One more client subscribes and counts the change events.
+
+    python benchmarks/bench_server.py --clients 16 --ops 2000 --window 32
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from todo_client import TodoClient  # noqa: E402
+
+
+def start_server(workdir, timeout=10.0):
+    path = os.path.join(workdir, "tasks.json")
+    address = path + ".sock"
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, "todo_server.py"),
+                                "--data", path], stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(address):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise SystemExit("todo_server did not start")
+        time.sleep(0.02)
+    return process, address
+
+
+def run_client(address, ops, window, number, errors):
+    client = TodoClient(address)
+    in_flight = deque()
+    try:
+        for i in range(ops):
+            kind = i % 4
+            if kind == 0 or i < 4:
+                future = client.send("add", description=f"client {number} task {i}")
+            elif kind == 1:
+                future = client.send("complete", ids=[number * ops + i])
+            elif kind == 2:
+                future = client.send("edit", task_id=1, description=f"edited by {number}")
+            else:
+                future = client.send("get", task_id=1)
+            in_flight.append(future)
+            if len(in_flight) >= window:
+                in_flight.popleft().result()
+        while in_flight:
+            in_flight.popleft().result()
+    except Exception as e:
+        errors.append(e)
+    finally:
+        client.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--ops", type=int, default=2000, help="requests per client")
+    parser.add_argument("--window", type=int, default=16,
+                        help="requests in flight per client (1 = no pipelining)")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="todo-server-")
+    process, address = start_server(workdir)
+    try:
+        watcher = TodoClient(address)
+        watcher.subscribe()
+        errors = []
+        threads = [threading.Thread(target=run_client,
+                                    args=(address, args.ops, max(args.window, 1), n, errors))
+                   for n in range(args.clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - start
+        total = args.clients * args.ops
+        final_seq = watcher.call("ping")
+        events = watcher.events.qsize()
+        watcher.close()
+        print(f"{total:,} requests from {args.clients} clients (window {args.window}) "
+              f"in {seconds:.2f}s: {total / seconds:,.0f} ops/s")
+        print(f"{final_seq:,} commits, {events:,} events received by a subscriber")
+        if errors:
+            print(f"{len(errors)} client(s) failed: {errors[0]!r}")
+            return 1
+    finally:
+        process.terminate()
+        process.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
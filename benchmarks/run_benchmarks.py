@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the To-Do list, calculator and password generator.
+
+Everything runs offline in temporary directories. The To-Do benchmarks
+build synthetic tasks.json files at each size and time loading (JSON and
+binary snapshot), saving (full rewrite, single change, snapshot) and the
+work refresh_task_list() does for a view (query, page of rows, counters).
+That path is headless through TaskEngine. With --gui and a display the
+real TodoApp.refresh_task_list() is timed as well.
+
+Results are written as JSON. Pass an earlier file with --compare to see
+the change per benchmark and have regressions flagged:
+
+    python benchmarks/run_benchmarks.py -o before.json
+    python benchmarks/run_benchmarks.py -o after.json --compare before.json
+    python benchmarks/run_benchmarks.py --only todo --sizes 1000,10000
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from calc_batch import evaluate_batch, np  # noqa: E402
+from calc_expr import compile_expression  # noqa: E402
+from calc_format import format_many  # noqa: E402
+from pass_policy import compile_policy, policy_for_complexity  # noqa: E402
+from task2 import format_result, perform_calculation  # noqa: E402
+from task3 import generate_password  # noqa: E402
+from todo_engine import TaskEngine  # noqa: E402
+from todo_store import JournalStore, atomic_write_json, write_snapshot  # noqa: E402
+
+GROUPS = ("todo", "calc", "password")
+DEFAULT_SIZES = (1000, 10000, 100000)
+PAGE_SIZE = 20
+WORDS = ("report", "email", "invoice", "meeting", "review", "deploy", "groceries",
+         "call", "plan", "budget", "draft", "fix", "update", "book", "pay")
+
+# Views timed by the refresh benchmark: (filter, search, sort column, reverse, group by)
+VIEWS = (
+    ("All", "", None, False, None),
+    ("Pending", "", None, False, None),
+    ("High Priority", "", "Created", True, None),
+    ("All", "rev", None, False, None),
+    ("All", "", "Task", False, None),
+    ("All", "", None, False, "priority"),
+)
+
+
+class Results:
+    """Collects timings as dicts ready for JSON."""
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, group, name, seconds, count=1, size=None, unit="ops"):
+        row = {'group': group, 'name': name, 'size': size, 'seconds': seconds,
+               'count': count, 'rate': count / seconds if seconds else None, 'unit': unit}
+        self.rows.append(row)
+        size_text = f"[{size:,}]" if size is not None else ""
+        rate = f"{row['rate']:>14,.0f} {unit}/s" if row['rate'] else ""
+        print(f"{group:<9}{name + size_text:<34}{seconds * 1000:>11.2f} ms{rate}", flush=True)
+
+
+def best_time(func, repeat=3):
+    """Best wall time of func() over repeat runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def synthetic_tasks(n, seed=1):
+    """Tasks as TaskEngine writes them: '%Y-%m-%d' dates over about a year."""
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    tasks = []
+    for i in range(1, n + 1):
+        created = start + timedelta(days=rng.randrange(365))
+        completed = rng.random() < 0.3
+        tasks.append({
+            'id': i,
+            'description': f"{rng.choice(WORDS)} {rng.choice(WORDS)} task {i}",
+            'priority': rng.choice(("High", "Medium", "Low")),
+            'status': "Completed" if completed else "Pending",
+            'created_date': created.isoformat(),
+            'completed_date': (created + timedelta(days=rng.randrange(30))).isoformat()
+            if completed else "",
+        })
+    return tasks
+
+
+def refresh_view(engine, view):
+    """The model side of TodoApp.refresh_task_list() for one view."""
+    filter_val, search, sort, reverse, group_by = view
+    tasks = engine.query(filter_val, search, sort, reverse, group_by)
+    rows = [(str(t.id), (t.description, t.priority, t.status,
+                         t.created_date, t.completed_date))
+            for t in tasks[:PAGE_SIZE]]
+    engine.counters.filter_labels()
+    return len(tasks), rows
+
+
+def bench_todo(results, sizes, repeat, gui):
+    for size in sizes:
+        workdir = tempfile.mkdtemp(prefix="todo-bench-")
+        try:
+            path = os.path.join(workdir, "tasks.json")
+            tasks = synthetic_tasks(size)
+            atomic_write_json(path, tasks)
+
+            def load_json():
+                # Read-only: nothing is written, and no lock outlives the run
+                TaskEngine(path, store=JournalStore(path, read_only=True)).load()
+            results.add("todo", "load tasks.json", best_time(load_json, repeat), size, size,
+                        "tasks")
+
+            # Closed the way the GUI leaves it, so loading takes the .snap
+            snap_store = JournalStore(path, fsync=False, binary_snapshot=True)
+            snap_store.load()
+            snap_store.close()
+            results.add("todo", "load binary snapshot", best_time(load_json, repeat), size,
+                        size, "tasks")
+            os.remove(path + ".snap")
+
+            store = JournalStore(path)
+            engine = TaskEngine(path, store=store)
+            engine.load()
+            results.add("todo", "save full tasks.json",
+                        best_time(lambda: store.compact(write_json=True), repeat), size, size,
+                        "tasks")
+            results.add("todo", "save binary snapshot",
+                        best_time(lambda: write_snapshot(path + ".snap", store.tasks.values()),
+                                  repeat),
+                        size, size, "tasks")
+            ids = iter(range(1, size + 1))
+            results.add("todo", "save one change (journal)",
+                        best_time(lambda: engine.edit(next(ids), "edited"), repeat * 10),
+                        1, size, "changes")
+
+            # First query per view builds its indexes; the timed ones reuse them
+            for view in VIEWS:
+                refresh_view(engine, view)
+            results.add("todo", "refresh (6 views)",
+                        best_time(lambda: [refresh_view(engine, v) for v in VIEWS], repeat),
+                        len(VIEWS), size, "refreshes")
+            engine.close()
+
+            if gui:
+                bench_todo_gui(results, workdir, size, repeat)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_todo_gui(results, workdir, size, repeat):
+    """Time the real TodoApp.refresh_task_list(); needs a display."""
+    import tkinter as tk
+    from task1 import TodoApp
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"todo     GUI benchmark skipped: {e}")
+        return
+    cwd = os.getcwd()
+    os.chdir(workdir)  # TodoApp always opens tasks.json in the current directory
+    try:
+        root.withdraw()
+        app = TodoApp(root)
+        while app.load_iter is not None:
+            app.load_next_chunk()
+
+        def refresh():
+            app.view_dirty = True
+            app.refresh_task_list()
+            root.update_idletasks()
+        results.add("todo", "TodoApp.refresh_task_list", best_time(refresh, repeat), 1, size,
+                    "refreshes")
+        app.engine.close()
+    finally:
+        root.destroy()
+        os.chdir(cwd)
+
+
+def bench_calc(results, n, repeat):
+    rng = random.Random(2)
+    a = [rng.uniform(-1e6, 1e6) for _ in range(n)]
+    b = [rng.uniform(-1e3, 1e3) for _ in range(n)]
+    ops = [rng.choice("+-*/") for _ in range(n)]
+
+    def calculate():
+        for x, y, op in zip(a, b, ops):
+            perform_calculation(x, y, op)
+    results.add("calc", "perform_calculation", best_time(calculate, repeat), n)
+
+    values = [perform_calculation(x, y, op)[0] for x, y, op in zip(a, b, ops)]
+    results.add("calc", "format_result",
+                best_time(lambda: [format_result(v) for v in values], repeat), n)
+    results.add("calc", "format_many", best_time(lambda: format_many(values), repeat), n)
+    results.add("calc", "evaluate_batch (numpy)" if np is not None else "evaluate_batch",
+                best_time(lambda: evaluate_batch(a, b, ops), repeat), n)
+
+    expr = compile_expression("(a + b) * 2 - a / (b + 1)")
+    rows = [{'a': x, 'b': y} for x, y in zip(a, b)]
+    results.add("calc", "compiled expression",
+                best_time(lambda: list(expr.evaluate_many(rows)), repeat), n)
+
+
+def bench_password(results, n, repeat, length=16):
+    for level in (1, 2, 3, 4):
+        calls = max(n // 10, 1)
+        results.add("password", f"generate_password level {level}",
+                    best_time(lambda: [generate_password(length, level) for _ in range(calls)],
+                              repeat), calls, length, "passwords")
+        policy = compile_policy(policy_for_complexity(level, length))
+        results.add("password", f"batch level {level}",
+                    best_time(lambda: policy.generate_bytes(n), repeat), n, length,
+                    "passwords")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(rows, path, threshold):
+    """Print the change against an earlier run; returns the number of regressions."""
+    with open(path, encoding="utf-8") as f:
+        before = {(r['group'], r['name'], r['size']): r for r in json.load(f)['results']}
+    print(f"\nCompared with {path} (regression: more than {threshold:.0%} slower)")
+    regressions = 0
+    for row in rows:
+        old = before.get((row['group'], row['name'], row['size']))
+        if old is None or not old['seconds']:
+            continue
+        ratio = (row['seconds'] / row['count']) / (old['seconds'] / old['count'])
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        size = f"[{row['size']:,}]" if row['size'] is not None else ""
+        print(f"{row['group']:<9}{row['name'] + size:<34}{ratio:>8.2f}x time{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("-o", "--output", default="benchmark-results.json",
+                        help="JSON file to write (default benchmark-results.json)")
+    parser.add_argument("--only", default=",".join(GROUPS),
+                        help=f"comma-separated groups to run ({', '.join(GROUPS)})")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="task counts for the To-Do benchmarks (default 1000,10000,100000)")
+    parser.add_argument("-n", type=int, default=100000,
+                        help="operations per calculator/password benchmark (default 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark; best is kept")
+    parser.add_argument("--gui", action="store_true",
+                        help="also time the real TodoApp (needs a display)")
+    parser.add_argument("--compare", metavar="JSON", help="earlier results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="slowdown counted as a regression by --compare (default 0.2)")
+    args = parser.parse_args(argv)
+
+    groups = [g.strip() for g in args.only.split(",") if g.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    results = Results()
+    started = time.perf_counter()
+    if "todo" in groups:
+        bench_todo(results, sizes, args.repeat, args.gui)
+    if "calc" in groups:
+        bench_calc(results, args.n, args.repeat)
+    if "password" in groups:
+        bench_password(results, args.n, args.repeat)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__ if np is not None else None,
+            'repeat': args.repeat,
+            'total_seconds': time.perf_counter() - started,
+        },
+        'results': results.rows,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results.rows)} results to {args.output} "
+          f"(median rate {statistics.median(r['rate'] or 0 for r in results.rows):,.0f}/s)")
+
+    if args.compare:
+        return 1 if compare(results.rows, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Batch evaluation for the Simple Calculator.
+
+perform_calculation() in task2.py handles one pair of numbers per call.
+evaluate_batch() does the same arithmetic over whole columns of operands
+at once. When NumPy is installed the work is vectorized; otherwise a
+pure-Python path gives the same results, just more slowly.
+
+Errors are reported per element instead of stopping the batch: each
+result slot has an error code (0 = ok), and the value is NaN wherever
+the code is not 0.
+"""
+
+import math
+import operator
+from array import array
+from collections import namedtuple
+from numbers import Number
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Operator codes accepted in the ops column: the symbols, or the menu
+# numbers used by task2.get_operation()
+OPERATOR_CODES = {'+': 1, '-': 2, '*': 3, '/': 4, 1: 1, 2: 2, 3: 3, 4: 4}
+
+OK = 0
+DIVIDE_BY_ZERO = 1
+INVALID_OPERATION = 2
+
+# Same wording as perform_calculation()
+ERROR_MESSAGES = {
+    DIVIDE_BY_ZERO: "Error: Cannot divide by zero!",
+    INVALID_OPERATION: "Error: Invalid operation!",
+}
+
+_PY_OPS = {1: operator.add, 2: operator.sub, 3: operator.mul, 4: operator.truediv}
+
+BatchResult = namedtuple("BatchResult", ["values", "errors"])
+
+
+def error_message(code):
+    """Human-readable text for an error code, or '' for OK."""
+    return ERROR_MESSAGES.get(code, "")
+
+
+def _op_code(op):
+    if isinstance(op, str):
+        op = op.strip()
+    try:
+        return OPERATOR_CODES.get(op, 0)
+    except TypeError:
+        # Unhashable junk in the column is just an invalid operator
+        return 0
+
+
+def _op_codes(ops):
+    """
+    The code of a single operator, or a list with the code of every one in
+    a column. Both paths read operators through here so they always agree.
+    """
+    if isinstance(ops, (str, Number)):
+        return _op_code(ops)
+    return [_op_code(op) for op in ops]
+
+
+def evaluate_batch(num1, num2, ops):
+    """
+    Evaluate num1[i] <ops[i]> num2[i] for every i.
+
+    num1 and num2 are sequences (or arrays) of numbers of equal length, or
+    a single number to use for every row. ops is a sequence of operator
+    symbols / menu numbers, or one of them for the whole batch.
+
+    Returns BatchResult(values, errors). With NumPy these are a float64
+    array and an int8 array; without it, array('d') and array('b').
+    """
+    if np is not None:
+        return _evaluate_numpy(num1, num2, ops)
+    return _evaluate_python(num1, num2, ops)
+
+
+def _evaluate_numpy(num1, num2, ops):
+    a = np.asarray(num1, dtype=np.float64)
+    b = np.asarray(num2, dtype=np.float64)
+    if isinstance(ops, np.ndarray) and ops.dtype.kind in "iu":
+        # Menu numbers only: no need to look at each one in Python
+        codes = np.where((ops >= 1) & (ops <= 4), ops, 0).astype(np.int8)
+    else:
+        # Strings with padding and mixed columns such as ['+', 1] would not
+        # survive np.asarray, so go through the same lookup as the Python path
+        codes = np.asarray(_op_codes(ops), dtype=np.int8)
+    a, b, codes = np.broadcast_arrays(a, b, codes)
+
+    values = np.full(a.shape, np.nan)
+    errors = np.zeros(a.shape, dtype=np.int8)
+    divide = codes == 4
+    zero = divide & (b == 0)
+    # Overflow to inf is a valid float result, as it is for Python floats
+    with np.errstate(over='ignore', invalid='ignore'):
+        np.add(a, b, out=values, where=codes == 1)
+        np.subtract(a, b, out=values, where=codes == 2)
+        np.multiply(a, b, out=values, where=codes == 3)
+        np.divide(a, b, out=values, where=divide & ~zero)
+    errors[zero] = DIVIDE_BY_ZERO
+    errors[codes == 0] = INVALID_OPERATION
+    return BatchResult(values, errors)
+
+
+def _evaluate_python(num1, num2, ops):
+    # Decimal and Fraction are Numbers too, and work as scalars here as with NumPy
+    scalar1 = isinstance(num1, Number)
+    scalar2 = isinstance(num2, Number)
+    codes = _op_codes(ops)
+    scalar_op = isinstance(codes, int)
+    lengths = [len(x) for x, scalar in ((num1, scalar1), (num2, scalar2), (ops, scalar_op))
+               if not scalar]
+    n = lengths[0] if lengths else 1
+    if any(length != n for length in lengths):
+        raise ValueError("operand and operator columns must have the same length")
+
+    a = [float(num1)] * n if scalar1 else [float(x) for x in num1]
+    b = [float(num2)] * n if scalar2 else [float(x) for x in num2]
+    errors = array('b', bytes(n))
+
+    if scalar_op:
+        code = codes
+        if code == 0:
+            return BatchResult(array('d', [math.nan]) * n,
+                               array('b', [INVALID_OPERATION]) * n)
+        if code != 4:
+            # One operator for the whole column: let map() do the loop in C
+            return BatchResult(array('d', map(_PY_OPS[code], a, b)), errors)
+        codes = [4] * n
+
+    values = array('d', bytes(8 * n))
+    for i, code in enumerate(codes):
+        y = b[i]
+        if code == 4 and y == 0:
+            values[i] = math.nan
+            errors[i] = DIVIDE_BY_ZERO
+        elif code == 0:
+            values[i] = math.nan
+            errors[i] = INVALID_OPERATION
+        else:
+            values[i] = _PY_OPS[code](a[i], y)
+    return BatchResult(values, errors)
@@ -0,0 +1,260 @@
+"""
+Expression engine for the Simple Calculator.
+
+task2.py works on "number operator number". This module handles whole
+infix expressions such as "(price - discount) * qty / 2" with the usual
+precedence, parentheses, unary minus, ^ for powers and named variables.
+
+Each distinct expression text is parsed once and compiled into a Python
+function; compiled forms are kept in an LRU cache keyed by the text, so
+evaluating the same formula over many sets of variables never parses it
+again:
+
+    >>> f = compile_expression("a * x + b")
+    >>> f(a=2, x=3, b=1)
+    7.0
+    >>> evaluate("-(2 + 3) ^ 2")
+    -25.0
+
+Pass mode="decimal" or mode="fraction" (see calc_numeric) to calculate
+with exact numbers instead of floats:
+
+    >>> evaluate("0.1 + 0.2", mode="decimal")
+    Decimal('0.3')
+"""
+
+import math
+import re
+from decimal import Decimal, Overflow, localcontext
+from fractions import Fraction
+from functools import lru_cache
+
+# How number literals are created in each mode
+LITERALS = {'float': float, 'decimal': Decimal, 'fraction': Fraction}
+
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<op>[-+*/^()])
+    )""", re.VERBOSE)
+
+# Exact powers whose result would take more bits than this are refused
+# before anything is computed ("9 ^ 9 ^ 9" in fraction mode would run for
+# hours); far beyond what can be printed anyway
+MAX_POWER_BITS = 1 << 20
+
+# Binary operators: precedence and whether they group to the right
+BINARY = {'+': (1, False), '-': (1, False), '*': (2, False), '/': (2, False),
+          '^': (4, True)}
+UNARY_PRECEDENCE = 3
+
+
+class ExpressionError(ValueError):
+    """The expression could not be parsed or evaluated."""
+
+
+def tokenize(text):
+    """Split an expression into (kind, value) tokens."""
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            while text[pos].isspace():
+                pos += 1
+            raise ExpressionError(f"Unexpected character {text[pos]!r} at position {pos + 1}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """Precedence-climbing parser producing nested tuples."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError("Empty expression")
+        node = self.expression(0)
+        if self.pos < len(self.tokens):
+            raise ExpressionError(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def expression(self, min_precedence):
+        node = self.operand()
+        while True:
+            kind, value = self.peek()
+            if kind != 'op' or value not in BINARY:
+                return node
+            precedence, right = BINARY[value]
+            if precedence < min_precedence:
+                return node
+            self.take()
+            rhs = self.expression(precedence if right else precedence + 1)
+            node = ('bin', value, node, rhs)
+
+    def operand(self):
+        kind, value = self.take()
+        if kind == 'number':
+            return ('num', value)
+        if kind == 'name':
+            return ('var', value)
+        if kind == 'op' and value in '+-':
+            return ('neg' if value == '-' else 'pos', self.expression(UNARY_PRECEDENCE))
+        if kind == 'op' and value == '(':
+            node = self.expression(0)
+            if self.take() != ('op', ')'):
+                raise ExpressionError("Missing closing parenthesis")
+            return node
+        if kind is None:
+            raise ExpressionError("Expression ends too early")
+        raise ExpressionError(f"Unexpected {value!r}")
+
+
+def parse(text):
+    """Parse an expression into a tree of tuples."""
+    return _Parser(tokenize(text)).parse()
+
+
+def _to_source(node, names, constants, checked_power=False):
+    kind = node[0]
+    if kind == 'num':
+        # Literals are created once, at compile time, and referenced by slot
+        constants.append(node[1])
+        return f"_c[{len(constants) - 1}]"
+    if kind == 'var':
+        names.add(node[1])
+        return f"_v[{node[1]!r}]"
+    if kind == 'neg':
+        return f"(-{_to_source(node[1], names, constants, checked_power)})"
+    if kind == 'pos':
+        return f"(+{_to_source(node[1], names, constants, checked_power)})"
+    _, op, lhs, rhs = node
+    lhs = _to_source(lhs, names, constants, checked_power)
+    rhs = _to_source(rhs, names, constants, checked_power)
+    if op == '^':
+        # Float powers overflow at once; exact ones are sized up first
+        return f"_pow({lhs}, {rhs})" if checked_power else f"({lhs} ** {rhs})"
+    return f"({lhs} {op} {rhs})"
+
+
+def _decimal_power(base, exp):
+    # Decimal overflows past Emax by itself, but only after the work
+    if (isinstance(base, Decimal) and isinstance(exp, (Decimal, int))
+            and base and base.is_finite() and Decimal(exp).is_finite() and abs(exp) > 1):
+        with localcontext() as ctx:
+            emax = ctx.Emax
+            # A rough size is enough, and cheap at any precision
+            ctx.prec = 16
+            digits = abs(Decimal(exp)) * abs(base).log10()
+        if digits > emax:
+            raise ExpressionError("Error: Result too large!")
+    return base ** exp
+
+
+def _fraction_power(base, exp):
+    # Roughly |exp| * log2|base| bits, for the numerator or denominator
+    if isinstance(base, (Fraction, int)) and abs(exp) > 1:
+        ratio = Fraction(base)
+        bits = math.log2(max(abs(ratio.numerator), ratio.denominator))
+        if bits and bits * float(abs(exp)) > MAX_POWER_BITS:
+            raise ExpressionError("Error: Result too large!")
+    return base ** exp
+
+
+POWERS = {'decimal': _decimal_power, 'fraction': _fraction_power}
+
+
+class CompiledExpression:
+    """A parsed expression turned into a plain Python function of its variables."""
+
+    def __init__(self, text, mode="float"):
+        if mode not in LITERALS:
+            raise ExpressionError(f"Unknown number mode: {mode!r}")
+        self.text = text
+        self.mode = mode
+        names = set()
+        constants = []
+        # The tree only holds literal slots and variable lookups, so the
+        # generated source cannot contain anything else
+        source = _to_source(parse(text), names, constants, mode in POWERS)
+        self.variables = frozenset(names)
+        literal = LITERALS[mode]
+        self._func = eval(compile(f"lambda _v, _c=_c: {source}", "<expression>", "eval"),
+                          {"__builtins__": {}, "_c": tuple(literal(c) for c in constants),
+                           "_pow": POWERS.get(mode)})
+        # Floats keep the original behaviour of always returning a float
+        self._result = {'float': float, 'fraction': _exact}.get(mode, _identity)
+
+    def __repr__(self):
+        return f"CompiledExpression({self.text!r}, mode={self.mode!r})"
+
+    def __call__(self, **variables):
+        return self.evaluate(variables)
+
+    def evaluate(self, variables=None):
+        """Evaluate with a mapping of variable names to numbers."""
+        try:
+            return self._result(self._func(variables if variables is not None else {}))
+        except ZeroDivisionError:
+            raise ExpressionError("Error: Cannot divide by zero!") from None
+        except (OverflowError, Overflow):
+            raise ExpressionError("Error: Result too large!") from None
+        except ArithmeticError:
+            # decimal.InvalidOperation, e.g. 0/0 with Decimals
+            raise ExpressionError("Error: Invalid operation!") from None
+        except KeyError as e:
+            raise ExpressionError(f"Unknown variable {e.args[0]!r}") from None
+        except TypeError:
+            # e.g. a negative number raised to a fractional power
+            raise ExpressionError("Error: Result is not a real number!") from None
+
+    def evaluate_many(self, rows):
+        """Evaluate once per mapping in rows, yielding the results."""
+        func = self._func
+        result = self._result
+        for variables in rows:
+            try:
+                yield result(func(variables))
+            except (ArithmeticError, KeyError, TypeError):
+                # Repeat through evaluate() to raise the friendly error
+                yield self.evaluate(variables)
+
+
+def _identity(value):
+    return value
+
+
+def _exact(value):
+    # Fraction ** non-integer Fraction quietly gives a float; fraction mode
+    # promises exact results, so refuse instead
+    if isinstance(value, float):
+        raise ExpressionError("Error: Fractional powers have no exact result!")
+    return value
+
+
+@lru_cache(maxsize=512)
+def compile_expression(text, mode="float"):
+    """Compile an expression, reusing the cached form for text seen before."""
+    return CompiledExpression(text, mode)
+
+
+def evaluate(text, variables=None, mode="float", **kwargs):
+    """Evaluate an expression once. Variables may be a mapping and/or keywords."""
+    if kwargs:
+        variables = dict(variables or {}, **kwargs)
+    return compile_expression(text, mode).evaluate(variables)
@@ -0,0 +1,117 @@
+"""
+Bulk result formatting for the Simple Calculator.
+
+task2.format_result() formats one value at a time. When thousands of
+results are printed (calc_stream, calc_batch) the per-call checks add up,
+so this module picks the formatting function once and then maps it over
+whole columns:
+
+    >>> format_many([1.0, 2.5, 1 / 3, float('inf')])
+    ['1', '2.5', '0.333333', 'inf']
+    >>> format_many([0.1 + 0.2], shortest=True)
+    ['0.30000000000000004']
+
+Two styles are available:
+
+    fixed     at most `precision` decimals, trailing zeros removed
+              (precision=6 is exactly format_result)
+    shortest  the shortest text that reads back as the same float (repr)
+
+Whole numbers print without a decimal point in both styles, and inf/nan
+print as 'inf', '-inf' and 'nan' instead of raising.
+"""
+
+from functools import lru_cache
+
+from task2 import format_result
+
+DEFAULT_PRECISION = 6
+
+# Above this, repr() switches to exponent notation and so should we
+_SHORTEST_INTEGER_LIMIT = 1e16
+
+
+@lru_cache(maxsize=32)
+def make_formatter(precision=DEFAULT_PRECISION, shortest=False):
+    """Return a function formatting one result in the requested style."""
+    if shortest:
+        return _format_shortest
+    if precision == DEFAULT_PRECISION:
+        return format_result
+    if precision < 0:
+        raise ValueError("precision must not be negative")
+    spec = f"%.{precision}f"
+
+    def format_fixed(result):
+        if type(result) is not float:
+            if not isinstance(result, float):
+                return format_result(result)
+            result = float(result)
+        if result.is_integer():
+            return '%d' % result
+        text = spec % result
+        # With precision 0 there is no decimal point, so no zeros to strip
+        return text.rstrip('0').rstrip('.') if precision else text
+
+    return format_fixed
+
+
+def _format_shortest(result):
+    if type(result) is not float:
+        if not isinstance(result, float):
+            return format_result(result)
+        result = float(result)
+    if result.is_integer() and -_SHORTEST_INTEGER_LIMIT < result < _SHORTEST_INTEGER_LIMIT:
+        return '%d' % result
+    return repr(result)
+
+
+def format_many(values, precision=DEFAULT_PRECISION, shortest=False):
+    """Format a sequence (list, array('d') or NumPy array) of results in one pass."""
+    if hasattr(values, 'tolist'):
+        # Plain Python floats format faster than NumPy scalars
+        values = values.tolist()
+    return list(map(make_formatter(precision, shortest), values))
+
+
+def format_batch(result, precision=DEFAULT_PRECISION, shortest=False):
+    """Format a calc_batch.BatchResult, with the error message in failed slots."""
+    # Imported here so the formatter does not pull in NumPy for plain output
+    from calc_batch import error_message
+
+    lines = format_many(result.values, precision, shortest)
+    errors = result.errors
+    if hasattr(errors, 'any'):
+        if not errors.any():
+            return lines
+        failed = errors.nonzero()[0].tolist()
+    else:
+        failed = [i for i, code in enumerate(errors) if code]
+    for i in failed:
+        lines[i] = error_message(int(errors[i]))
+    return lines
+
+
+def write_results(out, lines, chunk_size=8192):
+    """
+    Write formatted lines to a text stream, one per line.
+
+    lines may be any iterable of strings; they are joined chunk_size at a
+    time so the stream sees a few large writes instead of one per value.
+    Returns the number of lines written.
+    """
+    count = 0
+    chunk = []
+    append = chunk.append
+    for line in lines:
+        append(line)
+        if len(chunk) >= chunk_size:
+            out.write("\n".join(chunk))
+            out.write("\n")
+            count += len(chunk)
+            chunk.clear()
+    if chunk:
+        out.write("\n".join(chunk))
+        out.write("\n")
+        count += len(chunk)
+    return count
@@ -0,0 +1,67 @@
+"""
+Number backends for the Simple Calculator.
+
+By default everything is a binary float, which is fast but cannot
+represent 0.1 exactly, so long chains of additions drift. Two exact
+alternatives can be selected instead:
+
+    float     binary floating point (the original behaviour)
+    decimal   decimal.Decimal with a configurable precision and rounding
+    fraction  fractions.Fraction, exact rational arithmetic; powers
+              with a non-integer exponent have no exact result and are
+              reported as errors rather than turned into floats
+
+perform_calculation() and format_result() in task2.py work with all of
+them; a backend only decides how input text becomes a number and which
+decimal context is active while calculating.
+"""
+
+import decimal
+from contextlib import contextmanager, nullcontext
+from fractions import Fraction
+
+MODES = ("float", "decimal", "fraction")
+ROUNDINGS = frozenset(name for name in dir(decimal) if name.startswith("ROUND_"))
+
+
+def parse_decimal(text):
+    try:
+        return decimal.Decimal(text.strip())
+    except decimal.InvalidOperation:
+        raise ValueError(f"could not convert string to Decimal: {text!r}") from None
+
+
+class NumberBackend:
+    """How numbers are parsed and in which context they are calculated."""
+
+    def __init__(self, mode="float", precision=None, rounding=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown number mode: {mode!r} (choose from {', '.join(MODES)})")
+        self.mode = mode
+        self.precision = precision
+        self.rounding = rounding
+        if mode == "float":
+            self.parse = float
+        elif mode == "decimal":
+            self.parse = parse_decimal
+        else:
+            self.parse = Fraction
+
+    def __repr__(self):
+        return f"NumberBackend({self.mode!r}, precision={self.precision!r}, rounding={self.rounding!r})"
+
+    def context(self):
+        """Context manager that applies the decimal precision/rounding, if any."""
+        if self.mode != "decimal" or (self.precision is None and self.rounding is None):
+            return nullcontext()
+        return _decimal_context(self.precision, self.rounding)
+
+
+@contextmanager
+def _decimal_context(precision, rounding):
+    with decimal.localcontext() as ctx:
+        if precision is not None:
+            ctx.prec = precision
+        if rounding is not None:
+            ctx.rounding = rounding
+        yield ctx
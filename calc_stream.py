@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Non-interactive streaming mode for the Simple Calculator.
+
+Reads one calculation per line from a file or stdin and writes one result
+line per input line, in the same order:
+
+    12 + 30          ->  42
+    7 / 0            ->  Error: Cannot divide by zero!
+    (2 + 3) * 4 ^ 2  ->  80
+
+"a op b" records go through task2.perform_calculation(); anything else is
+treated as an expression (see calc_expr). Results are printed like
+task2.format_result(), or with --digits/--shortest (see calc_format). Blank lines and lines starting with # are echoed
+unchanged so the output stays aligned with the input.
+
+Lines are processed in blocks through a chain of generators, so memory
+stays bounded no matter how large the input is. With --workers the
+blocks are spread over a process pool, with a limited number of blocks
+in flight at any time.
+
+    python calc_stream.py data.txt -o results.txt --workers 4
+    cat data.txt | python calc_stream.py
+    python calc_stream.py data.txt --mode decimal --precision 50
+"""
+
+import argparse
+import decimal
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+
+from calc_expr import ExpressionError, evaluate
+from calc_format import DEFAULT_PRECISION, make_formatter, write_results
+from calc_numeric import MODES, ROUNDINGS, NumberBackend
+from task2 import format_result, perform_calculation
+
+NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+RECORD_RE = re.compile(rf"\s*({NUMBER})\s*([-+*/])\s*({NUMBER})\s*$")
+
+
+FLOAT = NumberBackend()
+
+
+def evaluate_line(line, backend=FLOAT, fmt=format_result):
+    """Turn one input line into its output line (without the newline)."""
+    line = line.rstrip("\r\n")
+    stripped = line.strip()
+    if not stripped or stripped.startswith("#"):
+        return line
+
+    # A line that cannot be calculated or printed only fails itself
+    match = RECORD_RE.match(line)
+    try:
+        if match:
+            parse = backend.parse
+            result, message = perform_calculation(parse(match.group(1)), parse(match.group(3)),
+                                                  match.group(2))
+            if result is None:
+                return message
+        else:
+            result = evaluate(stripped, mode=backend.mode)
+    except ExpressionError as e:
+        message = str(e)
+        return message if message.startswith("Error:") else f"Error: {message}"
+    except (OverflowError, decimal.Overflow):
+        return "Error: Result too large!"
+    except ArithmeticError:
+        return "Error: Invalid operation!"
+    try:
+        return fmt(result)
+    except ValueError:
+        # int -> str refuses more than sys.get_int_max_str_digits() digits
+        return "Error: Result has too many digits to print!"
+
+
+def evaluate_block(lines, backend=FLOAT, precision=DEFAULT_PRECISION, shortest=False):
+    """Evaluate a list of lines; the unit of work handed to pool workers."""
+    fmt = make_formatter(precision, shortest)
+    with backend.context():
+        return [evaluate_line(line, backend, fmt) for line in lines]
+
+
+def blocks(lines, size):
+    """Group an iterable of lines into lists of at most size lines."""
+    lines = iter(lines)
+    while True:
+        block = list(islice(lines, size))
+        if not block:
+            return
+        yield block
+
+
+def evaluate_stream(lines, block_size=10000, workers=1, backend=FLOAT,
+                    precision=DEFAULT_PRECISION, shortest=False):
+    """
+    Yield output blocks (lists of result lines) in input order.
+
+    With workers > 1 the blocks are evaluated in a process pool. At most
+    2 * workers blocks are queued at once, so a multi-GB input never sits
+    in memory.
+    """
+    work = partial(evaluate_block, backend=backend, precision=precision, shortest=shortest)
+    if workers <= 1:
+        for block in blocks(lines, block_size):
+            yield work(block)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for block in blocks(lines, block_size):
+            pending.append(pool.submit(work, block))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run(infile, outfile, block_size=10000, workers=1, backend=FLOAT,
+        precision=DEFAULT_PRECISION, shortest=False):
+    """Stream infile to outfile. Returns the number of lines processed."""
+    count = 0
+    for results in evaluate_stream(infile, block_size, workers, backend, precision, shortest):
+        count += write_results(outfile, results, chunk_size=block_size)
+    outfile.flush()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate one calculation per line.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="input file, or - for stdin (default)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="output file, or - for stdout (default)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="worker processes; 0 uses every CPU (default 1)")
+    parser.add_argument("--block-size", type=int, default=10000,
+                        help="lines per unit of work (default 10000)")
+    parser.add_argument("--mode", choices=MODES, default="float",
+                        help="number type to calculate with (default float)")
+    parser.add_argument("--precision", type=int,
+                        help="significant digits in decimal mode (default 28)")
+    parser.add_argument("--rounding", choices=sorted(ROUNDINGS),
+                        help="rounding in decimal mode (default ROUND_HALF_EVEN)")
+    style = parser.add_mutually_exclusive_group()
+    style.add_argument("--digits", type=int, default=DEFAULT_PRECISION,
+                       help="maximum decimals printed for floats (default 6)")
+    style.add_argument("--shortest", action="store_true",
+                       help="print floats with the shortest exact round-trip text")
+    args = parser.parse_args(argv)
+    if args.precision is not None and args.precision < 1:
+        parser.error("--precision must be at least 1")
+    if args.digits < 0:
+        parser.error("--digits must not be negative")
+    backend = NumberBackend(args.mode, args.precision, args.rounding)
+
+    workers = args.workers or os.cpu_count() or 1
+    buffer_size = 1 << 20
+    infile = (sys.stdin if args.input == "-"
+              else open(args.input, "r", encoding="utf-8", buffering=buffer_size))
+    outfile = (sys.stdout if args.output == "-"
+               else open(args.output, "w", encoding="utf-8", buffering=buffer_size))
+    try:
+        run(infile, outfile, args.block_size, workers, backend, args.digits, args.shortest)
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # Output closed early (e.g. piped into head); not an error for us.
+        # Point stdout at devnull so the interpreter's final flush is quiet
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
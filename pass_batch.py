@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Bulk password generation for the Password Generator.
+
+Passwords come from a compiled PasswordPolicy (see pass_policy), which
+reads large blocks of os.urandom() bytes and maps them to characters
+without modulo bias. Complexity levels are the same as in task3.py, and
+the policy options (--min-digits, --exclude-ambiguous, --symbols,
+--max-repeat, ...) refine them further.
+
+Large requests can be split over a process pool with --workers. The
+request is cut into fixed shards of --block-size passwords (shard i always
+covers passwords i*size .. (i+1)*size-1). Each worker process reads its
+own bytes from the kernel CSPRNG, so no generator state is shared or
+copied between processes. Shards are written in order as they complete,
+with at most 2 * workers shards in flight, so memory stays bounded even
+for tens of millions of passwords. --progress reports every shard's time
+and rate on stderr.
+
+    python pass_batch.py -n 1000000 -l 16 -c 4 -o passwords.txt
+    python pass_batch.py -n 50000000 -w 0 --progress -o passwords.txt
+    python pass_batch.py -n 100 --exclude-ambiguous --min-digits 3 --max-repeat 2
+    python task3.py -n 10 -l 24
+"""
+
+import argparse
+import os
+import string
+import sys
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from pass_policy import SYMBOLS, compile_policy, policy_for_complexity
+
+# Same character sets as task3.get_character_set()
+CHARACTER_SETS = {
+    1: string.ascii_lowercase,
+    2: string.ascii_lowercase + string.ascii_uppercase,
+    3: string.ascii_lowercase + string.ascii_uppercase + string.digits,
+    4: string.ascii_lowercase + string.ascii_uppercase + string.digits + SYMBOLS,
+}
+
+
+# Timing of one shard, as reported by the worker that generated it
+ShardReport = namedtuple("ShardReport", ["index", "count", "seconds", "pid"])
+
+
+def shards(count, shard_size):
+    """Split count passwords into (index, size) shards of at most shard_size."""
+    for index, start in enumerate(range(0, count, shard_size)):
+        yield index, min(shard_size, count - start)
+
+
+def generate_shard(index, count, policy):
+    """Generate one shard as a newline-terminated block. Returns (block, ShardReport)."""
+    start = time.perf_counter()
+    # compile_policy caches, so each worker compiles a policy only once
+    passwords = compile_policy(policy).generate_bytes(count)
+    block = b"\n".join(passwords) + b"\n"
+    return block, ShardReport(index, count, time.perf_counter() - start, os.getpid())
+
+
+def iter_shards(count, policy, shard_size=65536, workers=1):
+    """
+    Yield (block, ShardReport) for every shard, in shard order.
+
+    With workers > 1 the shards are generated in a process pool, keeping
+    at most 2 * workers of them queued.
+    """
+    if workers <= 1:
+        for index, n in shards(count, shard_size):
+            yield generate_shard(index, n, policy)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for index, n in shards(count, shard_size):
+            pending.append(pool.submit(generate_shard, index, n, policy))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def generate_batch(count, length, complexity=4):
+    """Generate count passwords like task3.generate_password(length, complexity)."""
+    return compile_policy(policy_for_complexity(complexity, length)).generate(count)
+
+
+def write_passwords(out, count, policy, block_size=65536, workers=1, progress=None):
+    """
+    Stream count passwords, one per line, to a binary file. Returns the count.
+
+    progress, if given, is called with each ShardReport as its block is written.
+    """
+    for block, report in iter_shards(count, policy, block_size, workers):
+        out.write(block)
+        if progress is not None:
+            progress(report)
+    out.flush()
+    return count
+
+
+class ProgressReport:
+    """Prints per-shard progress and a final throughput summary to a text stream."""
+
+    def __init__(self, total, stream=sys.stderr):
+        self.total = total
+        self.stream = stream
+        self.shard_total = 0
+        self.done = 0
+        self.started = time.perf_counter()
+        self.per_pid = {}
+
+    def __call__(self, report):
+        self.done += report.count
+        count, seconds = self.per_pid.get(report.pid, (0, 0.0))
+        self.per_pid[report.pid] = (count + report.count, seconds + report.seconds)
+        rate = report.count / report.seconds if report.seconds else 0
+        print(f"shard {report.index + 1}: {report.count:,} in {report.seconds:.2f}s "
+              f"({rate:,.0f}/s, pid {report.pid}) - {self.done:,}/{self.total:,} "
+              f"({self.done / self.total:.0%})", file=self.stream)
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed else 0
+        print(f"{self.done:,} passwords in {elapsed:.2f}s: {rate:,.0f}/s "
+              f"({rate * 60 / 1e6:.1f}M/min) on {len(self.per_pid)} process(es)",
+              file=self.stream)
+        for pid, (count, seconds) in sorted(self.per_pid.items()):
+            worker_rate = count / seconds if seconds else 0
+            print(f"  pid {pid}: {count:,} passwords, {worker_rate:,.0f}/s while busy",
+                  file=self.stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate passwords in bulk.")
+    parser.add_argument("-n", "--count", type=int, default=1,
+                        help="number of passwords (default 1)")
+    parser.add_argument("-l", "--length", type=int, default=16,
+                        help="password length, 4-128 (default 16)")
+    parser.add_argument("-c", "--complexity", type=int, choices=sorted(CHARACTER_SETS),
+                        default=4, help="complexity level as in task3 (default 4)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="output file, or - for stdout (default)")
+    parser.add_argument("--block-size", type=int, default=65536,
+                        help="passwords per block/shard (default 65536)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="worker processes; 0 uses every CPU (default 1)")
+    parser.add_argument("--progress", action="store_true",
+                        help="report per-shard progress and throughput on stderr")
+    rules = parser.add_argument_group("policy", "refine the complexity level")
+    for name in ("lower", "upper", "digits", "symbols"):
+        rules.add_argument(f"--min-{name}", type=int, metavar="N",
+                           help=f"at least N {name} (also enables the class)")
+    rules.add_argument("--symbols", dest="symbol_set", metavar="CHARS",
+                       help="symbol characters to use instead of the default set")
+    rules.add_argument("--exclude", default="", metavar="CHARS",
+                       help="characters never to use")
+    rules.add_argument("--exclude-ambiguous", action="store_true",
+                       help="leave out look-alike characters such as l, 1, O and 0")
+    rules.add_argument("--max-repeat", type=int, metavar="N",
+                       help="no character more than N times in a row")
+    args = parser.parse_args(argv)
+    if not 4 <= args.length <= 128:
+        parser.error("--length must be between 4 and 128")
+    if args.count < 0:
+        parser.error("--count must not be negative")
+
+    overrides = {name: getattr(args, f"min_{name}")
+                 for name in ("lower", "upper", "digits", "symbols")
+                 if getattr(args, f"min_{name}") is not None}
+    if args.symbol_set is not None:
+        overrides["symbol_set"] = args.symbol_set
+    policy = policy_for_complexity(args.complexity, args.length)._replace(
+        exclude=args.exclude, exclude_ambiguous=args.exclude_ambiguous,
+        max_repeat=args.max_repeat, **overrides)
+    try:
+        compile_policy(policy)
+    except ValueError as e:
+        parser.error(str(e))
+
+    workers = args.workers or os.cpu_count() or 1
+    progress = ProgressReport(args.count) if args.progress and args.count else None
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        write_passwords(out, args.count, policy, max(args.block_size, 1), workers, progress)
+        if progress is not None:
+            progress.summary()
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head); stop quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
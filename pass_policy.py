@@ -0,0 +1,291 @@
+"""
+Password policies for the Password Generator.
+
+A PasswordPolicy says which character classes a password may use, how
+many characters of each class it must contain, which characters are
+never used and how often one character may repeat in a row:
+
+    >>> policy = PasswordPolicy(length=12, digits=2, symbols=1,
+    ...                         exclude_ambiguous=True, max_repeat=2)
+    >>> password = compile_policy(policy).generate(1)[0]
+
+compile_policy() turns a policy into a CompiledPolicy once (the result is
+cached), with the character tables and completion counts that every
+password drawn from it reuses.
+
+Unconstrained policies draw characters straight from the OS CSPRNG via
+ByteSampler. When a policy has minimums or a max-repeat rule, each
+password is built in a single pass without shuffling or redrawing. The
+compiled policy knows how many valid passwords start with any prefix
+(memoised per state), so one random number below the total count is
+decoded position by position into its password. Every valid password is
+therefore exactly equally likely.
+"""
+
+import os
+import secrets
+import string
+from collections import namedtuple
+from functools import lru_cache
+
+SYMBOLS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+
+# Characters that are easy to confuse with each other when read or typed
+AMBIGUOUS = "Il1|O0o`'\""
+
+# Character classes in the order they appear in the alphabet
+CLASS_NAMES = ("lower", "upper", "digits", "symbols")
+CLASS_CHARS = {
+    "lower": string.ascii_lowercase,
+    "upper": string.ascii_uppercase,
+    "digits": string.digits,
+}
+
+
+class ByteSampler:
+    """Unbiased random characters from a fixed set, read from os.urandom in blocks."""
+
+    def __init__(self, chars):
+        raw = chars.encode('latin-1')
+        size = len(raw)
+        if not 1 < size <= 256:
+            raise ValueError("character set must have between 2 and 256 characters")
+        # Bytes at or above the largest multiple of size are deleted by
+        # translate(), which is rejection sampling without a Python loop
+        limit = 256 - 256 % size
+        self._table = bytes(raw[b % size] if b < limit else 0 for b in range(256))
+        self._reject = bytes(range(limit, 256))
+        self._accept_rate = limit / 256
+
+    def sample(self, n):
+        """n random characters from the set, as bytes."""
+        chunks = []
+        have = 0
+        while have < n:
+            # Ask for a little more than the expected need so one read usually suffices
+            want = int((n - have) / self._accept_rate * 1.02) + 64
+            chunk = os.urandom(want).translate(self._table, self._reject)
+            chunks.append(chunk)
+            have += len(chunk)
+        return b"".join(chunks)[:n]
+
+
+# Each class field is the minimum count of that class, 0 to allow it
+# without requiring it, or None to leave the class out entirely.
+PasswordPolicy = namedtuple(
+    "PasswordPolicy",
+    ["length", "lower", "upper", "digits", "symbols", "symbol_set",
+     "exclude", "exclude_ambiguous", "max_repeat"],
+    defaults=(16, 1, 1, 1, 1, SYMBOLS, "", False, None))
+
+
+def policy_for_complexity(complexity, length):
+    """The policy matching one of task3's complexity levels (unknown levels mean 4)."""
+    if complexity == 1:
+        return PasswordPolicy(length, 0, None, None, None)
+    if complexity == 2:
+        return PasswordPolicy(length, 0, 0, None, None)
+    if complexity == 3:
+        return PasswordPolicy(length, 0, 0, 0, None)
+    return PasswordPolicy(length, 1, 1, 1, 1)
+
+
+class CompiledPolicy:
+    """A policy with its character tables and completion counts precomputed."""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.length = policy.length
+        removed = set(policy.exclude)
+        if policy.exclude_ambiguous:
+            removed.update(AMBIGUOUS)
+
+        classes = []
+        minimums = []
+        for name in CLASS_NAMES:
+            minimum = getattr(policy, name)
+            if minimum is None:
+                continue
+            if minimum < 0:
+                raise ValueError(f"minimum for {name} must not be negative")
+            source = policy.symbol_set if name == "symbols" else CLASS_CHARS[name]
+            chars = "".join(c for c in dict.fromkeys(source) if c not in removed)
+            if not chars:
+                if minimum:
+                    raise ValueError(f"policy requires {name} but none are left after exclusions")
+                continue
+            classes.append(chars)
+            minimums.append(minimum)
+
+        # A character listed in two classes (e.g. a digit as a custom symbol)
+        # belongs to the first only, so every password has a single spelling
+        seen = set()
+        for i, chars in enumerate(classes):
+            classes[i] = "".join(c for c in chars if c not in seen)
+            seen.update(classes[i])
+
+        self.classes = tuple(classes)
+        self.minimums = tuple(minimums)
+        self.alphabet = "".join(classes)
+        if len(self.alphabet) < 2:
+            raise ValueError("policy leaves fewer than 2 characters to choose from")
+        if policy.max_repeat is not None and policy.max_repeat < 1:
+            raise ValueError("max_repeat must be at least 1")
+        if self.length < 1:
+            raise ValueError("length must be at least 1")
+        self.max_repeat = policy.max_repeat
+        self.sizes = tuple(len(chars) for chars in self.classes)
+        self._raw_classes = tuple(chars.encode('latin-1') for chars in self.classes)
+        self._raw_alphabet = self.alphabet.encode('latin-1')
+        self._counts = {}
+        self._step_cache = {}
+
+        self.constrained = any(self.minimums) or self.max_repeat is not None
+        # Once no minimum is outstanding the remaining characters are free,
+        # unless a max-repeat rule still ties each one to the one before
+        self._free_state = ((0,) * len(self.classes), -1, 0) if self.max_repeat is None else None
+        self._sampler = ByteSampler(self.alphabet)
+        self.total = self.count(self.length, self.minimums, -1, 0)
+        if self.total == 0:
+            raise ValueError(f"no password of length {self.length} satisfies the policy")
+
+    def __repr__(self):
+        return f"CompiledPolicy({self.policy!r})"
+
+    def _options(self, deficits, last, run):
+        """(class, ways, same char?, next state) for each way to extend a prefix."""
+        for c, size in enumerate(self.sizes):
+            left = deficits if not deficits[c] else \
+                deficits[:c] + (deficits[c] - 1,) + deficits[c + 1:]
+            if self.max_repeat is None:
+                yield c, size, False, (left, -1, 0)
+            elif c == last:
+                if run < self.max_repeat:
+                    yield c, 1, True, (left, c, run + 1)
+                if size > 1:
+                    yield c, size - 1, False, (left, c, 1)
+            else:
+                yield c, size, False, (left, c, 1)
+
+    def count(self, remaining, deficits, last, run):
+        """Number of ways to finish a password with `remaining` characters to go."""
+        key = (remaining, deficits, last, run)
+        cached = self._counts.get(key)
+        if cached is not None:
+            return cached
+        if sum(deficits) > remaining:
+            total = 0
+        elif remaining == 0:
+            total = 1
+        elif not any(deficits) and self.max_repeat is None:
+            total = len(self.alphabet) ** remaining
+        else:
+            total = sum(ways * self.count(remaining - 1, *state)
+                        for _, ways, _, state in self._options(deficits, last, run))
+        self._counts[key] = total
+        return total
+
+    def _steps(self, remaining, state):
+        """Options from a state with their sizes, cached: (block, n, class, ways, same, next)."""
+        key = (remaining, state)
+        steps = self._step_cache.get(key)
+        if steps is None:
+            steps = []
+            for c, ways, same, next_state in self._options(*state):
+                n = self.count(remaining, *next_state)
+                if n:
+                    steps.append((ways * n, n, c, ways, same, next_state))
+            steps = self._step_cache[key] = tuple(steps)
+        return steps
+
+    def _prefix(self, index):
+        """
+        Decode index up to the point where the policy is already met.
+
+        Returns (prefix, index): from there on every character is free, and
+        the leftover index (below len(alphabet) ** remaining) picks them.
+        """
+        out = bytearray()
+        state = (self.minimums, -1, 0)
+        free = self._free_state
+        last_char = None
+        for remaining in range(self.length - 1, -1, -1):
+            if state == free:
+                break
+            for block, n, c, ways, same, next_state in self._steps(remaining, state):
+                if index < block:
+                    break
+                index -= block
+            position, index = divmod(index, n)
+            chars = self._raw_classes[c]
+            if same:
+                char = last_char
+            elif ways < len(chars):
+                # Any character of the class except the previous one,
+                # which has its own "same" option
+                skip = chars.index(last_char)
+                char = chars[position + (position >= skip)]
+            else:
+                char = chars[position]
+            out.append(char)
+            last_char = char
+            state = next_state
+        return out, index
+
+    def unrank(self, index):
+        """The index-th valid password (0 <= index < total), as bytes."""
+        out, index = self._prefix(index)
+        alphabet = self._raw_alphabet
+        tail = []
+        for _ in range(self.length - len(out)):
+            index, position = divmod(index, len(alphabet))
+            tail.append(alphabet[position])
+        out.extend(reversed(tail))
+        return bytes(out)
+
+    def generate_bytes(self, count):
+        """count passwords, as a list of bytes objects."""
+        length = self.length
+        if not self.constrained:
+            data = self._sampler.sample(count * length)
+            return [data[i:i + length] for i in range(0, len(data), length)]
+        # Decode only the constrained prefix of each password. The rest is
+        # uniform over the whole alphabet, so it is cut from one block of
+        # random characters instead of decoding it from the index.
+        total = self.total
+        prefix = self._prefix
+        randbelow = secrets.randbelow
+        prefixes = [prefix(randbelow(total))[0] for _ in range(count)]
+        data = self._sampler.sample(count * length - sum(map(len, prefixes)))
+        passwords = []
+        pos = 0
+        for p in prefixes:
+            end = pos + length - len(p)
+            p += data[pos:end]
+            passwords.append(bytes(p))
+            pos = end
+        return passwords
+
+    def generate(self, count):
+        """count passwords, as a list of str."""
+        return [p.decode('latin-1') for p in self.generate_bytes(count)]
+
+    def check(self, password):
+        """True if a password (str) satisfies the policy."""
+        if len(password) != self.length or any(c not in self.alphabet for c in password):
+            return False
+        for chars, minimum in zip(self.classes, self.minimums):
+            if sum(1 for c in password if c in chars) < minimum:
+                return False
+        if self.max_repeat is not None:
+            run = 0
+            previous = None
+            for c in password:
+                run = run + 1 if c == previous else 1
+                if run > self.max_repeat:
+                    return False
+                previous = c
+        return True
+
+
+compile_policy = lru_cache(maxsize=64)(CompiledPolicy)
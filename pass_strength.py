@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Password strength scoring and breached-password checks.
+
+entropy_bits() estimates the entropy of any password from the character
+classes it actually uses (length * log2 of their combined size). For a
+password generated from a policy, policy_entropy() gives the exact
+figure: log2 of the number of passwords the policy can produce.
+
+BreachIndex checks passwords against a large list of breached or common
+passwords without loading the list into memory. build_index() turns a
+text list into a sorted file of 64-bit keys (the first 8 bytes of each
+password's SHA-1, so Have I Been Pwned hash lists can be used directly).
+A 65536-entry table of where each 2-byte key prefix starts narrows every
+lookup to a binary search over a few hundred keys of the memory-mapped
+file. A 100M-entry list is an 800 MB file, of which only the pages
+touched are ever read.
+
+    python pass_strength.py build-index rockyou.txt -o common.idx
+    python pass_strength.py check 'hunter2' --index common.idx
+    python pass_strength.py audit dump.txt --index common.idx --split :
+"""
+
+import argparse
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import string
+import sys
+import tempfile
+from array import array
+from collections import Counter, namedtuple
+
+INDEX_MAGIC = b"PWIDX001"
+KEY_SIZE = 8
+FANOUT = 1 << 16
+_HEADER_SIZE = len(INDEX_MAGIC) + 8 + (FANOUT + 1) * 8
+
+# Environment variable naming the default index used by task3.py
+INDEX_ENV = "PASSWORD_INDEX"
+
+# Size of each character class when it appears in a password
+CLASS_SIZES = (
+    (frozenset(string.ascii_lowercase), 26),
+    (frozenset(string.ascii_uppercase), 26),
+    (frozenset(string.digits), 10),
+    (frozenset(string.punctuation + " "), len(string.punctuation) + 1),
+)
+# Pool size assumed for any other character (accented letters, emoji, ...)
+OTHER_CLASS_SIZE = 100
+
+# Upper bounds (exclusive) of each rating, in bits
+RATINGS = ((28, "Very weak"), (36, "Weak"), (60, "Reasonable"), (128, "Strong"))
+TOP_RATING = "Very strong"
+
+Score = namedtuple("Score", ["bits", "rating", "breached"])
+
+
+def entropy_bits(password):
+    """Entropy estimate from the character classes present in the password."""
+    if not password:
+        return 0.0
+    chars = set(password)
+    pool = 0
+    for members, size in CLASS_SIZES:
+        if not members.isdisjoint(chars):
+            pool += size
+            chars -= members
+    if chars:
+        pool += OTHER_CLASS_SIZE
+    return len(password) * math.log2(pool)
+
+
+def policy_entropy(compiled):
+    """Exact entropy of a password drawn from a pass_policy.CompiledPolicy."""
+    return math.log2(compiled.total)
+
+
+def rating(bits):
+    """Human-readable rating for an entropy in bits."""
+    for limit, label in RATINGS:
+        if bits < limit:
+            return label
+    return TOP_RATING
+
+
+def password_key(password):
+    """The 8-byte index key of a password (str or bytes)."""
+    if isinstance(password, str):
+        # surrogateescape keeps undecodable bytes from dumps hashable as-is
+        password = password.encode('utf-8', 'surrogateescape')
+    return hashlib.sha1(password).digest()[:KEY_SIZE]
+
+
+def _line_key(line, hashed):
+    """Index key for one line of a list: a password, or an SHA-1 hex hash (HASH[:count])."""
+    if hashed:
+        if len(line) < KEY_SIZE * 2:
+            raise ValueError("hash too short")
+        return bytes.fromhex(line[:KEY_SIZE * 2].decode('ascii'))
+    return hashlib.sha1(line).digest()[:KEY_SIZE]
+
+
+def _sorted_runs(lines, hashed, run_size, tmpdir):
+    """Hash lines into sorted temporary run files of at most run_size keys each."""
+    runs = []
+    keys = []
+    for line in lines:
+        line = line.rstrip(b"\r\n")
+        if not line:
+            continue
+        try:
+            keys.append(_line_key(line, hashed))
+        except ValueError:
+            continue  # not a hash line in a hash list
+        if len(keys) >= run_size:
+            runs.append(_write_run(keys, tmpdir))
+            keys = []
+    if keys or not runs:
+        runs.append(_write_run(keys, tmpdir))
+    return runs
+
+
+def _write_run(keys, tmpdir):
+    keys.sort()
+    run = tempfile.TemporaryFile(dir=tmpdir)
+    run.write(b"".join(keys))
+    run.seek(0)
+    return run
+
+
+def _read_keys(run, chunk=KEY_SIZE * 8192):
+    while True:
+        data = run.read(chunk)
+        if not data:
+            return
+        for i in range(0, len(data), KEY_SIZE):
+            yield data[i:i + KEY_SIZE]
+
+
+def build_index(source, output, hashed=False, run_size=2_000_000, tmpdir=None):
+    """
+    Build a BreachIndex file from a list with one password per line.
+
+    source is a path or a binary file. With hashed=True each line is an
+    SHA-1 hex digest instead, optionally followed by ':count' (the Have I
+    Been Pwned format). The list is sorted in runs of run_size keys and
+    merged, so memory stays bounded for any size. Returns the number of
+    distinct keys written.
+    """
+    close = isinstance(source, (str, os.PathLike))
+    lines = open(source, "rb") if close else source
+    try:
+        runs = _sorted_runs(lines, hashed, run_size, tmpdir)
+    finally:
+        if close:
+            lines.close()
+
+    fanout = array('Q', bytes(8 * (FANOUT + 1)))
+    count = 0
+    tmp = output + ".tmp"
+    try:
+        with open(tmp, "wb") as out:
+            out.write(bytes(_HEADER_SIZE))
+            previous = None
+            buffer = []
+            for key in heapq.merge(*(_read_keys(run) for run in runs)):
+                if key == previous:
+                    continue
+                previous = key
+                fanout[(key[0] << 8 | key[1]) + 1] += 1
+                buffer.append(key)
+                count += 1
+                if len(buffer) >= 65536:
+                    out.write(b"".join(buffer))
+                    buffer.clear()
+            out.write(b"".join(buffer))
+
+            # Turn per-prefix counts into start positions
+            for i in range(1, FANOUT + 1):
+                fanout[i] += fanout[i - 1]
+            if sys.byteorder != 'little':
+                fanout.byteswap()
+            out.seek(0)
+            out.write(INDEX_MAGIC + count.to_bytes(8, 'little') + fanout.tobytes())
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, output)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    finally:
+        for run in runs:
+            run.close()
+    return count
+
+
+class BreachIndex:
+    """Memory-mapped sorted index of password keys; `password in index` is a lookup."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            header = self._file.read(_HEADER_SIZE)
+            if len(header) < _HEADER_SIZE or not header.startswith(INDEX_MAGIC):
+                raise ValueError(f"{path} is not a password index")
+            self.count = int.from_bytes(header[8:16], 'little')
+            self._fanout = array('Q', header[16:])
+            if sys.byteorder != 'little':
+                self._fanout.byteswap()
+            size = os.fstat(self._file.fileno()).st_size
+            if size != _HEADER_SIZE + self.count * KEY_SIZE:
+                raise ValueError(f"{path} is truncated")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, password):
+        return self.contains_key(password_key(password))
+
+    def contains_key(self, key):
+        prefix = key[0] << 8 | key[1]
+        lo = self._fanout[prefix]
+        hi = self._fanout[prefix + 1]
+        data = self._map
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = _HEADER_SIZE + mid * KEY_SIZE
+            found = data[pos:pos + KEY_SIZE]
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def default_index():
+    """The BreachIndex named by $PASSWORD_INDEX, or None if unset or unusable."""
+    path = os.environ.get(INDEX_ENV)
+    if not path:
+        return None
+    try:
+        return BreachIndex(path)
+    except (OSError, ValueError):
+        return None
+
+
+def score(password, index=None):
+    """Score one password; breached is None when no index is given."""
+    bits = entropy_bits(password)
+    breached = None if index is None else password in index
+    # A listed password is guessed from the list, whatever its charset
+    return Score(bits, "Breached" if breached else rating(bits), breached)
+
+
+def score_many(passwords, index=None):
+    """Yield a Score for each password of an iterable, e.g. a credential dump."""
+    for password in passwords:
+        yield score(password, index)
+
+
+def _dump_passwords(lines, split):
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if split:
+            line = line.split(split, 1)[-1]
+        yield line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score passwords and check breach lists.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build-index", help="build an index from a password list")
+    build.add_argument("source", help="list with one password (or SHA-1 hash) per line")
+    build.add_argument("-o", "--output", required=True, help="index file to write")
+    build.add_argument("--hashed", action="store_true",
+                       help="lines are SHA-1 hex hashes (HASH or HASH:count)")
+
+    check = commands.add_parser("check", help="score passwords given as arguments")
+    check.add_argument("passwords", nargs="+")
+    check.add_argument("--index", default=os.environ.get(INDEX_ENV), help="breach index")
+
+    audit = commands.add_parser("audit", help="score every password of a file")
+    audit.add_argument("source", nargs="?", default="-", help="file, or - for stdin")
+    audit.add_argument("--index", default=os.environ.get(INDEX_ENV), help="breach index")
+    audit.add_argument("--split", metavar="SEP",
+                       help="lines are user<SEP>password; score the part after SEP")
+    audit.add_argument("--quiet", action="store_true", help="print the summary only")
+    args = parser.parse_args(argv)
+
+    if args.command == "build-index":
+        count = build_index(args.source, args.output, args.hashed)
+        print(f"{count:,} distinct entries written to {args.output}")
+        return 0
+
+    index = BreachIndex(args.index) if args.index else None
+    try:
+        if args.command == "check":
+            for password in args.passwords:
+                result = score(password, index)
+                print(f"{result.rating:<12}{result.bits:6.1f} bits  {password}")
+            return 0
+
+        infile = (sys.stdin if args.source == "-"
+                  else open(args.source, "r", encoding="utf-8", errors="surrogateescape"))
+        ratings = Counter()
+        try:
+            out = sys.stdout
+            for number, result in enumerate(
+                    score_many(_dump_passwords(infile, args.split), index), 1):
+                ratings[result.rating] += 1
+                if not args.quiet:
+                    out.write(f"{number}\t{result.bits:.1f}\t{result.rating}\n")
+        finally:
+            if infile is not sys.stdin:
+                infile.close()
+        total = sum(ratings.values())
+        print(f"{total:,} passwords scored", file=sys.stderr)
+        for label in ["Breached"] + [label for _, label in RATINGS] + [TOP_RATING]:
+            if ratings[label]:
+                print(f"  {label:<12}{ratings[label]:>12,} ({ratings[label] / total:.1%})",
+                      file=sys.stderr)
+        return 0
+    finally:
+        if index is not None:
+            index.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
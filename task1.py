@@ -1,8 +1,46 @@
+import queue
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
-from datetime import datetime
-import json
-import os
+from tkinter import ttk, messagebox, simpledialog, filedialog
+from todo_client import RemoteStore, TodoServerError, connect
+from todo_engine import TaskEngine
+from todo_persist import WriteBehindStore
+from todo_stats import FILTERS
+from todo_store import StoreLockedError, open_store
+from todo_task import Task
+from todo_trace import TRACER
+
+# Treeview row height in pixels, used to work out how many rows fit on screen
+ROW_HEIGHT = 30
+
+# Wait this long after the last keystroke before running a search (ms)
+SEARCH_DELAY = 150
+
+# How often to check on background saves while some are outstanding (ms)
+PERSIST_POLL = 250
+
+# Saves slower than this are reported in the status bar (seconds)
+SLOW_SAVE = 0.5
+
+# Tasks read per chunk while the window fills in at startup
+LOAD_CHUNK = 5000
+
+# Column titles; a sort arrow is appended to the active one
+HEADINGS = {'Task': 'Task Description', 'Priority': 'Priority', 'Status': 'Status',
+            'Created': 'Created Date', 'Completed': 'Completed Date', 'Due': 'Due'}
+
+# Keep a binary tasks.json.snap for fast startup (tasks.json is still written on exit)
+BINARY_SNAPSHOT = True
+
+# How often the profiling overlay refreshes while tracing is on (ms)
+TRACE_OVERLAY_INTERVAL = 1000
+
+# How often changes pushed by the task server are picked up (ms)
+SERVER_POLL = 100
+
+# Longest single wait of the deadline timer (s), so a changed system clock
+# or a suspended machine is noticed within this long
+DEADLINE_MAX_WAIT = 3600
 
 class TodoApp:
     def __init__(self, root):
@@ -11,23 +49,63 @@ class TodoApp:
         self.root.geometry("950x700")
         self.root.configure(bg='#f9fafb')
 
-        # Data storage
-        self.tasks = []
+        # Data storage: all task logic lives in the engine. When a
+        # todo_server runs for the file, changes go through it and the
+        # engine is a copy kept current by its events, so several windows
+        # can share one list. Otherwise this window owns the file, and a
+        # second window finds it locked and opens it read-only.
         self.data_file = "tasks.json"
+        self.read_only = False
+        self.client = connect(self.data_file)
+        if self.client is not None:
+            self.persister = None
+            self.engine = TaskEngine(self.data_file, store=RemoteStore(self.client))
+            self.client.subscribe()
+            self.changes = self.client
+        else:
+            self.persister = WriteBehindStore(open_store(self.data_file, BINARY_SNAPSHOT))
+            self.engine = TaskEngine(self.data_file, store=self.persister)
+            self.changes = self.engine
+        self.engine.subscribe(self.on_tasks_changed)
+        self.server_job = None
+        self.deadline_job = None
+        self.search_job = None
+        self.persist_job = None
+        self.stats_job = None
+        self.trace_job = None
+        self.load_iter = None
         self.dark_mode = False
 
-        # Load existing tasks
-        self.load_tasks()
+        # Virtual list state: the full result set lives in view_tasks and
+        # only the rows inside the visible window exist in the Treeview
+        self.view_tasks = []
+        self.view_key = None
+        self.view_dirty = True
+        self.view_offset = 0
+        self.page_size = 20
+        self.rendered = {}
+
+        # Sorting/grouping state, driven by the column headings
+        self.sort_column = None
+        self.sort_reverse = False
 
         # Apply styles
         self.setup_styles()
 
         # Create GUI
         self.create_widgets()
+        self.create_menu()
+        self.update_trace_overlay()
 
         # Update task display
         self.refresh_task_list()
 
+        # Load existing tasks in chunks once the window is up
+        self.load_tasks()
+
+        # Fold the journal into tasks.json on exit
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
     def setup_styles(self):
         self.style = ttk.Style()
         self.style.theme_use("clam")
@@ -45,7 +123,7 @@ class TodoApp:
                              background="#2563eb", foreground="white")
         self.style.map("TButton", background=[("active", "#1d4ed8")])
         self.style.configure("Treeview", font=("Segoe UI", 11),
-                             rowheight=30, background="white",
+                             rowheight=ROW_HEIGHT, background="white",
                              fieldbackground="white")
         self.style.configure("Treeview.Heading",
                              font=("Segoe UI", 11, "bold"),
@@ -59,7 +137,7 @@ class TodoApp:
                              background="#3b82f6", foreground="white")
         self.style.map("TButton", background=[("active", "#1d4ed8")])
         self.style.configure("Treeview", font=("Segoe UI", 11),
-                             rowheight=30, background="#0f172a",
+                             rowheight=ROW_HEIGHT, background="#0f172a",
                              fieldbackground="#0f172a", foreground="white")
         self.style.configure("Treeview.Heading",
                              font=("Segoe UI", 11, "bold"),
@@ -98,8 +176,14 @@ class TodoApp:
                                      values=["High", "Medium", "Low"], state="readonly", width=12)
         priority_combo.grid(row=0, column=1, padx=(0, 10))
 
+        # Optional due date: YYYY-MM-DD or YYYY-MM-DD HH:MM
+        ttk.Label(input_frame, text="📅 Due:").grid(row=0, column=2, padx=(0, 5))
+        self.due_entry = ttk.Entry(input_frame, width=16, font=("Segoe UI", 11))
+        self.due_entry.grid(row=0, column=3, padx=(0, 10))
+        self.due_entry.bind('<Return>', lambda e: self.add_task())
+
         add_btn = ttk.Button(input_frame, text="➕ Add Task", command=self.add_task)
-        add_btn.grid(row=0, column=2)
+        add_btn.grid(row=0, column=4)
 
         # Search bar
         search_frame = ttk.Frame(self.root)
@@ -109,32 +193,55 @@ class TodoApp:
         self.search_var = tk.StringVar()
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=30)
         search_entry.pack(side=tk.LEFT, padx=5)
-        search_entry.bind("<KeyRelease>", lambda e: self.refresh_task_list())
+
+        self.group_var = tk.StringVar(value="No Grouping")
+        group_combo = ttk.Combobox(search_frame, textvariable=self.group_var,
+                                   values=["No Grouping", "Group by Priority", "Group by Status"],
+                                   state="readonly", width=18)
+        group_combo.pack(side=tk.RIGHT, padx=5)
+        group_combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_task_list())
+        search_entry.bind("<KeyRelease>", lambda e: self.schedule_search())
 
         # Task list frame
         list_frame = ttk.LabelFrame(self.root, text="📌 Tasks", padding="10")
         list_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 15))
 
-        columns = ('Task', 'Priority', 'Status', 'Created', 'Completed')
+        columns = ('Task', 'Priority', 'Status', 'Created', 'Completed', 'Due')
         self.task_tree = ttk.Treeview(list_frame, columns=columns, show='headings')
 
-        self.task_tree.heading('Task', text='Task Description')
-        self.task_tree.heading('Priority', text='Priority')
-        self.task_tree.heading('Status', text='Status')
-        self.task_tree.heading('Created', text='Created Date')
-        self.task_tree.heading('Completed', text='Completed Date')
+        for column in columns:
+            self.task_tree.heading(column, text=HEADINGS[column],
+                                   command=lambda c=column: self.sort_by(c))
 
-        self.task_tree.column('Task', width=350)
+        self.task_tree.column('Task', width=300)
         self.task_tree.column('Priority', width=90, anchor="center")
         self.task_tree.column('Status', width=120, anchor="center")
         self.task_tree.column('Created', width=120, anchor="center")
         self.task_tree.column('Completed', width=120, anchor="center")
+        self.task_tree.column('Due', width=140, anchor="center")
+
+        self.task_tree.tag_configure("completed", foreground="gray")
+        self.task_tree.tag_configure("overdue", foreground="#b91c1c",
+                                     font=("Segoe UI", 11, "bold"))
+        self.task_tree.tag_configure("high", foreground="red")
+        self.task_tree.tag_configure("medium", foreground="orange")
+        self.task_tree.tag_configure("low", foreground="green")
+        self.task_tree.tag_configure("group", font=("Segoe UI", 11, "bold"), background="#e5e7eb")
 
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.task_tree.yview)
-        self.task_tree.configure(yscrollcommand=scrollbar.set)
+        # The scrollbar drives view_offset instead of the Treeview itself
+        self.scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.on_scrollbar)
 
         self.task_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.task_tree.bind("<Configure>", self.on_tree_resize)
+        self.task_tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.task_tree.bind("<Button-4>", self.on_mousewheel)
+        self.task_tree.bind("<Button-5>", self.on_mousewheel)
+        self.task_tree.bind("<Up>", self.on_tree_arrow)
+        self.task_tree.bind("<Down>", self.on_tree_arrow)
+        self.task_tree.bind("<Prior>", lambda e: self.scroll_rows(-self.page_size))
+        self.task_tree.bind("<Next>", lambda e: self.scroll_rows(self.page_size))
 
         # Buttons frame
         buttons_frame = ttk.Frame(self.root)
@@ -142,6 +249,7 @@ class TodoApp:
 
         ttk.Button(buttons_frame, text="✅ Complete", command=self.mark_complete).pack(side=tk.LEFT, padx=6)
         ttk.Button(buttons_frame, text="✏️ Edit", command=self.edit_task).pack(side=tk.LEFT, padx=6)
+        ttk.Button(buttons_frame, text="⏰ Due / Reminder", command=self.edit_due).pack(side=tk.LEFT, padx=6)
         ttk.Button(buttons_frame, text="🗑️ Delete", command=self.delete_task).pack(side=tk.LEFT, padx=6)
         ttk.Button(buttons_frame, text="🧹 Clear Completed", command=self.clear_completed).pack(side=tk.LEFT, padx=6)
 
@@ -150,12 +258,10 @@ class TodoApp:
         bottom_frame.pack(fill=tk.X, pady=10, padx=20)
 
         self.filter_var = tk.StringVar(value="All")
-        filter_combo = ttk.Combobox(bottom_frame, textvariable=self.filter_var,
-                                   values=["All", "Pending", "Completed", "High Priority",
-                                           "Medium Priority", "Low Priority"],
-                                   state="readonly", width=18)
-        filter_combo.pack(side=tk.LEFT, padx=5)
-        filter_combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_task_list())
+        self.filter_combo = ttk.Combobox(bottom_frame, textvariable=self.filter_var,
+                                         values=FILTERS, state="readonly", width=24)
+        self.filter_combo.pack(side=tk.LEFT, padx=5)
+        self.filter_combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_task_list())
 
         # Progress bar
         self.progress = ttk.Progressbar(bottom_frame, orient="horizontal", length=200, mode="determinate")
@@ -165,80 +271,127 @@ class TodoApp:
                                      font=("Segoe UI", 10, "italic"))
         self.stats_label.pack(side=tk.RIGHT, padx=(0, 20))
 
+        # Live timings, shown only while profiling is on
+        self.trace_label = ttk.Label(bottom_frame, text="", font=("Consolas", 9),
+                                     foreground="#6b7280")
+
+    def create_menu(self):
+        menubar = tk.Menu(self.root)
+        debug_menu = tk.Menu(menubar, tearoff=0)
+        self.trace_var = tk.BooleanVar(value=TRACER.enabled)
+        debug_menu.add_checkbutton(label="Profiling Overlay", variable=self.trace_var,
+                                   command=self.toggle_tracing)
+        debug_menu.add_command(label="Export Trace...", command=self.export_trace)
+        debug_menu.add_command(label="Reset Timings", command=TRACER.reset)
+        menubar.add_cascade(label="Debug", menu=debug_menu)
+        self.root.config(menu=menubar)
+
+    @property
+    def tasks(self):
+        return self.engine.tasks
+
     def add_task(self):
+        if self.still_loading():
+            return
         text = self.task_entry.get().strip()
         if not text:
             self.update_status("⚠️ Please enter a task!", "red")
             return
 
-        task = {
-            'id': len(self.tasks) + 1,
-            'description': text,
-            'priority': self.priority_var.get(),
-            'status': 'Pending',
-            'created_date': datetime.now().strftime('%Y-%m-%d'),
-            'completed_date': ''
-        }
-        self.tasks.append(task)
+        if self.change('add', text, self.priority_var.get(), self.due_entry.get()) is None:
+            return
         self.task_entry.delete(0, tk.END)
-        self.save_tasks()
+        self.due_entry.delete(0, tk.END)
         self.refresh_task_list()
         self.update_status("✅ Task added!", "green")
 
+    def selected_ids(self):
+        # Row iids are task ids; group header rows are skipped
+        return [int(iid) for iid in self.task_tree.selection() if iid.isdigit()]
+
     def mark_complete(self):
-        selected = self.task_tree.selection()
+        if self.still_loading():
+            return
+        selected = self.selected_ids()
         if not selected:
             self.update_status("⚠️ Select a task first!", "red")
             return
-        item = self.task_tree.item(selected[0])
-        desc = item['values'][0]
 
-        for task in self.tasks:
-            if task['description'] == desc:
-                task['status'] = 'Completed'
-                task['completed_date'] = datetime.now().strftime('%Y-%m-%d')
-                break
-        self.save_tasks()
+        completed = self.change('complete', *selected)
+        if completed is None:
+            return
         self.refresh_task_list()
-        self.update_status("🎉 Task completed!", "green")
+        if len(completed) > 1:
+            self.update_status(f"🎉 {len(completed)} tasks completed!", "green")
+        else:
+            self.update_status("🎉 Task completed!", "green")
 
     def edit_task(self):
-        selected = self.task_tree.selection()
+        if self.still_loading():
+            return
+        selected = self.selected_ids()
         if not selected:
             self.update_status("⚠️ Select a task to edit!", "red")
             return
-        item = self.task_tree.item(selected[0])
-        desc = item['values'][0]
-
-        task = next((t for t in self.tasks if t['description'] == desc), None)
+        task = self.engine.get(selected[0])
         if not task:
             return
 
-        new_desc = simpledialog.askstring("Edit Task", "Enter new description:", initialvalue=desc)
+        new_desc = simpledialog.askstring("Edit Task", "Enter new description:",
+                                          initialvalue=task['description'])
         if new_desc and new_desc.strip():
-            task['description'] = new_desc.strip()
-            self.save_tasks()
+            if self.change('edit', task.id, new_desc) is None:
+                return
             self.refresh_task_list()
             self.update_status("✏️ Task updated!", "green")
 
+    def edit_due(self):
+        if self.still_loading():
+            return
+        selected = self.selected_ids()
+        if not selected:
+            self.update_status("⚠️ Select a task first!", "red")
+            return
+        task = self.engine.get(selected[0])
+        if not task:
+            return
+
+        due = simpledialog.askstring("Due Date", "Due (YYYY-MM-DD or YYYY-MM-DD HH:MM),\n"
+                                     "empty for none:", initialvalue=task.due_date)
+        if due is None:
+            return
+        reminder = simpledialog.askstring("Reminder", "Remind at (YYYY-MM-DD HH:MM),\n"
+                                          "empty for none:", initialvalue=task.reminder)
+        if reminder is None:
+            return
+        if self.change('set_due', task.id, due, reminder) is not None:
+            self.refresh_task_list()
+            self.update_status("⏰ Due date updated!", "green")
+
     def delete_task(self):
-        selected = self.task_tree.selection()
+        if self.still_loading():
+            return
+        selected = self.selected_ids()
         if not selected:
             self.update_status("⚠️ Select a task to delete!", "red")
             return
-        item = self.task_tree.item(selected[0])
-        desc = item['values'][0]
 
-        self.tasks = [t for t in self.tasks if t['description'] != desc]
-        self.save_tasks()
+        removed = self.change('delete', *selected)
+        if removed is None:
+            return
         self.refresh_task_list()
-        self.update_status("🗑️ Task deleted!", "green")
+        if len(removed) > 1:
+            self.update_status(f"🗑️ {len(removed)} tasks deleted!", "green")
+        else:
+            self.update_status("🗑️ Task deleted!", "green")
 
     def clear_completed(self):
-        before = len(self.tasks)
-        self.tasks = [t for t in self.tasks if t['status'] != 'Completed']
-        cleared = before - len(self.tasks)
-        self.save_tasks()
+        if self.still_loading():
+            return
+        cleared = self.change('clear_completed')
+        if cleared is None:
+            return
+        cleared = len(cleared)
         self.refresh_task_list()
         if cleared > 0:
             self.update_status(f"🧹 Cleared {cleared} task(s)!", "green")
@@ -246,68 +399,416 @@ class TodoApp:
             self.update_status("ℹ️ No completed tasks!", "blue")
 
     def refresh_task_list(self):
-        for i in self.task_tree.get_children():
-            self.task_tree.delete(i)
+        with TRACER.span("refresh") as span:
+            self._refresh_task_list()
+            span.set(rows=len(self.view_tasks), rendered=len(self.rendered))
 
+    def _refresh_task_list(self):
         search = self.search_var.get().lower()
-        filter_val = self.filter_var.get()
-        tasks = self.tasks
-
-        if filter_val == "Pending":
-            tasks = [t for t in tasks if t['status'] == "Pending"]
-        elif filter_val == "Completed":
-            tasks = [t for t in tasks if t['status'] == "Completed"]
-        elif filter_val.endswith("Priority"):
-            pr = filter_val.split()[0]
-            tasks = [t for t in tasks if t['priority'] == pr]
+        filter_val = self.current_filter()
+        group_by = self.current_group()
+        key = (filter_val, search, self.sort_column, self.sort_reverse, group_by)
+
+        # Only re-run the query when the tasks or the query changed;
+        # scrolling and theme changes just re-render the window
+        if self.view_dirty or key != self.view_key:
+            tasks = self.query_tasks(filter_val, search)
+            if group_by is not None:
+                tasks = self.with_group_headers(tasks, group_by)
+            self.view_tasks = tasks
+            self.view_key = key
+            self.view_dirty = False
+
+        self.render_window()
+        self.update_statistics()
 
-        if search:
-            tasks = [t for t in tasks if search in t['description'].lower()]
+    def current_group(self):
+        choice = self.group_var.get()
+        if choice == "No Grouping":
+            return None
+        return choice.split()[-1].lower()
+
+    def sort_by(self, column):
+        # First click sorts ascending, second descending, third restores insertion order
+        if self.sort_column != column:
+            self.sort_column, self.sort_reverse = column, False
+        elif not self.sort_reverse:
+            self.sort_reverse = True
+        else:
+            self.sort_column, self.sort_reverse = None, False
+        for name, text in HEADINGS.items():
+            if name == self.sort_column:
+                text += " ▼" if self.sort_reverse else " ▲"
+            self.task_tree.heading(name, text=text)
+        self.view_offset = 0
+        self.refresh_task_list()
 
+    def with_group_headers(self, tasks, group_by):
+        # Tasks arrive ordered by group, so one pass finds every group boundary
+        rows = []
+        header = None
         for t in tasks:
-            tags = []
-            if t['status'] == "Completed":
-                tags.append("completed")
-            elif t['priority'] == "High":
-                tags.append("high")
-            elif t['priority'] == "Medium":
-                tags.append("medium")
-            else:
-                tags.append("low")
-
-            self.task_tree.insert("", tk.END, values=(t['description'], t['priority'],
-                                t['status'], t['created_date'], t['completed_date']), tags=tags)
-
-        self.task_tree.tag_configure("completed", foreground="gray")
-        self.task_tree.tag_configure("high", foreground="red")
-        self.task_tree.tag_configure("medium", foreground="orange")
-        self.task_tree.tag_configure("low", foreground="green")
+            value = t[group_by]
+            if header is None or header[1] != value:
+                header = ['group', value, 0]
+                rows.append(header)
+            header[2] += 1
+            rows.append(t)
+        return rows
+
+    def schedule_search(self):
+        # Debounce: restart the timer on every keystroke
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(SEARCH_DELAY, self.run_search)
+
+    def run_search(self):
+        self.search_job = None
+        self.refresh_task_list()
 
-        self.update_statistics()
+    def query_tasks(self, filter_val, search):
+        return self.engine.query(filter_val, search, self.sort_column,
+                                 self.sort_reverse, self.current_group())
+
+    def row_tag(self, t):
+        if t.status == "Completed":
+            return "completed"
+        elif t.id in self.engine.deadlines.overdue:
+            return "overdue"
+        elif t.priority == "High":
+            return "high"
+        elif t.priority == "Medium":
+            return "medium"
+        return "low"
+
+    def row_for(self, row):
+        # (iid, values, tag) for a task or a group header row
+        if isinstance(row, Task):
+            due = row.due_date
+            if due and row.id in self.engine.deadlines.overdue:
+                due = f"⚠ {due}"
+            values = (row.description, row.priority, row.status,
+                      row.created_date, row.completed_date, due)
+            return str(row.id), values, self.row_tag(row)
+        _, value, count = row
+        return f"group:{value}", (f"▸ {value} ({count:,})", "", "", "", "", ""), "group"
+
+    def render_window(self):
+        total = len(self.view_tasks)
+        self.view_offset = max(0, min(self.view_offset, total - self.page_size))
+        window = self.view_tasks[self.view_offset:self.view_offset + self.page_size]
+
+        # Diff the window against the rows already in the Treeview:
+        # drop rows that scrolled out, add new ones, touch only changed ones.
+        # Row iids are the task ids, so selections map straight back to tasks
+        rows = [self.row_for(row) for row in window]
+        wanted = {iid for iid, _, _ in rows}
+        for iid in [i for i in self.rendered if i not in wanted]:
+            del self.rendered[iid]
+            self.task_tree.delete(iid)
+
+        for index, (iid, values, tag) in enumerate(rows):
+            old_values = self.rendered.get(iid)
+            if old_values is None:
+                self.task_tree.insert("", index, iid=iid, values=values, tags=(tag,))
+                self.rendered[iid] = values
+                continue
+            if old_values != values:
+                self.task_tree.item(iid, values=values, tags=(tag,))
+                self.rendered[iid] = values
+            if self.task_tree.index(iid) != index:
+                self.task_tree.move(iid, "", index)
+
+        if total:
+            self.scrollbar.set(self.view_offset / total,
+                               (self.view_offset + len(window)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_rows(self, delta):
+        self.view_offset += delta
+        self.render_window()
+        return "break"
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.view_offset = int(float(amount) * len(self.view_tasks))
+            self.render_window()
+        elif action == "scroll":
+            step = self.page_size if unit == "pages" else 1
+            self.scroll_rows(int(amount) * step)
+
+    def on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            return self.scroll_rows(-3)
+        return self.scroll_rows(3)
+
+    def on_tree_arrow(self, event):
+        # Arrow keys past the first/last materialized row scroll the window
+        children = self.task_tree.get_children()
+        if not children:
+            return None
+        step = -1 if event.keysym == "Up" else 1
+        edge = children[0] if step < 0 else children[-1]
+        if self.task_tree.focus() != edge:
+            return None
+        before = self.view_offset
+        self.scroll_rows(step)
+        if self.view_offset != before:
+            children = self.task_tree.get_children()
+            edge = children[0] if step < 0 else children[-1]
+            self.task_tree.focus(edge)
+            self.task_tree.selection_set(edge)
+        return "break"
+
+    def on_tree_resize(self, event):
+        # Subtract the heading row; whatever remains is the viewport
+        page_size = max(1, (event.height - ROW_HEIGHT) // ROW_HEIGHT)
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.render_window()
+
+    def current_filter(self):
+        # The combobox text carries a count, so go by position instead
+        index = self.filter_combo.current()
+        return FILTERS[index] if index >= 0 else "All"
 
     def update_statistics(self):
-        total = len(self.tasks)
-        completed = sum(1 for t in self.tasks if t['status'] == "Completed")
-        pending = total - completed
+        total = self.engine.counters.total
+        completed = self.engine.counters.completed
+        pending = self.engine.counters.pending
         self.stats_label.config(text=f"📊 Total: {total} | Pending: {pending} | Completed: {completed}")
         self.progress["maximum"] = total if total else 1
         self.progress["value"] = completed
 
+        labels = self.engine.counters.filter_labels()
+        index = self.filter_combo.current()
+        self.filter_combo["values"] = labels
+        self.filter_var.set(labels[index if index >= 0 else 0])
+
     def update_status(self, msg, color="black"):
         self.stats_label.config(text=msg, foreground=color)
-        self.root.after(3000, self.update_statistics)
+        # Keep a single pending reset instead of stacking one per message
+        if self.stats_job is not None:
+            self.root.after_cancel(self.stats_job)
+        self.stats_job = self.root.after(3000, self.reset_status)
+
+    def reset_status(self):
+        self.stats_job = None
+        self.update_statistics()
 
-    def save_tasks(self):
-        with open(self.data_file, "w") as f:
-            json.dump(self.tasks, f, indent=2)
+    def toggle_tracing(self):
+        TRACER.enable(self.trace_var.get())
+        self.update_trace_overlay()
+
+    def update_trace_overlay(self):
+        if self.trace_job is not None:
+            self.root.after_cancel(self.trace_job)
+            self.trace_job = None
+        if not TRACER.enabled:
+            self.trace_label.pack_forget()
+            return
+        if not self.trace_label.winfo_manager():
+            self.trace_label.pack(side=tk.RIGHT, padx=(0, 20), before=self.stats_label)
+        self.trace_label.config(text=TRACER.overlay_text())
+        self.trace_job = self.root.after(TRACE_OVERLAY_INTERVAL, self.update_trace_overlay)
+
+    def export_trace(self):
+        path = filedialog.asksaveasfilename(title="Export Trace", defaultextension=".json",
+                                            initialfile="todo-trace.json",
+                                            filetypes=[("Chrome trace", "*.json")])
+        if not path:
+            return
+        try:
+            TRACER.export(path)
+        except OSError as e:
+            messagebox.showerror("Export Failed", f"Could not write {path}:\n{e}")
+            return
+        self.update_status(f"⏱ Trace written to {path}", "green")
+
+    def change(self, name, *args):
+        """Run a task change on the engine or the server. Returns None if it failed."""
+        if self.read_only:
+            self.update_status("🔒 Read-only: the list is open in another window", "red")
+            return None
+        try:
+            result = getattr(self.changes, name)(*args)
+        except (TodoServerError, OSError, ValueError) as e:
+            self.update_status(f"❌ {e}", "red")
+            return None
+        if self.client is not None:
+            # The server sends a change's event before its response, so
+            # this picks up our own change along with anyone else's
+            self.apply_server_events()
+        return result
+
+    def apply_server_events(self):
+        """Apply queued task server events to the engine. True if anything changed."""
+        changed = False
+        while True:
+            try:
+                event = self.client.events.get_nowait()
+            except queue.Empty:
+                return changed
+            if event['event'] == 'changed':
+                self.engine.apply([Task.from_dict(t) for t in event['tasks']],
+                                  event['deleted'])
+                changed = True
+            elif event['event'] == 'closed':
+                self.update_status("❌ Lost the task server; changes will fail", "red")
+
+    def poll_server(self):
+        self.server_job = None
+        if self.apply_server_events():
+            self.refresh_task_list()
+        if not self.client.closed or not self.client.events.empty():
+            self.server_job = self.root.after(SERVER_POLL, self.poll_server)
+
+    def arm_deadline_timer(self):
+        """One Tk timer for the next due date or reminder, whatever the number of tasks."""
+        if self.deadline_job is not None:
+            self.root.after_cancel(self.deadline_job)
+            self.deadline_job = None
+        when = self.engine.next_deadline()
+        if when is None:
+            return
+        wait = min(max(when - time.time(), 0), DEADLINE_MAX_WAIT)
+        self.deadline_job = self.root.after(int(wait * 1000) + 1, self.on_deadline)
+
+    def on_deadline(self):
+        self.deadline_job = None
+        overdue, reminders = self.engine.check_deadlines()
+        if overdue or reminders:
+            self.view_dirty = True
+            self.refresh_task_list()
+        if reminders:
+            self.root.bell()
+            first = reminders[0].description
+            more = f" (+{len(reminders) - 1} more)" if len(reminders) > 1 else ""
+            self.update_status(f"⏰ Reminder: {first}{more}", "blue")
+            # A reminder is shown once: clear it so it does not fire again
+            # on the next start (the window that owns the file does that)
+            if not self.read_only:
+                for task in reminders:
+                    self.change('set_due', task.id, task.due_date, "")
+        elif overdue:
+            self.update_status(f"⚠️ {len(overdue)} task(s) now overdue", "red")
+        self.arm_deadline_timer()
+
+    def on_tasks_changed(self, changed, deleted):
+        self.view_dirty = True
+        # A change may have moved the next deadline; re-arming is O(1)
+        if self.load_iter is None:
+            self.arm_deadline_timer()
+        if self.persister is not None and self.persist_job is None:
+            self.persist_job = self.root.after(PERSIST_POLL, self.check_persist)
+
+    def check_persist(self):
+        # Runs on the Tk thread; the persister only ever fills a queue
+        self.persist_job = None
+        while True:
+            try:
+                count, seconds, error = self.persister.results.get_nowait()
+            except queue.Empty:
+                break
+            if error is not None:
+                self.update_status(f"❌ Save failed, retrying: {error}", "red")
+            elif seconds > SLOW_SAVE:
+                self.update_status(f"💾 Saved {count} change(s) in {seconds * 1000:.0f} ms", "orange")
+        if self.persister.busy():
+            self.persist_job = self.root.after(PERSIST_POLL, self.check_persist)
 
     def load_tasks(self):
-        if os.path.exists(self.data_file):
-            with open(self.data_file, "r") as f:
-                try:
-                    self.tasks = json.load(f)
-                except:
-                    self.tasks = []
+        self.load_iter = self.engine.load_chunks(LOAD_CHUNK)
+        self.update_status("⏳ Loading tasks...", "blue")
+        self.root.after(0, self.load_next_chunk)
+
+    def load_next_chunk(self):
+        try:
+            loaded = next(self.load_iter)
+        except StopIteration:
+            self.load_iter = None
+            self.view_dirty = True
+            self.refresh_task_list()
+            if self.engine.load_error:
+                self.update_status("⚠️ Some tasks could not be read!", "red")
+                messagebox.showwarning("Load Problem",
+                                       f"Some tasks could not be read:\n{self.engine.load_error}")
+            else:
+                source = " from the task server" if self.client is not None else ""
+                self.update_status(f"📂 Loaded {len(self.tasks):,} tasks{source}", "green")
+            if self.client is not None:
+                # Changes made by others while loading are queued; apply them now
+                self.poll_server()
+            # Reports what came due while the app was closed, then arms the timer
+            self.on_deadline()
+            return
+        except StoreLockedError as e:
+            self.open_read_only(e)
+            return
+        except Exception as e:
+            # Nothing was saved yet, so close without touching the files
+            self.load_iter = None
+            messagebox.showerror("Load Failed", f"Could not open {self.data_file}:\n{e}")
+            self.root.destroy()
+            return
+
+        self.view_dirty = True
+        self.refresh_task_list()
+        self.update_status(f"⏳ Loading tasks... {loaded:,}", "blue")
+        self.root.after(1, self.load_next_chunk)
+
+    def open_read_only(self, reason):
+        """Another window owns the file and no server shares it: show, but never write."""
+        self.persister.close()
+        self.persister = None
+        self.read_only = True
+        self.engine = TaskEngine(self.data_file, store=open_store(self.data_file, read_only=True))
+        self.engine.subscribe(self.on_tasks_changed)
+        self.changes = self.engine
+        self.root.title("✨ To-Do List Manager (read-only)")
+        messagebox.showinfo("Opened Read-Only",
+                            f"{reason}.\n\nThis window shows the tasks saved so far but "
+                            "cannot change them. To edit the list from several windows, "
+                            "close them all and start todo_server.py first.")
+        self.load_tasks()
+
+    def still_loading(self):
+        # Ids are not final until the journal has been replayed
+        if self.load_iter is not None:
+            self.update_status("⏳ Still loading tasks, please wait!", "orange")
+            return True
+        return False
+
+    def on_close(self):
+        if self.load_iter is not None:
+            # Closing mid-load: the store has nothing new to write
+            self.root.destroy()
+            return
+        # Blocks only for whatever is still queued
+        while True:
+            try:
+                self.engine.close()
+                break
+            except (OSError, ValueError) as e:
+                # The changes are still queued and the writer keeps trying
+                self.update_status(f"❌ Save failed: {e}", "red")
+                if not messagebox.askretrycancel(
+                        "Save Failed", f"Your latest changes could not be saved:\n{e}\n\n"
+                        "Retry now, or Cancel to keep the window open and try again later."):
+                    return
+        if self.persist_job is not None:
+            self.root.after_cancel(self.persist_job)
+        if self.server_job is not None:
+            self.root.after_cancel(self.server_job)
+        if self.deadline_job is not None:
+            self.root.after_cancel(self.deadline_job)
+        if TRACER.export_path:
+            try:
+                TRACER.export()
+            except OSError:
+                pass  # Nowhere to report it any more; the tasks are saved
+        self.root.destroy()
 
 def main():
     root = tk.Tk()
@@ -4,12 +4,28 @@ Simple Calculator Program
 A basic calculator that performs arithmetic operations on two numbers.
 Author: Human-like Code
 Date: 2025
+
+Run with a file name, or pipe input into it, to use the non-interactive
+streaming mode instead (see calc_stream.py):
+
+    python task2.py calculations.txt
+    echo "12 * 7" | python task2.py
+
+On a terminal, --mode (with --precision/--rounding for decimal) picks the
+number type for the interactive calculator too (see calc_numeric.py):
+
+    python task2.py --mode fraction
 """
 
-def get_number(prompt):
+import sys
+from decimal import Decimal
+from fractions import Fraction
+
+def get_number(prompt, parse=float):
     """
     Get a valid number from user input.
     Keeps asking until a valid number is entered.
+    parse turns the text into a number (float, or a backend from calc_numeric).
     """
     while True:
         try:
@@ -17,7 +33,7 @@ def get_number(prompt):
             if not user_input:
                 print("Please enter a number, don't leave it empty!")
                 continue
-            number = float(user_input)
+            number = parse(user_input)
             return number
         except ValueError:
             print("That's not a valid number. Please try again.")
@@ -75,11 +91,29 @@ def format_result(result):
     """
     Format the result to look nice.
     Removes unnecessary decimal places for whole numbers.
+    Fractions are shown exactly (e.g. 1/3) and Decimals with all their digits.
     """
-    if result == int(result):
-        return str(int(result))
-    else:
-        return f"{result:.6f}".rstrip('0').rstrip('.')
+    if type(result) is float:
+        # is_integer() is False for inf and nan, which format as 'inf'/'nan'
+        if result.is_integer():
+            return '%d' % result
+        return ('%.6f' % result).rstrip('0').rstrip('.')
+    if isinstance(result, Fraction):
+        return str(result)
+    if isinstance(result, Decimal):
+        if not result.is_finite():
+            return str(result)
+        if result == result.to_integral_value():
+            limit = getattr(sys, 'get_int_max_str_digits', lambda: 0)()
+            if limit and result.adjusted() >= limit:
+                # str(int(...)) would refuse too, after a slow conversion
+                raise ValueError(f"Exceeds the limit ({limit} digits) for integer string conversion")
+            return str(int(result))
+        return format(result.normalize(), 'f')
+    if isinstance(result, float):
+        # Float subclasses such as numpy.float64
+        return format_result(float(result))
+    return str(int(result))
 
 def display_result(num1, num2, operation, result, operation_name):
     """
@@ -106,30 +140,38 @@ def ask_continue():
         else:
             print("Please enter 'y' for yes or 'n' for no.")
 
-def main():
+def main(backend=None):
     """
     Main function that runs the calculator program.
+    backend is an optional calc_numeric.NumberBackend for Decimal or Fraction maths.
     """
+    parse = backend.parse if backend is not None else float
     print("="*50)
     print("        WELCOME TO SIMPLE CALCULATOR")
     print("="*50)
     print("This calculator can perform basic arithmetic operations")
     print("on two numbers: addition, subtraction, multiplication, and division.")
+    if backend is not None:
+        print(f"Numbers are calculated in {backend.mode} mode.")
     
     while True:
         try:
             # Get the first number
             print("\n" + "-"*30)
-            num1 = get_number("Enter the first number: ")
+            num1 = get_number("Enter the first number: ", parse)
             
             # Get the operation
             operation = get_operation()
             
             # Get the second number
-            num2 = get_number("Enter the second number: ")
+            num2 = get_number("Enter the second number: ", parse)
             
             # Perform the calculation
-            result, operation_name = perform_calculation(num1, num2, operation)
+            if backend is not None:
+                with backend.context():
+                    result, operation_name = perform_calculation(num1, num2, operation)
+            else:
+                result, operation_name = perform_calculation(num1, num2, operation)
             
             # Check if there was an error
             if result is None:
@@ -153,6 +195,31 @@ def main():
     print("\nThank you for using the Simple Calculator!")
     print("Goodbye! 👋")
 
+def interactive_backend(argv):
+    """
+    The NumberBackend asked for by argv if it only holds --mode, --precision
+    and --rounding, or None if it asks for anything else (streaming mode).
+    """
+    import argparse
+    from calc_numeric import MODES, ROUNDINGS, NumberBackend
+    # No -h here: help is calc_stream's, which lists these options too
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--mode", choices=MODES, default="float")
+    parser.add_argument("--precision", type=int)
+    parser.add_argument("--rounding", choices=sorted(ROUNDINGS))
+    args, rest = parser.parse_known_args(argv)
+    if rest:
+        return None
+    if args.precision is not None and args.precision < 1:
+        parser.error("--precision must be at least 1")
+    return NumberBackend(args.mode, args.precision, args.rounding)
+
 # This is the standard way to run a Python program
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Piped input, or arguments beyond the number mode, mean there is
+    # nobody to answer prompts
+    backend = interactive_backend(sys.argv[1:]) if sys.stdin.isatty() else None
+    if backend is None:
+        from calc_stream import main as stream_main
+        sys.exit(stream_main())
+    main(backend if backend.mode != "float" else None)
\ No newline at end of file
@@ -1,37 +1,17 @@
-import random
-import string
+import sys
+
+from pass_batch import CHARACTER_SETS
+from pass_policy import compile_policy, policy_for_complexity
+from pass_strength import default_index, policy_entropy, rating
 
 def get_character_set(complexity):
     """Return character set based on complexity level."""
-    sets = {
-        1: string.ascii_lowercase,
-        2: string.ascii_lowercase + string.ascii_uppercase,
-        3: string.ascii_lowercase + string.ascii_uppercase + string.digits,
-        4: string.ascii_lowercase + string.ascii_uppercase + string.digits + "!@#$%^&*()_+-=[]{}|;:,.<>?"
-    }
-    return sets.get(complexity, sets[4])
+    return CHARACTER_SETS.get(complexity, CHARACTER_SETS[4])
 def generate_password(length, complexity):
     """Generate a random password with specified length and complexity."""
-    chars = get_character_set(complexity)
-    
-    if complexity == 4:
-        # Ensure at least one character from each category for highest complexity
-        password = [
-            random.choice(string.ascii_lowercase),
-            random.choice(string.ascii_uppercase),
-            random.choice(string.digits),
-            random.choice("!@#$%^&*()_+-=[]{}|;:,.<>?")
-        ]
-        
-        # Fill remaining positions with random characters
-        for _ in range(length - 4):
-            password.append(random.choice(chars))
-            
-        # Shuffle to avoid predictable pattern
-        random.shuffle(password)
-        return ''.join(password)
-    else:
-        return ''.join(random.choice(chars) for _ in range(length))
+    # The compiled policy is cached, and level 4 always includes every
+    # category (see pass_policy)
+    return compile_policy(policy_for_complexity(complexity, length)).generate(1)[0]
 
 def display_complexity_options():
     """Display available complexity levels."""
@@ -46,6 +26,9 @@ def main():
     print("=" * 50)
     print("         SECURE PASSWORD GENERATOR")
     print("=" * 50)
+
+    # Breached-password list named by $PASSWORD_INDEX, if any
+    breach_index = default_index()
     
     while True:
         try:
@@ -84,6 +67,11 @@ def main():
             print(f"Password: {password}")
             print(f"Length: {len(password)} characters")
             print(f"Complexity: Level {complexity}")
+            # Exact entropy of the generator, not an estimate from the text
+            bits = policy_entropy(compile_policy(policy_for_complexity(complexity, length)))
+            print(f"Strength: {rating(bits)} ({bits:.1f} bits of entropy)")
+            if breach_index is not None and password in breach_index:
+                print("Warning: this password is in the breached-password list!")
             print("=" * 50)
             
             # Ask if user wants another password
@@ -97,7 +85,13 @@ def main():
             print("\n\nGoodbye!")
             break
     
+    if breach_index is not None:
+        breach_index.close()
     print("\nThank you for using the Password Generator!")
 
 if __name__ == "__main__":
+    # Any arguments switch to bulk generation, e.g. python task3.py -n 1000 -l 20
+    if len(sys.argv) > 1:
+        from pass_batch import main as batch_main
+        sys.exit(batch_main())
     main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+import io
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from calc_expr import ExpressionError, compile_expression, evaluate
+from calc_numeric import NumberBackend
+from calc_stream import evaluate_block, run
+from task2 import format_result, perform_calculation
+
+
+def stream(text, mode="float", **kwargs):
+    out = io.StringIO()
+    run(io.StringIO(text), out, backend=NumberBackend(mode), **kwargs)
+    return out.getvalue().splitlines()
+
+
+def test_two_operand_records():
+    assert perform_calculation(7.0, 2.0, '/') == (3.5, "Division")
+    assert perform_calculation(1.0, 0.0, '/') == (None, "Error: Cannot divide by zero!")
+    assert format_result(42.0) == "42"
+    assert format_result(Fraction(1, 3)) == "1/3"
+
+
+def test_stream_keeps_lines_aligned():
+    assert stream("12 + 30\n\n# note\n7 / 0\n(2 + 3) * 4 ^ 2\n") == [
+        "42", "", "# note", "Error: Cannot divide by zero!", "80"]
+
+
+@pytest.mark.parametrize("mode, line, error", [
+    ("decimal", "1e999999999 * 1e999999999", "Error: Result too large!"),
+    ("decimal", "(1e999999999) * 1e999999999", "Error: Result too large!"),
+    ("decimal", "1e5000 * 1", "Error: Result has too many digits to print!"),
+    ("fraction", "10 ^ 5000", "Error: Result has too many digits to print!"),
+    ("fraction", "2 ^ 0.5", "Error: Fractional powers have no exact result!"),
+    ("fraction", "9 ^ 9 ^ 9", "Error: Result too large!"),
+    ("fraction", "(1/3) ^ -700000", "Error: Result too large!"),
+    ("decimal", "9 ^ 9 ^ 9", "Error: Result too large!"),
+    ("decimal", "2 ^ 1000000", "Error: Result has too many digits to print!"),
+    ("decimal", "0 / 0", "Error: Cannot divide by zero!"),
+    ("float", "2 +", "Error: Expression ends too early"),
+])
+def test_a_failing_line_does_not_end_the_stream(mode, line, error):
+    assert stream(f"{line}\n2 + 2\n", mode) == [error, "4"]
+
+
+def test_exact_modes():
+    assert stream("0.1 + 0.2\n", "decimal") == ["0.3"]
+    assert stream("1 / 3 + 1 / 6\n", "fraction") == ["1/2"]
+    assert stream("2 ^ 10\n", "fraction") == ["1024"]
+    assert evaluate("0.1 + 0.2", mode="decimal") == Decimal("0.3")
+
+
+def test_exact_powers_that_fit_are_still_computed():
+    assert stream("2 ^ -3\n1 ^ 99999999999\n(-2) ^ 3\n(10 ^ 5000) / (10 ^ 4999)\n",
+                  "fraction") == ["1/8", "1", "-8", "10"]
+    assert evaluate("x ^ y", {'x': Fraction(3), 'y': 40}, mode="fraction") == 3 ** 40
+    with pytest.raises(ExpressionError, match="too large"):
+        evaluate("x ^ y", {'x': 3, 'y': 10 ** 9}, mode="fraction")
+
+
+def test_blocks_use_the_decimal_context():
+    backend = NumberBackend("decimal", precision=5)
+    assert evaluate_block(["1 / 3"], backend) == ["0.33333"]
+
+
+def test_compiled_expressions_are_cached_and_reusable():
+    f = compile_expression("a * x + b")
+    assert compile_expression("a * x + b") is f
+    assert f(a=2, x=3, b=1) == 7.0
+    assert list(f.evaluate_many([{'a': 1, 'x': 1, 'b': 1}, {'a': 0, 'x': 5, 'b': 2}])) == [2.0, 2.0]
+    with pytest.raises(ExpressionError, match="Unknown variable"):
+        f(a=1)
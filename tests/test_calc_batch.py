@@ -0,0 +1,62 @@
+import math
+import random
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+import calc_batch
+from calc_batch import DIVIDE_BY_ZERO, INVALID_OPERATION, OK, error_message
+
+# Both paths, whichever one evaluate_batch() would pick here
+PATHS = [
+    pytest.param(calc_batch._evaluate_python, id="python"),
+    pytest.param(calc_batch._evaluate_numpy, id="numpy",
+                 marks=pytest.mark.skipif(calc_batch.np is None, reason="NumPy not installed")),
+]
+
+
+def results(result):
+    return [None if math.isnan(v) else v for v in result.values], list(result.errors)
+
+
+@pytest.mark.parametrize("evaluate", PATHS)
+def test_each_row_gets_its_own_operator(evaluate):
+    result = evaluate([6, 6, 6, 6, 6, 1, 1], [3, 3, 3, 3, 0, 1, 1],
+                      ['+', ' -', 3, 4.0, '/', 'x', None])
+    assert results(result) == ([9.0, 3.0, 18.0, 2.0, None, None, None],
+                               [OK, OK, OK, OK, DIVIDE_BY_ZERO, INVALID_OPERATION,
+                                INVALID_OPERATION])
+
+
+@pytest.mark.parametrize("evaluate", PATHS)
+def test_scalars_apply_to_every_row(evaluate):
+    assert results(evaluate(Decimal("1.5"), [1, 2], '*')) == ([1.5, 3.0], [OK, OK])
+    assert results(evaluate([1, 2], Fraction(1, 2), ' / ')) == ([2.0, 4.0], [OK, OK])
+    assert results(evaluate([1, 2], 0, '/')) == ([None, None], [DIVIDE_BY_ZERO] * 2)
+    assert results(evaluate([1, 2], [3, 4], '%')) == ([None, None], [INVALID_OPERATION] * 2)
+
+
+@pytest.mark.parametrize("evaluate", PATHS)
+def test_columns_must_line_up(evaluate):
+    with pytest.raises(ValueError):
+        evaluate([1, 2, 3], [1, 2], '+')
+
+
+@pytest.mark.skipif(calc_batch.np is None, reason="NumPy not installed")
+def test_numpy_and_python_paths_agree():
+    np = calc_batch.np
+    rng = random.Random(7)
+    a = [float(rng.randint(-5, 5)) for _ in range(500)]
+    b = [float(rng.randint(-5, 5)) for _ in range(500)]
+    mixed = [rng.choice(['+', '-', '*', '/', ' /', 1, 4, 9, '?']) for _ in range(500)]
+    menu = np.array([rng.randint(0, 5) for _ in range(500)])
+    for ops in (mixed, menu, '-', 4):
+        fast = calc_batch._evaluate_numpy(np.array(a), np.array(b), ops)
+        slow = calc_batch._evaluate_python(a, b, ops)
+        assert results(fast) == results(slow)
+
+
+def test_error_messages_match_the_calculator():
+    assert error_message(OK) == ""
+    assert error_message(DIVIDE_BY_ZERO) == "Error: Cannot divide by zero!"
@@ -0,0 +1,65 @@
+import io
+import math
+import random
+from array import array
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from calc_batch import DIVIDE_BY_ZERO, OK, BatchResult
+from calc_format import format_batch, format_many, make_formatter, write_results
+from task2 import format_result
+
+
+def sample_floats(n=2000, seed=11):
+    rng = random.Random(seed)
+    values = [rng.uniform(-1e6, 1e6) for _ in range(n)]
+    values += [float(rng.randint(-10 ** 9, 10 ** 9)) for _ in range(n // 4)]
+    values += [0.0, -0.0, 0.5, 1e-7, 1e20, 2.0 ** 60, math.inf, -math.inf, math.nan]
+    return values
+
+
+def test_default_style_is_format_result():
+    values = sample_floats()
+    assert format_many(values) == [format_result(v) for v in values]
+    assert format_many([Fraction(1, 3), Decimal("2.50"), 7]) == ["1/3", "2.5", "7"]
+
+
+@pytest.mark.parametrize("precision", [0, 2, 9])
+def test_fixed_precision(precision):
+    values = sample_floats(500)
+    for value, text in zip(values, format_many(values, precision)):
+        if math.isfinite(value):
+            assert float(text) == pytest.approx(round(value, precision), abs=10 ** -precision)
+        if value.is_integer() or not math.isfinite(value):
+            assert "." not in text
+        else:
+            assert not text.endswith("0") or "." not in text
+    assert format_many([1.25, 3.0], 1) == ["1.2", "3"]
+    with pytest.raises(ValueError):
+        make_formatter(-1)
+
+
+def test_shortest_reads_back_as_the_same_float():
+    values = sample_floats()
+    for value, text in zip(values, format_many(values, shortest=True)):
+        if math.isnan(value):
+            assert text == "nan"
+        else:
+            assert float(text) == value
+    assert format_many([0.1 + 0.2, 3.0, 1e17], shortest=True) == [
+        "0.30000000000000004", "3", "1e+17"]
+
+
+def test_batch_results_show_the_error_in_failed_slots():
+    result = BatchResult(array('d', [1.5, math.nan, 4.0]), array('b', [OK, DIVIDE_BY_ZERO, OK]))
+    assert format_batch(result) == ["1.5", "Error: Cannot divide by zero!", "4"]
+
+
+def test_write_results_in_chunks():
+    out = io.StringIO()
+    lines = (str(i) for i in range(25))
+    assert write_results(out, lines, chunk_size=10) == 25
+    assert out.getvalue() == "".join(f"{i}\n" for i in range(25))
+    assert write_results(io.StringIO(), []) == 0
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from todo_cli import main
+from todo_engine import TaskEngine
+
+
+def run(tmp_path, *argv):
+    return main(["--data", str(tmp_path / "tasks.json"), *argv])
+
+
+def test_import_and_bulk_commands(tmp_path, capsys):
+    source = tmp_path / "in.csv"
+    source.write_text("description,priority\npay invoice,High\nbook flights,\n",
+                      encoding="utf-8")
+    assert run(tmp_path, "import", str(source), "--priority", "Low") == 0
+    assert run(tmp_path, "complete", "--search", "invoice") == 0
+    capsys.readouterr()
+    assert run(tmp_path, "list", "--filter", "Pending") == 0
+    listed = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(t['description'], t['priority']) for t in listed] == [("book flights", "Low")]
+
+
+@pytest.mark.parametrize("name, content", [
+    ("bad.jsonl", '{"description": "fine"}\n{"description": 5}\n'),
+    ("bad.jsonl", '"fine"\n[1, 2]\n'),
+    ("bad.jsonl", '"fine"\n7\n'),
+    ("bad.csv", "priority,description\nHigh,fine\nLow\n"),
+])
+def test_bad_input_is_an_error_not_a_traceback(tmp_path, capsys, name, content):
+    source = tmp_path / name
+    source.write_text(content, encoding="utf-8")
+    assert run(tmp_path, "import", str(source)) == 1
+    assert capsys.readouterr().err.startswith("Error: ")
+    engine = TaskEngine(str(tmp_path / "tasks.json")).load()
+    assert engine.tasks == {}
+    engine.close()
+
+
+def test_a_locked_file_is_reported(tmp_path, capsys):
+    engine = TaskEngine(str(tmp_path / "tasks.json")).load()
+    assert run(tmp_path, "stats") == 1
+    assert "already open" in capsys.readouterr().err
+    engine.close()
@@ -0,0 +1,134 @@
+import pytest
+
+from todo_engine import TaskEngine
+from todo_sort import SortedView
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = TaskEngine(str(tmp_path / "tasks.json")).load()
+    yield engine
+    engine.close()
+
+
+def test_add_many_adds_nothing_when_a_record_is_invalid(engine):
+    with pytest.raises(ValueError):
+        engine.add_many([{'description': "ok1"}, {'description': ""}])
+    assert engine.tasks == {}
+    assert engine.counters.total == 0
+    assert engine.search("ok1") == []
+    # The ids handed out for the failed batch are not skipped
+    assert engine.add("next").id == 1
+
+
+def test_descriptions_must_be_text(engine):
+    with pytest.raises(ValueError, match="must be text"):
+        engine.add(5)
+    task = engine.add("fine")
+    with pytest.raises(ValueError, match="must be text"):
+        engine.edit(task.id, ["not", "text"])
+    with pytest.raises(ValueError, match="must be text"):
+        engine.set_due(task.id, 20250101)
+    assert engine.tasks[task.id].description == "fine"
+
+
+def test_counters_follow_every_change(engine):
+    a = engine.add("a", "High")
+    engine.add("b", "Low")
+    engine.complete(a.id)
+    assert engine.counters.filter_count("Completed") == 1
+    assert engine.counters.filter_count("Pending") == 1
+    assert engine.counters.filter_count("High Priority") == 1
+    engine.clear_completed()
+    assert engine.counters.total == 1
+
+
+def test_query_filters_searches_and_sorts(engine):
+    engine.add_many([{'description': "pay invoice", 'priority': "Low"},
+                     {'description': "email invoice", 'priority': "High"},
+                     {'description': "book flights", 'priority': "High"}])
+    engine.complete(1)
+    view = engine.query("All", "invoice")
+    assert len(view) == 2
+    assert [t.id for t in view[:10]] == [1, 2]
+    assert [t.id for t in engine.query("Pending", "invoice")] == [2]
+    assert [t.id for t in engine.query("All", "", sort="Priority")] == [2, 3, 1]
+    assert [t.id for t in engine.query("High Priority", "inv", sort="Task")] == [2]
+
+
+@pytest.mark.parametrize("filter_val", ["All", "Pending", "Completed", "High Priority",
+                                        "Medium Priority", "Low Priority"])
+def test_unsearched_views_follow_changes_without_a_rescan(engine, filter_val):
+    engine.add_many({'description': f"task {i}", 'priority': ("High", "Medium", "Low")[i % 3]}
+                    for i in range(30))
+    engine.complete(*range(1, 31, 4))
+
+    view = engine.query(filter_val)
+    assert isinstance(view, SortedView)
+    assert [t.id for t in view] == [t.id for t in engine.filter(filter_val)]
+    for sort, reverse in ((None, False), ("Task", True), ("Created", False)):
+        view = engine.query(filter_val, sort=sort, reverse=reverse)
+        expected = sorted(engine.filter(filter_val),
+                          key=lambda t: (view.index.keys[t.id], t.id), reverse=reverse)
+        assert [t.id for t in view] == [t.id for t in expected]
+        assert [t.id for t in view[3:7]] == [t.id for t in expected[3:7]]
+        assert view[-1].id == expected[-1].id
+        assert len(view) == len(expected)
+
+    # The same view object keeps up with adds, edits and deletes
+    view = engine.query(filter_val)
+    engine.add("late", "Medium")
+    engine.complete(2, 3)
+    engine.delete(5)
+    assert [t.id for t in view] == [t.id for t in engine.filter(filter_val)]
+    assert len(view) == engine.counters.filter_count(filter_val)
+
+
+def test_overdue_is_known_right_after_load(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    engine = TaskEngine(path).load()
+    late = engine.add("late", due_date="2020-01-01")
+    engine.add("not yet", due_date="2999-01-01")
+    engine.close()
+
+    engine = TaskEngine(path).load()
+    assert [t.id for t in engine.filter("Overdue")] == [late.id]
+    assert engine.counters.filter_count("Overdue") == 1
+    # The GUI still hears about it once
+    overdue, reminders = engine.check_deadlines()
+    assert [t.id for t in overdue] == [late.id]
+    assert engine.check_deadlines() == ([], [])
+
+
+def test_overdue_filter_fires_deadlines_that_just_passed(engine, monkeypatch):
+    task = engine.add("soon", due_date="2030-01-01 12:00")
+    assert engine.filter("Overdue") == []
+    monkeypatch.setattr("todo_engine.time.time", lambda: 2e9)
+    assert engine.filter("Overdue") == [task]
+
+
+def test_rescheduling_or_completing_clears_overdue(engine):
+    task = engine.add("late", due_date="2020-01-01")
+    engine.check_deadlines()
+    assert engine.counters.filter_count("Overdue") == 1
+    engine.set_due(task.id, "2999-01-01")
+    assert engine.filter("Overdue") == []
+    engine.set_due(task.id, "2020-01-01")
+    engine.check_deadlines()
+    engine.complete(task.id)
+    assert engine.filter("Overdue") == []
+    assert len(engine.deadlines) == 0
+
+
+def test_reminder_fires_once(engine):
+    task = engine.add("call", reminder="2020-01-01 09:00")
+    assert engine.check_deadlines() == ([], [task])
+    assert engine.check_deadlines() == ([], [])
+    engine.edit(task.id, "call back")
+    assert engine.check_deadlines() == ([], [])
+
+
+def test_bad_due_date_is_rejected(engine):
+    with pytest.raises(ValueError):
+        engine.add("x", due_date="next week")
+    assert engine.tasks == {}
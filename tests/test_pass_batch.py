@@ -0,0 +1,91 @@
+import io
+import os
+import string
+from collections import Counter
+
+import pytest
+
+from pass_batch import (CHARACTER_SETS, ProgressReport, ShardReport, generate_batch, main,
+                        shards, write_passwords)
+from pass_policy import SYMBOLS, ByteSampler, policy_for_complexity
+
+
+def test_byte_sampler_is_unbiased_for_awkward_set_sizes():
+    # 26 does not divide 256, so a plain modulo would favour the first 22
+    chars = string.ascii_lowercase
+    data = ByteSampler(chars).sample(260_000)
+    assert len(data) == 260_000
+    counts = Counter(data.decode('latin-1'))
+    assert set(counts) == set(chars)
+    expected = len(data) / len(chars)
+    # Each count is within ~6 standard deviations of the mean
+    assert all(abs(n - expected) < 6 * expected ** 0.5 for n in counts.values())
+
+
+@pytest.mark.parametrize("chars", ["a", "", "x" * 257])
+def test_byte_sampler_rejects_unusable_sets(chars):
+    with pytest.raises(ValueError):
+        ByteSampler(chars)
+
+
+@pytest.mark.parametrize("complexity", sorted(CHARACTER_SETS))
+def test_batch_uses_the_complexity_level(complexity):
+    passwords = generate_batch(500, 12, complexity)
+    allowed = set(CHARACTER_SETS[complexity])
+    assert len(passwords) == 500
+    assert all(len(p) == 12 and set(p) <= allowed for p in passwords)
+    if complexity == 4:
+        for chars in (string.ascii_lowercase, string.ascii_uppercase, string.digits, SYMBOLS):
+            assert all(any(c in chars for c in p) for p in passwords)
+    assert len(set(passwords)) == 500
+
+
+def test_write_passwords_streams_lines():
+    out = io.BytesIO()
+    assert write_passwords(out, 1000, policy_for_complexity(3, 10), block_size=128) == 1000
+    lines = out.getvalue().split(b"\n")
+    assert lines[-1] == b""
+    assert len(lines) == 1001
+    assert all(len(line) == 10 and line.isalnum() for line in lines[:-1])
+
+
+def test_cli_writes_the_requested_file(tmp_path):
+    path = tmp_path / "passwords.txt"
+    assert main(["-n", "50", "-l", "8", "-c", "2", "-o", str(path)]) == 0
+    passwords = path.read_text().splitlines()
+    assert len(passwords) == 50
+    assert all(len(p) == 8 and p.isalpha() for p in passwords)
+    with pytest.raises(SystemExit):
+        main(["-n", "1", "-l", "3"])
+
+
+def test_shards_cover_the_request_in_fixed_blocks():
+    assert list(shards(10, 4)) == [(0, 4), (1, 4), (2, 2)]
+    assert list(shards(8, 4)) == [(0, 4), (1, 4)]
+    assert list(shards(0, 4)) == []
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_shards_come_back_in_order(workers):
+    policy = policy_for_complexity(4, 6)
+    reports = []
+    out = io.BytesIO()
+    write_passwords(out, 1000, policy, block_size=64, workers=workers, progress=reports.append)
+    assert [r.index for r in reports] == list(range(16))
+    assert [r.count for r in reports] == [64] * 15 + [40]
+    assert len(out.getvalue().splitlines()) == 1000
+    if workers > 1:
+        # Shards were generated in the pool, not in this process
+        assert os.getpid() not in {r.pid for r in reports}
+
+
+def test_progress_report_sums_up_every_shard():
+    stream = io.StringIO()
+    progress = ProgressReport(100, stream)
+    progress(ShardReport(0, 60, 0.5, 1))
+    progress(ShardReport(1, 40, 0.25, 2))
+    progress.summary()
+    text = stream.getvalue()
+    assert "shard 1: 60" in text and "60/100 (60%)" in text
+    assert "100/100 (100%)" in text
+    assert "on 2 process(es)" in text
@@ -0,0 +1,79 @@
+import itertools
+import string
+
+import pytest
+
+from pass_policy import AMBIGUOUS, PasswordPolicy, compile_policy, policy_for_complexity
+
+# Leaves lower = "ab", digits = "01": small enough to list every password
+SMALL = dict(upper=None, symbols=None,
+             exclude=string.ascii_lowercase[2:] + string.digits[2:])
+
+
+def valid(password, min_lower, min_digits, max_repeat):
+    if sum(c in "ab" for c in password) < min_lower:
+        return False
+    if sum(c in "01" for c in password) < min_digits:
+        return False
+    runs = [len(list(g)) for _, g in itertools.groupby(password)]
+    return max_repeat is None or max(runs) <= max_repeat
+
+
+@pytest.mark.parametrize("min_lower, min_digits, max_repeat", [
+    (0, 0, None), (1, 1, None), (2, 2, None), (0, 3, None),
+    (0, 0, 1), (1, 1, 2), (2, 1, 1), (0, 0, 3),
+])
+def test_unrank_lists_every_valid_password_once(min_lower, min_digits, max_repeat):
+    policy = compile_policy(PasswordPolicy(5, min_lower, digits=min_digits,
+                                           max_repeat=max_repeat, **SMALL))
+    expected = {"".join(p) for p in itertools.product("ab01", repeat=5)
+                if valid(p, min_lower, min_digits, max_repeat)}
+    assert policy.total == len(expected)
+    passwords = [policy.unrank(i).decode() for i in range(policy.total)]
+    assert set(passwords) == expected
+    assert len(passwords) == len(expected)
+    assert all(policy.check(p) for p in passwords)
+
+
+def test_generated_passwords_meet_minimums_and_repeats():
+    policy = compile_policy(PasswordPolicy(10, 2, 2, 3, 2, max_repeat=1, exclude_ambiguous=True))
+    for password in policy.generate(2000):
+        assert policy.check(password)
+        assert not set(password) & set(AMBIGUOUS)
+        assert sum(c.isdigit() for c in password) >= 3
+        assert all(a != b for a, b in zip(password, password[1:]))
+
+
+def test_minimums_can_fill_the_whole_password():
+    policy = compile_policy(PasswordPolicy(4, 1, 1, 1, 1))
+    for password in policy.generate(200):
+        kinds = {(c.islower(), c.isupper(), c.isdigit()) for c in password}
+        assert len(kinds) == 4
+        assert policy.check(password)
+    assert policy.constrained
+
+
+def test_unconstrained_policies_sample_directly():
+    policy = compile_policy(policy_for_complexity(2, 12))
+    assert not policy.constrained
+    assert policy.total == 52 ** 12
+    assert all(p.isalpha() and len(p) == 12 for p in policy.generate(100))
+
+
+def test_a_character_in_two_classes_belongs_to_the_first():
+    policy = compile_policy(PasswordPolicy(8, None, None, 0, 0, symbol_set="0!"))
+    assert policy.classes == (string.digits, "!")
+    assert policy.total == 11 ** 8
+
+
+@pytest.mark.parametrize("policy", [
+    PasswordPolicy(3, 1, 1, 1, 1),
+    PasswordPolicy(8, None, None, 1, None, exclude=string.digits),
+    PasswordPolicy(8, 0, None, None, None, exclude=string.ascii_lowercase[1:]),
+    PasswordPolicy(8, max_repeat=0),
+    PasswordPolicy(8, -1),
+    PasswordPolicy(0, 0),
+])
+def test_impossible_policies_are_refused(policy):
+    with pytest.raises(ValueError):
+        compile_policy(policy)
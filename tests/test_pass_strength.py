@@ -0,0 +1,77 @@
+import hashlib
+import io
+import math
+
+import pytest
+
+from pass_policy import compile_policy, policy_for_complexity
+from pass_strength import (BreachIndex, build_index, default_index, entropy_bits,
+                           password_key, policy_entropy, rating, score)
+
+LISTED = [f"password{i}".encode() for i in range(3000)] + [b"hunter2", "pässwort".encode()]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    source = tmp_path / "list.txt"
+    # Duplicates, blank lines and Windows line ends are all taken in stride
+    source.write_bytes(b"\r\n".join(LISTED + LISTED[:50] + [b""]) + b"\n")
+    path = str(tmp_path / "list.idx")
+    # Tiny runs so the external merge is exercised
+    assert build_index(str(source), path, run_size=256) == len(LISTED)
+    return path
+
+
+def test_index_finds_exactly_the_listed_passwords(index_path):
+    with BreachIndex(index_path) as index:
+        assert len(index) == len(LISTED)
+        assert all(p.decode() in index for p in LISTED)
+        assert b"hunter2" in index
+        assert "pässwort" in index
+        assert not any(f"password{i}" in index for i in range(3000, 6000))
+        assert "" not in index
+
+
+def test_index_built_from_sha1_hashes(tmp_path):
+    lines = [hashlib.sha1(p).hexdigest().upper().encode() + b":42" for p in LISTED[:100]]
+    source = io.BytesIO(b"\n".join(lines + [b"not a hash"]))
+    path = str(tmp_path / "hashed.idx")
+    assert build_index(source, path, hashed=True) == 100
+    with BreachIndex(path) as index:
+        assert "password7" in index
+        assert "password100" not in index
+
+
+def test_damaged_indexes_are_refused(index_path, tmp_path, monkeypatch):
+    with open(index_path, "rb") as f:
+        data = f.read()
+    truncated = tmp_path / "truncated.idx"
+    truncated.write_bytes(data[:-3])
+    other = tmp_path / "other.idx"
+    other.write_bytes(b"x" * len(data))
+    for path in (truncated, other):
+        with pytest.raises(ValueError):
+            BreachIndex(str(path))
+    monkeypatch.setenv("PASSWORD_INDEX", str(other))
+    assert default_index() is None
+
+
+def test_entropy_follows_the_classes_used():
+    assert entropy_bits("") == 0.0
+    assert entropy_bits("abcd") == pytest.approx(4 * math.log2(26))
+    assert entropy_bits("aB3!") == pytest.approx(4 * math.log2(26 + 26 + 10 + 33))
+    assert entropy_bits("éé") == pytest.approx(2 * math.log2(100))
+    # Exact for generated passwords: level 2 at length 12 is 52 ** 12
+    policy = compile_policy(policy_for_complexity(2, 12))
+    assert policy_entropy(policy) == pytest.approx(12 * math.log2(52))
+
+
+def test_ratings_and_scores(index_path):
+    assert rating(10) == "Very weak"
+    assert rating(59.9) == "Reasonable"
+    assert rating(128) == "Very strong"
+    assert password_key("hunter2") == password_key(b"hunter2")
+    with BreachIndex(index_path) as index:
+        assert score("hunter2", index).rating == "Breached"
+        assert score("Tr0ub4dor&3-horse", index).breached is False
+    assert score("hunter2").breached is None
@@ -0,0 +1,83 @@
+import pytest
+
+import todo_store
+from todo_persist import WriteBehindStore
+from todo_store import JournalStore
+from todo_task import Task
+
+
+class FlakyFile:
+    """Journal file whose first `failures` writes fail, as on a full disk."""
+
+    def __init__(self, f, failures=1):
+        self.f = f
+        self.failures = failures
+
+    def write(self, data):
+        if self.failures:
+            self.failures -= 1
+            raise OSError(28, "No space left on device")
+        return self.f.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+
+def open_write_behind(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    store = WriteBehindStore(JournalStore(path), delay=0.01)
+    store.load()
+    return path, store
+
+
+def test_changes_are_written_in_the_background(tmp_path):
+    path, store = open_write_behind(tmp_path)
+    for i in range(1, 51):
+        store.put(Task(i, f"task {i}"))
+    assert store.flush(5)
+    assert len(JournalStore(path, read_only=True).load()) == 50
+    store.close()
+
+
+def test_failed_write_is_retried(tmp_path):
+    path, store = open_write_behind(tmp_path)
+    store.put(Task(1, "first"), Task(2, "second"))
+    assert store.results.get(timeout=5)[2] is None
+    flaky = store.store._journal = FlakyFile(store.store._journal)
+
+    store.delete(1)
+    # One failed attempt, then the retry a second later
+    assert store.results.get(timeout=5)[2] is not None
+    assert store.results.get(timeout=5)[2] is None
+    assert flaky.failures == 0
+    # Read back as after a crash: close() would compact and hide a lost journal entry
+    assert sorted(t.id for t in JournalStore(path, read_only=True).load()) == [2]
+    store.close()
+
+
+def test_changes_made_after_a_failure_win(tmp_path):
+    path, store = open_write_behind(tmp_path)
+    store.store._journal = FlakyFile(open(store.store.journal_path, "a", encoding="utf-8"))
+    store.put(Task(1, "old text"))
+    assert store.results.get(timeout=5)[2] is not None
+    store.put(Task(1, "new text"))
+    store.close()
+    assert [t.description for t in JournalStore(path, read_only=True).load()] == ["new text"]
+
+
+def test_failed_close_raises_and_keeps_the_changes(tmp_path, monkeypatch):
+    path, store = open_write_behind(tmp_path)
+    store.put(Task(1, "saved"))
+    assert store.flush(5)
+
+    def broken_fsync(fd):
+        raise OSError(5, "I/O error")
+
+    monkeypatch.setattr(todo_store.os, "fsync", broken_fsync)
+    store.put(Task(2, "last edit"))
+    with pytest.raises(OSError):
+        store.close()
+    # Nothing was dropped or compacted away; once the disk recovers it is saved
+    monkeypatch.undo()
+    store.close()
+    assert [t.description for t in JournalStore(path).load()] == ["saved", "last edit"]
@@ -0,0 +1,61 @@
+import pytest
+
+from todo_schedule import DUE, REMINDER, DeadlineIndex, parse_time
+from todo_task import Task
+
+
+def task(task_id, due="", reminder="", status="Pending"):
+    t = Task(task_id, f"task {task_id}", status=status)
+    t.due_date = due
+    t.reminder = reminder
+    return t
+
+
+def test_parse_time():
+    start = parse_time("2025-01-01")
+    assert parse_time("2025-01-01", end_of_day=True) - start == 86400
+    assert parse_time("2025-01-01 06:00") - start == 6 * 3600
+    assert parse_time("") is None
+    with pytest.raises(ValueError):
+        parse_time("tomorrow")
+
+
+def test_next_time_skips_stale_entries():
+    index = DeadlineIndex()
+    index.update(task(1, due="2025-01-01 10:00"))
+    index.update(task(2, due="2025-01-01 12:00"))
+    index.update(task(1, due="2025-01-01 14:00"))
+    assert index.next_time() == parse_time("2025-01-01 12:00")
+    index.remove(2)
+    assert index.next_time() == parse_time("2025-01-01 14:00")
+    index.update(task(1, status="Completed"))
+    assert index.next_time() is None
+
+
+def test_pop_due_fires_live_entries_in_time_order():
+    index = DeadlineIndex()
+    index.update(task(1, due="2025-01-02 00:00"))
+    index.update(task(2, reminder="2025-01-01 08:00"))
+    index.update(task(3, due="2025-01-01 09:00"))
+    index.update(task(3, due="2025-03-01 09:00"))
+    fired = index.pop_due(parse_time("2025-01-02"))
+    assert fired == [(REMINDER, 2), (DUE, 1)]
+    assert index.overdue == {1}
+    # Reached deadlines do not fire again, and an unchanged update keeps them reached
+    index.update(task(1, due="2025-01-02 00:00"))
+    assert index.pop_due(parse_time("2025-01-03")) == []
+    assert index.overdue_ids() == [1]
+
+
+def test_stale_entries_are_compacted():
+    index = DeadlineIndex()
+    for minute in range(1000):
+        index.update(task(1, due=f"2025-01-01 {minute // 60 % 24:02d}:{minute % 60:02d}"))
+    assert len(index) == 1
+    assert len(index.heap) <= 2 * len(index) + 65
+
+
+def test_unreadable_times_are_ignored():
+    index = DeadlineIndex()
+    index.update(task(1, due="someday"))
+    assert len(index) == 0
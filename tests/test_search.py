@@ -0,0 +1,81 @@
+import random
+import re
+
+from todo_search import MatchView, TaskSearchIndex
+
+WORDS = ("report", "e-mail", "invoice", "re-do", "c++", "pay", "a", "ab", "x1",
+         "über", "q3/q4", "foo.bar")
+
+
+def brute_force(texts, query):
+    """The search rules spelled out: long terms are substrings, short ones word prefixes."""
+    terms = query.lower().split()
+    if not terms:
+        return []
+    found = []
+    for task_id, text in texts.items():
+        text = text.lower()
+        words = re.findall(r"\w+", text)
+        if all(term in text if len(term) >= 3 else any(w.startswith(term) for w in words)
+               for term in terms):
+            found.append(task_id)
+    return sorted(found)
+
+
+def build(seed=3, n=2000):
+    rng = random.Random(seed)
+    texts = {}
+
+    def description():
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+
+    for task_id in range(1, n + 1):
+        texts[task_id] = description()
+    index = TaskSearchIndex()
+    index.add_many(texts.items())
+    for task_id in rng.sample(range(1, n + 1), n // 5):
+        if rng.random() < 0.5:
+            index.remove(task_id)
+            del texts[task_id]
+        else:
+            texts[task_id] = description()
+            index.update(task_id, texts[task_id])
+    return index, texts
+
+
+QUERIES = ("re", "rep", "e-m", "mail", "c++", "c+", "a", "ab pay", "x", "über", "q3/",
+           "/q4", "o.b", "port voi", "-do", "re re", "zz", "", "  pay  a ")
+
+
+def test_search_matches_brute_force_after_changes():
+    index, texts = build()
+    for query in QUERIES:
+        assert index.search(query) == brute_force(texts, query), query
+
+
+def test_limit_and_ranking():
+    index = TaskSearchIndex()
+    index.add_many([(1, "pay invoice now please"), (2, "invoice"), (3, "invoices"),
+                    (4, "unrelated")])
+    assert index.search("invoice", limit=2) == [1, 2]
+    assert index.search("invoice", ranked=True) == [2, 1, 3]
+
+
+def test_removed_words_leave_no_trace():
+    index = TaskSearchIndex()
+    index.add(1, "quarterly budget")
+    index.update(1, "weekly plan")
+    assert index.search("budget") == []
+    assert "budget" not in index.words
+    assert not any("budget" in words for words in index.word_grams.values())
+
+
+def test_match_view_reads_in_id_order():
+    index, texts = build(seed=7)
+    ids = index.match("re")
+    view = MatchView(texts, ids)
+    expected = sorted(ids)
+    assert len(view) == len(expected)
+    assert view[:20] == [texts[i] for i in expected[:20]]
+    assert view[-1] == texts[expected[-1]]
+    assert list(view) == [texts[i] for i in expected]
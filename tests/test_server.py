@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+import todo_store
+from todo_client import TodoClient, TodoServerError
+from todo_engine import TaskEngine
+from todo_server import TaskServer
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+
+@pytest.fixture
+def served(tmp_path):
+    """A TaskServer on a fresh tasks.json, run in a background thread."""
+    path = str(tmp_path / "tasks.json")
+    address = path + ".sock"
+    engine = TaskEngine(path).load()
+    server = TaskServer(engine)
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    listeners = []
+
+    def on_ready(listener):
+        listeners.append(listener)
+        ready.set()
+
+    thread = threading.Thread(target=loop.run_until_complete,
+                              args=(server.serve(address, on_ready),), daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    clients = []
+
+    def connect():
+        client = TodoClient(address, timeout=5)
+        clients.append(client)
+        return client
+
+    yield server, connect
+    for client in clients:
+        client.close()
+    loop.call_soon_threadsafe(listeners[0].close)
+    thread.join(5)
+    # Let the connection handlers see their clients go
+    pending = asyncio.all_tasks(loop)
+
+    async def finish():
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    loop.run_until_complete(finish())
+    loop.close()
+    engine.close()
+
+
+def test_pipelined_responses_come_back_in_order(served):
+    server, connect = served
+    client = connect()
+    futures = [client.send("add", description=f"task {i}") for i in range(200)]
+    results = [client.result(f, timeout=5) for f in futures]
+    assert [t['description'] for t in results] == [f"task {i}" for i in range(200)]
+    assert len({t['id'] for t in results}) == 200
+    # Grouped into fewer store writes than requests
+    assert client.call("ping") < 200
+
+
+def test_a_bad_request_fails_alone(served):
+    server, connect = served
+    client = connect()
+    good = client.send("add", description="good")
+    bad = client.send("add", description=5)
+    unknown = client.send("frobnicate")
+    assert client.result(good, timeout=5)['description'] == "good"
+    with pytest.raises(TodoServerError, match="must be text"):
+        client.result(bad, timeout=5)
+    with pytest.raises(TodoServerError, match="Unknown op"):
+        client.result(unknown, timeout=5)
+    assert [t.description for t in client.query()] == ["good"]
+
+
+def test_batch_reports_each_part(served):
+    server, connect = served
+    client = connect()
+    results = client.call("batch", ops=[{'op': "add", 'description': "a"},
+                                        {'op': "edit", 'task_id': 99, 'description': "b"},
+                                        "not an object"])
+    assert [r['ok'] for r in results] == [True, False, False]
+
+
+def test_malformed_line_gets_an_error_response(served, tmp_path):
+    server, connect = served
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.settimeout(5)
+        sock.connect(str(tmp_path / "tasks.json.sock"))
+        sock.sendall(b'{"id": 1, "op": \n{"id": 2, "op": "ping"}\n')
+        data = b""
+        while data.count(b"\n") < 2:
+            data += sock.recv(4096)
+    first, second = [json.loads(line) for line in data.splitlines()]
+    assert not first['ok'] and "Bad request" in first['error']
+    assert second['id'] == 2 and second['ok']
+
+
+def test_subscribers_see_the_event_before_the_response(served):
+    server, connect = served
+    watcher = connect()
+    watcher.subscribe()
+    task = connect().add("watched")
+    event = watcher.events.get(timeout=5)
+    assert event['event'] == "changed"
+    assert [t['id'] for t in event['tasks']] == [task.id]
+
+    # The writer of a change also sees its event first
+    watcher.complete(task.id)
+    assert watcher.events.get_nowait()['tasks'][0]['status'] == "Completed"
+
+
+def test_failed_save_fails_the_group_and_keeps_memory_in_step(served, monkeypatch):
+    server, connect = served
+    client = connect()
+    kept = client.add("kept")
+
+    def broken_fsync(fd):
+        raise OSError(5, "I/O error")
+
+    monkeypatch.setattr(todo_store.os, "fsync", broken_fsync)
+    with pytest.raises(TodoServerError, match="Could not save"):
+        client.add("lost")
+    monkeypatch.undo()
+
+    assert [t.id for t in client.query()] == [kept.id]
+    client.add("after")
+    journal = server.engine.store.journal_path
+    with open(journal, encoding="utf-8") as f:
+        saved = [json.loads(line)['task']['description'] for line in f if '"put"' in line]
+    assert saved == ["kept", "after"]
+    assert os.path.exists(journal)
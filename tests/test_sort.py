@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from todo_sort import GROUP_KEYS, SORT_KEYS, SortedView, SortIndex
+from todo_task import Task
+
+PRIORITIES = ("High", "Medium", "Low", "Someday")
+
+
+def make_tasks(n, seed=3):
+    rng = random.Random(seed)
+    return {i: Task(i, f"task {rng.randint(0, 50):02d}", rng.choice(PRIORITIES),
+                    rng.choice(("Pending", "Completed")), f"2025-01-{rng.randint(1, 28):02d}")
+            for i in range(1, n + 1)}
+
+
+def expected_ids(tasks, key, reverse=False):
+    return [t.id for t in sorted(tasks.values(), key=lambda t: (key(t), t.id), reverse=reverse)]
+
+
+@pytest.mark.parametrize("column", sorted(SORT_KEYS, key=str))
+def test_index_matches_a_full_sort_through_changes(column):
+    tasks = make_tasks(200)
+    key = SORT_KEYS[column]
+    index = SortIndex(key)
+    index.build(tasks.values())
+    assert index.ids() == expected_ids(tasks, key)
+
+    rng = random.Random(5)
+    for task_id in rng.sample(sorted(tasks), 60):
+        task = tasks[task_id]
+        task.description = f"renamed {rng.randint(0, 9)}"
+        task.priority = rng.choice(PRIORITIES)
+        index.update(task)
+    for task_id in rng.sample(sorted(tasks), 20):
+        del tasks[task_id]
+        index.remove(task_id)
+    tasks[999] = Task(999, "new one", "High")
+    index.update(tasks[999])
+    # Updating a task whose key did not change is a no-op
+    index.update(tasks[999])
+
+    assert len(index) == len(tasks)
+    assert index.ids() == expected_ids(tasks, key)
+    assert index.ids(reverse=True) == expected_ids(tasks, key, reverse=True)
+
+
+def test_sorted_view_reads_windows_without_a_full_list():
+    tasks = make_tasks(100)
+    index = SortIndex(SORT_KEYS['Task'])
+    index.build(tasks.values())
+    for reverse in (False, True):
+        view = SortedView(tasks, index, reverse)
+        ids = expected_ids(tasks, SORT_KEYS['Task'], reverse)
+        assert len(view) == 100
+        assert [t.id for t in view] == ids
+        assert [t.id for t in view[10:20]] == ids[10:20]
+        assert [t.id for t in view[95:200]] == ids[95:]
+        assert [t.id for t in view[::7]] == ids[::7]
+        assert view[0].id == ids[0] and view[-1].id == ids[-1]
+        with pytest.raises(IndexError):
+            view[100]
+
+
+@pytest.mark.parametrize("group_by", sorted(GROUP_KEYS))
+def test_sorted_view_of_one_group(group_by):
+    tasks = make_tasks(150)
+    group_key = GROUP_KEYS[group_by]
+    index = SortIndex(lambda t: (group_key(t), SORT_KEYS['Created'](t)))
+    index.build(tasks.values())
+    for group in range(4):
+        members = {i: t for i, t in tasks.items() if group_key(t) == group}
+        for reverse in (False, True):
+            view = SortedView(tasks, index, reverse, group)
+            ids = expected_ids(members, SORT_KEYS['Created'], reverse)
+            assert len(view) == len(ids)
+            assert [t.id for t in view] == ids
+            assert [t.id for t in view[2:9]] == ids[2:9]
+            if ids:
+                assert view[-1].id == ids[-1]
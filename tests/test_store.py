@@ -0,0 +1,274 @@
+import json
+import os
+
+import pytest
+
+import todo_store
+from todo_engine import TaskEngine
+from todo_store import (JournalStore, SqliteStore, StoreLockedError, open_store,
+                        read_snapshot, snapshot_covers, write_snapshot)
+
+
+def put_line(task_id, description=None):
+    task = {'id': task_id, 'description': description or f"task {task_id}"}
+    return json.dumps({'op': 'put', 'task': task}).encode() + b"\n"
+
+
+def make_store(tmp_path, journal=b"", tasks=()):
+    path = str(tmp_path / "tasks.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(list(tasks), f)
+    with open(path + ".journal", "wb") as f:
+        f.write(journal)
+    return path
+
+
+def crash(store):
+    """Drop a store as a killed process would: nothing compacted, the lock let go."""
+    store._journal.close()
+    store._lock.close()
+
+
+def corrupt_files(tmp_path):
+    return sorted(p.name for p in tmp_path.iterdir() if ".corrupt-" in p.name)
+
+
+def test_changes_survive_a_crash_without_close(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    engine = TaskEngine(path).load()
+    first = engine.add("pay rent", "High")
+    engine.add("book flights")
+    engine.complete(first.id)
+    engine.delete(2)
+    # No close(): only the journal holds these changes
+    crash(engine.store)
+    reloaded = TaskEngine(path).load()
+    assert list(reloaded.tasks) == [first.id]
+    assert reloaded.tasks[first.id].status == "Completed"
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    path = make_store(tmp_path, put_line(1) + put_line(2) + b'{"op":"put","ta')
+    store = JournalStore(path)
+    assert [t.id for t in store.load()] == [1, 2]
+    assert store.load_error is None
+    assert corrupt_files(tmp_path) == []
+    # New appends start on a clean line
+    store.put(store.tasks[1])
+    store.close()
+    assert [t.id for t in JournalStore(path).load()] == [1, 2]
+
+
+def test_damaged_line_before_good_ones_is_quarantined(tmp_path):
+    path = make_store(tmp_path, put_line(1) + b"garbage\n" + put_line(2) + put_line(3))
+    store = JournalStore(path)
+    assert [t.id for t in store.load()] == [1, 2, 3]
+    assert "damaged" in store.load_error
+    assert len(corrupt_files(tmp_path)) == 1
+    store.close()
+    # The salvaged tasks were saved; the next load is clean
+    again = JournalStore(path)
+    assert [t.id for t in again.load()] == [1, 2, 3]
+    assert again.load_error is None
+
+
+def test_complete_but_invalid_last_entry_is_damage_not_a_torn_line(tmp_path):
+    path = make_store(tmp_path, put_line(1) + b'{"op":"put","task":5}\n')
+    store = JournalStore(path)
+    assert [t.id for t in store.load()] == [1]
+    assert store.load_error is not None
+    assert len(corrupt_files(tmp_path)) == 1
+
+
+def test_corrupt_snapshot_is_quarantined_and_salvaged(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('[{"id": 1, "description": "kept"}, {"id": 2, "desc')
+    engine = TaskEngine(path).load()
+    assert [t.description for t in engine.tasks.values()] == ["kept"]
+    assert engine.load_error
+    assert len(corrupt_files(tmp_path)) == 1
+    engine.close()
+    assert [t.id for t in TaskEngine(path).load().tasks.values()] == [1]
+
+
+@pytest.mark.parametrize("bad", [None, 5, ["a"]])
+def test_a_description_that_is_not_text_is_damage(tmp_path, bad):
+    path = str(tmp_path / "tasks.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{'id': 1, 'description': "kept"}, {'id': 2, 'description': bad}], f)
+    engine = TaskEngine(path).load()
+    assert [t.description for t in engine.tasks.values()] == ["kept"]
+    assert engine.load_error
+    assert [t.id for t in engine.search("kept")] == [1]
+    engine.close()
+
+    path = make_store(tmp_path, put_line(1) + json.dumps(
+        {'op': 'put', 'task': {'id': 2, 'description': bad}}).encode() + b"\n" + put_line(3))
+    store = JournalStore(path)
+    assert [t.id for t in store.load()] == [1, 3]
+    assert "damaged" in store.load_error
+
+
+def test_ids_are_not_reused_after_delete_and_restart(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    engine = TaskEngine(path).load()
+    engine.add("one")
+    newest = engine.add("two")
+    engine.delete(newest.id)
+    engine.close()
+
+    engine = TaskEngine(path).load()
+    assert engine.add("three").id == newest.id + 1
+    # Also when the journal was never compacted
+    engine.delete(newest.id + 1)
+    crash(engine.store)
+    assert TaskEngine(path).load().add("four").id == newest.id + 2
+
+
+def test_failed_append_leaves_the_store_unchanged(tmp_path, monkeypatch):
+    path = str(tmp_path / "tasks.json")
+    store = JournalStore(path)
+    store.load()
+    store.put({'id': 1, 'description': "saved"})
+    size = os.path.getsize(store.journal_path)
+
+    def broken_fsync(fd):
+        raise OSError(5, "I/O error")
+
+    monkeypatch.setattr(todo_store.os, "fsync", broken_fsync)
+    with pytest.raises(OSError):
+        store.put({'id': 2, 'description': "lost"})
+    with pytest.raises(OSError):
+        store.delete(1)
+    assert sorted(store.tasks) == [1]
+    assert store.next_id() == 2
+    assert os.path.getsize(store.journal_path) == size
+
+    monkeypatch.undo()
+    store.delete(1)
+    store.close()
+    assert JournalStore(path).load() == []
+
+
+def test_binary_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "tasks.json.snap")
+    tasks = [{'id': 1, 'description': "a", 'priority': "High", 'status': "Pending",
+              'created_date': "2025-01-02", 'completed_date': "", 'due_date': "2025-02-01"}]
+    write_snapshot(path, tasks, (10, 20, 30, 2))
+    assert [t.to_dict() for t in read_snapshot(path)] == tasks
+    assert snapshot_covers(path) == (10, 20, 30, 2)
+
+
+def binary_store(path, **kwargs):
+    store = JournalStore(path, binary_snapshot=True, **kwargs)
+    store.load()
+    return store
+
+
+def test_binary_snapshot_is_loaded_after_a_clean_close(tmp_path, monkeypatch):
+    path = str(tmp_path / "tasks.json")
+    store = binary_store(path)
+    store.put({'id': 1, 'description': "fast"})
+    store.delete(1)
+    store.put({'id': 2, 'description': "start"})
+    store.close()
+
+    def no_json(self, chunk_size):
+        raise AssertionError("tasks.json was parsed")
+
+    monkeypatch.setattr(JournalStore, "_iter_snapshot", no_json)
+    store = binary_store(path)
+    assert [t.description for t in store.tasks.values()] == ["start"]
+    assert store.next_id() == 3
+    store.close()
+
+
+def test_snapshot_plus_journal_tail_after_a_crash(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    store = binary_store(path, compact_min=2)
+    store.put({'id': 1, 'description': "a"}, {'id': 2, 'description': "b"})
+    store.put({'id': 3, 'description': "c"})
+    store.delete(1)
+    # Read while still open: .snap covers 1 and 2, the journal has the rest
+    assert [t.id for t in JournalStore(path, read_only=True).load()] == [2, 3]
+
+
+def test_tasks_json_written_by_something_else_wins(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    store = binary_store(path)
+    store.put({'id': 1, 'description': "old"})
+    store.close()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{'id': 1, 'description': "edited by hand"}], f)
+    assert [t.description for t in JournalStore(path).load()] == ["edited by hand"]
+
+
+def test_damaged_snapshot_loses_nothing(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    store = binary_store(path, compact_min=1)
+    for i in range(1, 4):
+        store.put({'id': i, 'description': f"task {i}"})
+    # The first compaction created tasks.json, the later ones only the .snap
+    with open(path, encoding="utf-8") as f:
+        assert [t['id'] for t in json.load(f)] == [1]
+    crash(store)
+    with open(path + ".snap", "r+b") as f:
+        f.truncate(os.path.getsize(path + ".snap") // 2)
+
+    store = binary_store(path)
+    assert sorted(store.tasks) == [1, 2, 3]
+    assert "damaged" in store.load_error
+    assert len(corrupt_files(tmp_path)) == 1
+
+
+@pytest.mark.parametrize("name", ["tasks.json", "tasks.db"])
+def test_only_one_store_writes_a_file(tmp_path, name):
+    path = str(tmp_path / name)
+    window_a = TaskEngine(path).load()
+    with pytest.raises(StoreLockedError):
+        TaskEngine(path).load()
+    window_a.add("from window A")
+
+    # A second window can still look, but not write
+    window_b = TaskEngine(path, store=open_store(path, read_only=True)).load()
+    assert [t.description for t in window_b.tasks.values()] == ["from window A"]
+    with pytest.raises(StoreLockedError):
+        window_b.store.put({'id': 2, 'description': "from window B"})
+    window_b.close()
+
+    window_a.close()
+    TaskEngine(path).load().close()
+
+
+def test_read_only_store_leaves_damage_alone(tmp_path):
+    path = make_store(tmp_path, put_line(1) + b"garbage\n" + put_line(2) + b'{"op"')
+    store = JournalStore(path, read_only=True)
+    assert [t.id for t in store.load()] == [1, 2]
+    assert store.load_error
+    assert corrupt_files(tmp_path) == []
+    with open(path + ".journal", "rb") as f:
+        assert f.read().endswith(b'{"op"')
+
+
+def test_sqlite_store_round_trip(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    engine = TaskEngine(path).load()
+    task = engine.add("in sqlite", "Low", due_date="2025-03-01")
+    engine.close()
+    loaded = TaskEngine(path).load().tasks[task.id]
+    assert loaded.description == "in sqlite"
+    assert loaded.due_date == "2025-03-01"
+    assert isinstance(TaskEngine(path).store, SqliteStore)
+
+
+def test_sqlite_imports_tasks_json_like_the_journal_store(tmp_path):
+    with open(tmp_path / "tasks.json", "w", encoding="utf-8") as f:
+        f.write('[{"id": 1, "description": "old"}, {"id": 1, "description": "dup"}, {"id": 2, "des')
+    store = SqliteStore(str(tmp_path / "tasks.db"), import_from=str(tmp_path / "tasks.json"))
+    tasks = store.load()
+    assert [(t.id, t.description, t.priority, t.status) for t in tasks] == [
+        (1, "old", "Medium", "Pending"), (2, "dup", "Medium", "Pending")]
+    assert store.load_error
+    assert len(corrupt_files(tmp_path)) == 1
+    store.close()
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from todo_store import JournalStore, open_store
+from todo_task import Task, json_default
+
+# What older versions, other tools and hand edits leave in tasks.json
+RECORDS = [
+    {'id': 1, 'description': "plain", 'priority': "High", 'status': "Pending",
+     'created_date': "2025-03-01", 'completed_date': ""},
+    {'id': 2, 'description': "done", 'priority': "Low", 'status': "Completed",
+     'created_date': "2025-02-28", 'completed_date': "2025-03-02"},
+    {'id': 3, 'description': "odd dates", 'priority': "Medium", 'status': "Pending",
+     'created_date': "01/03/2025", 'completed_date': None},
+    {'id': 4, 'description': "numbers as dates", 'priority': "Medium", 'status': "Pending",
+     'created_date': 20250301, 'completed_date': "2025-02-30"},
+    {'id': 5, 'description': "scheduled", 'priority': "High", 'status': "Pending",
+     'created_date': "2025-03-01", 'completed_date': "",
+     'due_date': "2025-04-01 09:00", 'reminder': "2025-03-31 09:00", 'tags': ["x"]},
+]
+
+
+def test_tasks_read_back_exactly_as_written():
+    for record in RECORDS:
+        task = Task.from_dict(record)
+        assert task.to_dict() == record
+        assert json.loads(json.dumps(task, default=json_default)) == record
+        assert task == record
+        assert dict(task) == record
+        assert set(task.keys()) == set(record)
+
+
+@pytest.mark.parametrize("binary_snapshot", [False, True])
+def test_round_trip_through_tasks_json(tmp_path, binary_snapshot):
+    path = tmp_path / "tasks.json"
+    path.write_text(json.dumps(RECORDS), encoding="utf-8")
+    store = open_store(str(path), binary_snapshot)
+    assert [t.to_dict() for t in store.load()] == RECORDS
+    store.close()
+    assert json.loads(path.read_text(encoding="utf-8")) == RECORDS
+
+    # And again from whatever the store wrote on close
+    store = JournalStore(str(path), binary_snapshot, read_only=True)
+    assert [t.to_dict() for t in store.load()] == RECORDS
+
+
+def test_mapping_interface_and_copies():
+    task = Task.from_dict(RECORDS[4])
+    assert task['due_date'] == task.due_date == "2025-04-01 09:00"
+    assert 'tags' in task and task.get('missing', 7) == 7
+    copy = task.copy()
+    copy.due_date = ""
+    copy['status'] = "Completed"
+    assert task.due_date and task.status == "Pending"
+    assert 'due_date' not in copy
+    del copy['reminder']
+    with pytest.raises(KeyError):
+        del copy['status']
+    task.created_date = "2025-03-05"
+    assert task.created_date == "2025-03-05"
+    task.created_date = None
+    assert task.to_dict()['created_date'] is None
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from todo_engine import TaskEngine
+from todo_trace import TRACER, Histogram, Tracer
+
+
+@pytest.fixture
+def tracer():
+    # The engine records into the global tracer
+    TRACER.reset()
+    TRACER.enable()
+    yield TRACER
+    TRACER.enable(False)
+    TRACER.reset()
+
+
+def test_histogram_percentiles_are_bucket_bounds():
+    histogram = Histogram()
+    for ms in [0.05] * 90 + [3] * 9 + [7000]:
+        histogram.add(ms)
+    assert histogram.calls == 100
+    assert histogram.percentile(0.5) == 0.1
+    assert histogram.percentile(0.95) == 5
+    assert histogram.percentile(1.0) == 7000
+    assert Histogram().percentile(0.5) == 0.0
+
+
+def test_spans_cost_nothing_while_off():
+    tracer = Tracer()
+    with tracer.span("refresh") as span:
+        span.set(rows=5)
+    assert tracer.summary() == {}
+    assert tracer.overlay_text() == "⏱ no samples yet"
+
+
+def test_spans_sum_their_counters_and_export(tmp_path):
+    tracer = Tracer(enabled=True)
+    for rows in (3, 4):
+        with tracer.span("query") as span:
+            span.set(rows=rows)
+    stats = tracer.summary()["query"]
+    assert stats["calls"] == 2
+    assert stats["rows"] == 7
+    assert "query p95" in tracer.overlay_text()
+
+    path = tracer.export(str(tmp_path / "trace.json"))
+    with open(path, encoding="utf-8") as f:
+        trace = json.load(f)
+    assert [e["args"]["rows"] for e in trace["traceEvents"]] == [3, 4]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in trace["traceEvents"])
+    assert trace["otherData"]["summary"]["query"]["calls"] == 2
+    with pytest.raises(ValueError):
+        Tracer(enabled=True).export()
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("TODO_TRACE", "0")
+    assert not Tracer.from_env().enabled
+    monkeypatch.setenv("TODO_TRACE", "/tmp/out.json")
+    tracer = Tracer.from_env()
+    assert tracer.enabled and tracer.export_path == "/tmp/out.json"
+
+
+def test_engine_hot_paths_are_traced(tracer, tmp_path):
+    engine = TaskEngine(str(tmp_path / "tasks.json")).load()
+    try:
+        engine.add_many({'description': f"task {i}"} for i in range(10))
+        assert len(engine.query("All", "task")) == 10
+    finally:
+        engine.close()
+    summary = tracer.summary()
+    assert summary["load"]["calls"] == 1
+    assert summary["query"]["rows"] == 10
+    assert summary["search"]["calls"] >= 1
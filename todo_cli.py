@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Batch command line for the To-Do List Manager.
+
+Runs the same TaskEngine as the GUI, without Tk. Every command is applied
+as one batch, so importing 100k tasks costs one store write, not 100k.
+
+    python todo_cli.py import tasks.csv
+    python todo_cli.py import tasks.jsonl --priority High
+    python todo_cli.py complete --filter "High Priority" --search invoice
+    python todo_cli.py delete --filter Completed
+    python todo_cli.py list --search "weekly report" --limit 20
+    python todo_cli.py stats
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+from todo_engine import TaskEngine
+from todo_stats import FILTERS
+
+
+def read_records(path, file_format=None):
+    """Yield task records from a CSV (with a header row) or JSONL file."""
+    if file_format is None:
+        file_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+    with open(path, newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or 'description' not in reader.fieldnames:
+                raise ValueError("CSV input needs a 'description' column")
+            yield from reader
+        else:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if isinstance(record, str):
+                    record = {'description': record}
+                if not isinstance(record, dict):
+                    raise ValueError(f"line {line_no}: expected an object or a string")
+                if 'description' not in record:
+                    raise ValueError(f"line {line_no}: missing 'description'")
+                yield record
+
+
+def cmd_import(engine, args):
+    def records():
+        for record in read_records(args.file, args.format):
+            if args.priority and not record.get('priority'):
+                record['priority'] = args.priority
+            yield record
+    return f"Imported {len(engine.add_many(records())):,} task(s)"
+
+
+def cmd_complete(engine, args):
+    tasks = engine.query(args.filter, args.search)
+    return f"Completed {len(engine.complete(*(t['id'] for t in tasks))):,} task(s)"
+
+
+def cmd_delete(engine, args):
+    tasks = engine.query(args.filter, args.search)
+    return f"Deleted {len(engine.delete(*(t['id'] for t in tasks))):,} task(s)"
+
+
+def cmd_list(engine, args):
+    tasks = engine.query(args.filter, args.search)
+    if args.limit is not None:
+        tasks = tasks[:args.limit]
+    out = sys.stdout
+    for t in tasks:
+        out.write(json.dumps(t.to_dict()) + "\n")
+    return None
+
+
+def cmd_stats(engine, args):
+    c = engine.counters
+    lines = [f"Total: {c.total:,} | Pending: {c.pending:,} | Completed: {c.completed:,}"]
+    lines += c.filter_labels()[1:]
+    print("\n".join(lines))
+    return None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Batch operations on the to-do list.")
+    parser.add_argument("--data", default="tasks.json",
+                        help="task file (*.db / *.sqlite selects the SQLite store)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="add tasks from a CSV or JSONL file")
+    p.add_argument("file")
+    p.add_argument("--format", choices=["csv", "jsonl"])
+    p.add_argument("--priority", choices=["High", "Medium", "Low"],
+                   help="priority for records that do not set one")
+    p.set_defaults(func=cmd_import)
+
+    for name, func, text in (("complete", cmd_complete, "complete matching tasks"),
+                             ("delete", cmd_delete, "delete matching tasks"),
+                             ("list", cmd_list, "print matching tasks as JSON lines")):
+        p = sub.add_parser(name, help=text)
+        p.add_argument("--filter", default="All", choices=FILTERS)
+        p.add_argument("--search", default="")
+        if name == "list":
+            p.add_argument("--limit", type=int)
+        p.set_defaults(func=func)
+
+    p = sub.add_parser("stats", help="print task counts")
+    p.set_defaults(func=cmd_stats)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    engine = TaskEngine(args.data)
+    try:
+        engine.load()
+        start = time.perf_counter()
+        with engine.batch():
+            message = args.func(engine, args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        engine.close()
+    if message:
+        print(f"{message} in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
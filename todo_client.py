@@ -0,0 +1,227 @@
+"""
+Client for todo_server.
+
+TodoClient is a blocking client that can still pipeline: send() returns
+a future at once, call() waits for the answer. A reader thread matches
+responses to requests and puts pushed events on the `events` queue, in
+the order they arrived. Tasks come back as todo_task.Task records.
+
+    client = connect("tasks.json")          # None when no server is running
+    task = client.add("pay rent", "High")
+    futures = [client.send("complete", ids=[i]) for i in ids]
+    client.close()
+
+The add/complete/edit/set_due/delete/clear_completed methods return what the
+matching TaskEngine methods return, so TodoApp can use either.
+RemoteStore lets a TaskEngine load from the server and act as a local,
+read-only copy kept current by the server's events.
+"""
+
+import itertools
+import json
+import os
+import queue
+import socket
+import threading
+from concurrent.futures import Future
+
+from todo_server import default_address, parse_address
+from todo_task import Task, json_default
+
+# Environment variable naming the server address (a socket path or HOST:PORT)
+SERVER_ENV = "TODO_SERVER"
+
+
+class TodoServerError(Exception):
+    """The server rejected a request."""
+
+
+def server_address(data_file):
+    """Where the server for data_file listens: $TODO_SERVER, else <data_file>.sock."""
+    value = os.environ.get(SERVER_ENV)
+    return parse_address(value) if value else default_address(data_file)
+
+
+def connect(data_file="tasks.json", timeout=2.0):
+    """A TodoClient for the server of data_file, or None if none is reachable."""
+    address = server_address(data_file)
+    if isinstance(address, str) and not os.path.exists(address):
+        return None
+    try:
+        return TodoClient(address, timeout)
+    except OSError:
+        return None
+
+
+def _tasks(result):
+    return [Task.from_dict(t) for t in result]
+
+
+class TodoClient:
+    """Blocking, thread-safe client for todo_server; requests may be pipelined."""
+
+    def __init__(self, address, timeout=None):
+        if isinstance(address, tuple):
+            self.sock = socket.create_connection(address, timeout)
+        else:
+            self.sock = socket.socket(socket.AF_UNIX)
+            self.sock.settimeout(timeout)
+            try:
+                self.sock.connect(address)
+            except OSError:
+                self.sock.close()
+                raise
+        self.sock.settimeout(None)
+        self.events = queue.Queue()
+        self.closed = False
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, name="todo-client", daemon=True)
+        self._reader.start()
+
+    def send(self, op, **params):
+        """Send one request without waiting. Returns a Future of its response dict."""
+        future = Future()
+        with self._lock:
+            if self.closed:
+                raise ConnectionError("not connected to the task server")
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            data = json.dumps({'id': request_id, 'op': op, **params},
+                              separators=(",", ":"), default=json_default)
+            try:
+                self.sock.sendall(data.encode() + b"\n")
+            except OSError:
+                del self._pending[request_id]
+                raise
+        return future
+
+    def call(self, op, **params):
+        """Send one request and return its result; raises TodoServerError if it failed."""
+        return self.result(self.send(op, **params))
+
+    @staticmethod
+    def result(future, timeout=None):
+        response = future.result(timeout)
+        if not response['ok']:
+            raise TodoServerError(response['error'])
+        return response['result']
+
+    def _read(self):
+        buffer = b""
+        try:
+            while True:
+                data = self.sock.recv(1 << 16)
+                if not data:
+                    break
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    message = json.loads(line)
+                    if 'event' in message:
+                        self.events.put(message)
+                    else:
+                        with self._lock:
+                            future = self._pending.pop(message.get('id'), None)
+                        if future is not None:
+                            future.set_result(message)
+        except (OSError, ValueError):
+            pass
+        with self._lock:
+            self.closed = True
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(ConnectionError("task server connection closed"))
+        self.events.put({'event': 'closed'})
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self._reader.join(1.0)
+
+    # -- the TaskEngine-shaped operations ------------------------------------
+
+    def subscribe(self):
+        """Start receiving change events. Returns the server's current seq."""
+        response = self.send('subscribe').result()
+        return response['seq']
+
+    def add(self, description, priority="Medium", due_date="", reminder=""):
+        return Task.from_dict(self.call('add', description=description, priority=priority,
+                                        due_date=due_date, reminder=reminder))
+
+    def add_many(self, records):
+        return _tasks(self.call('add_many', tasks=list(records)))
+
+    def complete(self, *task_ids):
+        return _tasks(self.call('complete', ids=list(task_ids)))
+
+    def edit(self, task_id, description):
+        return Task.from_dict(self.call('edit', task_id=task_id, description=description))
+
+    def set_due(self, task_id, due_date="", reminder=""):
+        return Task.from_dict(self.call('set_due', task_id=task_id, due_date=due_date,
+                                        reminder=reminder))
+
+    def delete(self, *task_ids):
+        return self.call('delete', ids=list(task_ids))
+
+    def clear_completed(self):
+        return self.call('clear_completed')
+
+    def get(self, task_id):
+        task = self.call('get', task_id=task_id)
+        return None if task is None else Task.from_dict(task)
+
+    def query(self, filter_val="All", search="", sort=None, reverse=False, group_by=None,
+              limit=None):
+        return _tasks(self.call('query', filter=filter_val, search=search, sort=sort,
+                                reverse=reverse, group_by=group_by, limit=limit))
+
+    def stats(self):
+        return self.call('stats')
+
+
+class RemoteStore:
+    """
+    Store interface (see todo_store) over a TodoClient, for a TaskEngine
+    that mirrors the server. It only loads: changes are sent with the
+    client and come back as events for TaskEngine.apply().
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.load_error = None
+        self._max_id = 0
+
+    def load(self):
+        tasks = []
+        for chunk, _ in self.iter_load():
+            tasks.extend(chunk)
+        return tasks
+
+    def iter_load(self, chunk_size=5000):
+        while True:
+            tasks = _tasks(self.client.call('list', after=self._max_id, limit=chunk_size))
+            if not tasks:
+                return
+            self._max_id = tasks[-1].id
+            yield tasks, ()
+
+    def next_id(self):
+        # Only the server hands out ids; this is just the highest one seen
+        return self._max_id + 1
+
+    def put(self, *tasks):
+        raise TypeError("RemoteStore is read-only; send changes through TodoClient")
+
+    delete = replace_all = put
+
+    def close(self):
+        self.client.close()
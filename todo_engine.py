@@ -0,0 +1,436 @@
+"""
+Headless task engine behind the To-Do List Manager.
+
+TaskEngine owns the tasks, the storage backend, the search index and the
+running counters, and exposes every operation the GUI offers without
+touching Tk. TodoApp is a view over it; todo_cli.py drives it from the
+command line.
+"""
+
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from todo_schedule import DUE, REMINDER, DeadlineIndex, parse_time
+from todo_search import MatchView, TaskSearchIndex
+from todo_sort import FILTER_GROUPS, GROUP_KEYS, SORT_KEYS, SortedView, SortIndex
+from todo_stats import FILTERS, TaskCounters
+from todo_store import open_store
+from todo_task import Task
+from todo_trace import TRACER
+
+PRIORITIES = ("High", "Medium", "Low")
+STATUSES = ("Pending", "Completed")
+
+
+def today():
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+def _text(value, what="Task description"):
+    # Clients of todo_server and imported files can hold any JSON value
+    if not isinstance(value, str):
+        raise ValueError(f"{what} must be text, not {type(value).__name__}")
+    return value
+
+
+class TaskEngine:
+    """All task operations, independent of any user interface."""
+
+    def __init__(self, data_file="tasks.json", store=None):
+        self.data_file = data_file
+        self.store = store if store is not None else open_store(data_file)
+        # task id -> task, in insertion order
+        self.tasks = {}
+        self.search_index = TaskSearchIndex()
+        self.counters = TaskCounters()
+        self.deadlines = DeadlineIndex()
+        # The Overdue filter count comes straight from the deadline index
+        self.counters.overdue = self.deadlines.overdue
+        # Ids whose due date / reminder fired but check_deadlines() has not
+        # reported yet, in the order they fired
+        self._fired_due = {}
+        self._fired_reminders = {}
+        # (group_by, column) -> SortIndex, built on first use
+        self.sort_indexes = {}
+        self.listeners = []
+        self._next_id = 1
+        self._pending = None
+
+    # -- loading and persistence -------------------------------------------
+
+    def load(self):
+        for _ in self.load_chunks():
+            pass
+        return self
+
+    def load_chunks(self, chunk_size=5000):
+        """
+        Load tasks from the store a chunk at a time, indexing as it goes.
+        Yields the number of tasks loaded so far after every chunk, so a
+        GUI can stay responsive while a big file streams in.
+        """
+        self.tasks = {}
+        self.search_index.clear()
+        self.counters.clear()
+        self._clear_deadlines()
+        self.sort_indexes = {}
+        # Time spent here, not in the caller between chunks, for the tracer
+        busy = 0.0
+        started = resumed = time.perf_counter()
+        for tasks, deleted in self.store.iter_load(chunk_size):
+            new = []
+            for task in tasks:
+                if task.id in self.tasks:
+                    self.search_index.update(task.id, task.description)
+                else:
+                    new.append(task)
+                self.tasks[task.id] = task
+                self.counters.update(task)
+                self.deadlines.update(task)
+            self.search_index.add_many((t.id, t.description) for t in new)
+            for task_id in deleted:
+                if self.tasks.pop(task_id, None) is not None:
+                    self.search_index.remove(task_id)
+                    self.counters.remove(task_id)
+                    self.deadlines.remove(task_id)
+            now = time.perf_counter()
+            busy += now - resumed
+            if TRACER.enabled:
+                TRACER.record("load_chunk", resumed, now - resumed, {'tasks': len(tasks)})
+            yield len(self.tasks)
+            resumed = time.perf_counter()
+        self._next_id = self.store.next_id()
+        # Whoever loaded us sees deadlines that passed while nothing ran
+        self._fire_deadlines()
+        if TRACER.enabled:
+            TRACER.record("load", started, busy + time.perf_counter() - resumed,
+                          {'tasks': len(self.tasks)})
+
+    @property
+    def load_error(self):
+        """Why the last load could not read everything, or None."""
+        return self.store.load_error
+
+    def reindex(self):
+        """Rebuild the search index and counters from self.tasks."""
+        self.search_index.clear()
+        self.search_index.add_many((i, t.description) for i, t in self.tasks.items())
+        self.counters.clear()
+        self._clear_deadlines()
+        for task in self.tasks.values():
+            self.counters.update(task)
+            self.deadlines.update(task)
+        self._fire_deadlines()
+        self.sort_indexes = {}
+
+    def subscribe(self, callback):
+        """Call callback(changed_tasks, deleted_ids) after every commit."""
+        self.listeners.append(callback)
+
+    def commit(self, changed=(), deleted=()):
+        """Update the indexes for changed/deleted tasks and write them out."""
+        self._index(changed, deleted)
+
+        if self._pending is not None:
+            # Inside batch(): remember the latest state, write once at the end
+            changed_map, deleted_set = self._pending
+            for task in changed:
+                changed_map[task.id] = task
+                deleted_set.discard(task.id)
+            for task_id in deleted:
+                changed_map.pop(task_id, None)
+                deleted_set.add(task_id)
+        else:
+            self._write(changed, deleted)
+
+    def apply(self, changed=(), deleted=()):
+        """
+        Take in changes made elsewhere, e.g. pushed by a todo_server.
+        changed holds the new state of each task; nothing is written to
+        the store. Listeners are told as after a commit.
+        """
+        for task in changed:
+            self.tasks[task.id] = task
+        deleted = [i for i in deleted if self.tasks.pop(i, None) is not None]
+        self._index(changed, deleted)
+        if changed or deleted:
+            for callback in self.listeners:
+                callback(changed, deleted)
+
+    def _index(self, changed, deleted):
+        for task in changed:
+            self.search_index.update(task.id, task.description)
+            self.counters.update(task)
+            self.deadlines.update(task)
+            for index in self.sort_indexes.values():
+                index.update(task)
+        for task_id in deleted:
+            self.search_index.remove(task_id)
+            self.counters.remove(task_id)
+            self.deadlines.remove(task_id)
+            self._fired_due.pop(task_id, None)
+            self._fired_reminders.pop(task_id, None)
+            for index in self.sort_indexes.values():
+                index.remove(task_id)
+
+    def _write(self, changed, deleted):
+        if changed:
+            self.store.put(*changed)
+        if deleted:
+            self.store.delete(*deleted)
+        if changed or deleted:
+            for callback in self.listeners:
+                callback(changed, deleted)
+
+    @contextmanager
+    def batch(self):
+        """Group many operations into a single write to the store."""
+        if self._pending is not None:
+            yield self
+            return
+        self._pending = ({}, set())
+        try:
+            yield self
+        finally:
+            changed_map, deleted_set = self._pending
+            self._pending = None
+            self._write(list(changed_map.values()), list(deleted_set))
+
+    def close(self):
+        self.store.close()
+
+    # -- mutations ----------------------------------------------------------
+
+    def new_task(self, description, priority="Medium", status="Pending",
+                 created_date=None, completed_date="", due_date="", reminder=""):
+        description = _text(description).strip()
+        if not description:
+            raise ValueError("Task description cannot be empty")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority!r}")
+        if status not in STATUSES:
+            raise ValueError(f"Unknown status: {status!r}")
+        extra = self._deadline_fields(due_date, reminder)
+        task = Task(self._next_id, description, priority, status,
+                    created_date or today(), completed_date or '', extra)
+        self._next_id += 1
+        return task
+
+    @staticmethod
+    def _deadline_fields(due_date, reminder):
+        """Checked due_date/reminder as Task extra fields (None when both are empty)."""
+        due_date = _text(due_date or '', "Due date").strip()
+        reminder = _text(reminder or '', "Reminder").strip()
+        parse_time(due_date)
+        parse_time(reminder)
+        fields = {}
+        if due_date:
+            fields['due_date'] = due_date
+        if reminder:
+            fields['reminder'] = reminder
+        return fields or None
+
+    def add(self, description, priority="Medium", due_date="", reminder=""):
+        task = self.new_task(description, priority, due_date=due_date, reminder=reminder)
+        self.tasks[task.id] = task
+        self.commit([task])
+        return task
+
+    def add_many(self, records):
+        """
+        Add tasks from dicts with a 'description' and optional 'priority',
+        'status', 'created_date', 'completed_date', 'due_date' and
+        'reminder'. All of them are written in one go, and none of them if
+        any record is invalid. Returns the new tasks.
+        """
+        added = []
+        first_id = self._next_id
+        try:
+            for record in records:
+                if not isinstance(record, dict):
+                    raise ValueError(f"A task record must be an object, "
+                                     f"not {type(record).__name__}")
+                added.append(self.new_task(record['description'],
+                                           record.get('priority') or "Medium",
+                                           record.get('status') or "Pending",
+                                           record.get('created_date'),
+                                           record.get('completed_date'),
+                                           record.get('due_date'),
+                                           record.get('reminder')))
+        except Exception:
+            # All or nothing: no task is added unless every record is valid
+            self._next_id = first_id
+            raise
+        for task in added:
+            self.tasks[task.id] = task
+        # Bulk-index first so commit() finds the descriptions already current
+        self.search_index.add_many((t.id, t.description) for t in added)
+        self.commit(added)
+        return added
+
+    def get(self, task_id):
+        return self.tasks.get(task_id)
+
+    def complete(self, *task_ids):
+        """Mark tasks completed. Returns the tasks that actually changed."""
+        date = today()
+        changed = []
+        for task_id in task_ids:
+            task = self.tasks.get(task_id)
+            if task is not None and task.status != 'Completed':
+                task.status = 'Completed'
+                task.completed_date = date
+                changed.append(task)
+        self.commit(changed)
+        return changed
+
+    def edit(self, task_id, description):
+        description = _text(description).strip()
+        if not description:
+            raise ValueError("Task description cannot be empty")
+        task = self.tasks[task_id]
+        task.description = description
+        self.commit([task])
+        return task
+
+    def set_due(self, task_id, due_date="", reminder=""):
+        """Set or clear (with '') a task's due date and reminder."""
+        fields = self._deadline_fields(due_date, reminder) or {}
+        task = self.tasks[task_id]
+        task.due_date = fields.get('due_date', '')
+        task.reminder = fields.get('reminder', '')
+        self.commit([task])
+        return task
+
+    def next_deadline(self):
+        """When the next due date or reminder falls (epoch seconds), or None."""
+        return self.deadlines.next_time()
+
+    def check_deadlines(self, now=None):
+        """
+        Fire the due dates and reminders reached by now (default: the
+        current time). Returns (tasks that became overdue, tasks whose
+        reminder is due) since the last call, each in time order.
+        """
+        self._fire_deadlines(now)
+        overdue, self._fired_due = self._fired_due, {}
+        reminders, self._fired_reminders = self._fired_reminders, {}
+        # Skip tasks changed since they fired: completed, rescheduled, deleted
+        fired = self.deadlines.fired
+        return ([self.tasks[i] for i in overdue if i in self.deadlines.overdue],
+                [self.tasks[i] for i in reminders if (i, REMINDER) in fired])
+
+    def _fire_deadlines(self, now=None):
+        """Bring the overdue set up to date; check_deadlines() reports what fired."""
+        for kind, task_id in self.deadlines.pop_due(time.time() if now is None else now):
+            (self._fired_due if kind == DUE else self._fired_reminders)[task_id] = None
+
+    def _clear_deadlines(self):
+        self.deadlines.clear()
+        self._fired_due = {}
+        self._fired_reminders = {}
+
+    def delete(self, *task_ids):
+        """Delete tasks by id. Returns the ids that existed."""
+        removed = [i for i in task_ids if self.tasks.pop(i, None) is not None]
+        self.commit(deleted=removed)
+        return removed
+
+    def clear_completed(self):
+        removed = [i for i, t in self.tasks.items() if t.status == 'Completed']
+        return self.delete(*removed)
+
+    # -- queries ------------------------------------------------------------
+
+    def filter(self, filter_val="All", tasks=None):
+        """Tasks matching one of the FILTERS entries."""
+        if filter_val not in FILTERS:
+            raise ValueError(f"Unknown filter: {filter_val!r}")
+        if filter_val == "Overdue":
+            # Every caller sees due dates that passed since the last look,
+            # with or without a GUI timer
+            self._fire_deadlines()
+        if filter_val == "Overdue" and tasks is None:
+            # Straight from the deadline index, longest overdue first
+            return [self.tasks[i] for i in self.deadlines.overdue_ids()]
+        tasks = self.tasks.values() if tasks is None else tasks
+        if filter_val == "Pending":
+            return [t for t in tasks if t.status == "Pending"]
+        elif filter_val == "Completed":
+            return [t for t in tasks if t.status == "Completed"]
+        elif filter_val.endswith("Priority"):
+            pr = filter_val.split()[0]
+            return [t for t in tasks if t.priority == pr]
+        elif filter_val == "Overdue":
+            overdue = self.deadlines.overdue
+            return [t for t in tasks if t.id in overdue]
+        return list(tasks)
+
+    def search(self, query, ranked=False, limit=None):
+        with TRACER.span("search") as span:
+            tasks = [self.tasks[i] for i in self.search_index.search(query, ranked, limit)]
+            span.set(rows=len(tasks))
+        return tasks
+
+    def _match(self, query):
+        # Unordered matching ids, for query()
+        with TRACER.span("search") as span:
+            ids = self.search_index.match(query)
+            span.set(rows=len(ids))
+        return ids
+
+    def sort_index(self, column=None, group_by=None):
+        """The maintained SortIndex for a column (None = insertion order), optionally grouped."""
+        name = (group_by, column)
+        index = self.sort_indexes.get(name)
+        if index is None:
+            key = SORT_KEYS[column]
+            if group_by is not None:
+                group_key = GROUP_KEYS[group_by]
+                key = lambda t, g=group_key, k=key: (g(t), k(t))
+            index = SortIndex(key)
+            index.build(self.tasks.values())
+            self.sort_indexes[name] = index
+        return index
+
+    def query(self, filter_val="All", search="", sort=None, reverse=False, group_by=None):
+        """
+        Search first (it is indexed), then filter the usually smaller result.
+        Without a search, All and the status/priority filters are returned
+        as a lazy SortedView over a maintained sort index, so only the rows
+        actually looked at are produced and a change costs no rescan.
+        """
+        with TRACER.span("query") as span:
+            tasks = self._query(filter_val, search, sort, reverse, group_by)
+            span.set(rows=len(tasks))
+        return tasks
+
+    def _query(self, filter_val, search, sort, reverse, group_by):
+        searching = bool(search.strip())
+        if not searching:
+            if filter_val == "All":
+                return SortedView(self.tasks, self.sort_index(sort, group_by), reverse)
+            group_field, group = FILTER_GROUPS.get(filter_val, (None, None))
+            if group_field is not None and group_by in (None, group_field):
+                # One group of the index grouped by that field, already in order
+                return SortedView(self.tasks, self.sort_index(sort, group_field), reverse, group)
+        if sort is None and group_by is None:
+            if not searching:
+                return self.filter(filter_val)
+            # Matches in id order, sorted only as far as the view is read
+            ids = self._match(search)
+            if filter_val != "All":
+                ids = {t.id for t in self.filter(filter_val, map(self.tasks.__getitem__, ids))}
+            return MatchView(self.tasks, ids)
+
+        index = self.sort_index(sort, group_by)
+        # The sort index puts them in order, so the matches need none of their own
+        matched = self.filter(filter_val, [self.tasks[i] for i in self._match(search)]
+                              if searching else None)
+        if len(matched) * 8 < len(index):
+            # A small result is cheaper to sort on its own than to pick out
+            keys = index.keys
+            return sorted(matched, key=lambda t: (keys[t.id], t.id), reverse=reverse)
+        wanted = {t.id for t in matched}
+        return [self.tasks[i] for i in index.ids(reverse) if i in wanted]
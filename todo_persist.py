@@ -0,0 +1,176 @@
+"""
+Write-behind persistence for the To-Do List Manager.
+
+WriteBehindStore wraps any store from todo_store and has the same
+interface, but put() and delete() only record the change and return. A
+worker thread waits a short moment so a burst of changes is coalesced,
+then writes the latest state of every changed task in one go. The GUI
+never waits on the disk; close() flushes whatever is still queued and
+raises if that fails.
+
+The worker never calls back into Tk. It reports each write attempt on the
+results queue as (changes, seconds, error), and the GUI drains that queue
+from a root.after callback on its own thread.
+"""
+
+import queue
+import threading
+import time
+
+from todo_trace import TRACER
+
+
+class WriteBehindStore:
+    """Store wrapper that writes changes from a background thread."""
+
+    def __init__(self, store, delay=0.2):
+        self.store = store
+        self.delay = delay
+        self.results = queue.Queue()
+        self.last_latency = None
+        self.last_error = None
+
+        self._changed = {}
+        self._deleted = set()
+        self._lock = threading.Lock()
+        self._store_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._closing = False
+        self._thread = None
+
+    @property
+    def load_error(self):
+        return self.store.load_error
+
+    def load(self):
+        tasks = self.store.load()
+        self._start()
+        return tasks
+
+    def iter_load(self, chunk_size=5000):
+        yield from self.store.iter_load(chunk_size)
+        self._start()
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="todo-persist", daemon=True)
+            self._thread.start()
+
+    def next_id(self):
+        return self.store.next_id()
+
+    def put(self, *tasks):
+        # Copy now: the GUI keeps mutating its tasks while we wait to write
+        with self._lock:
+            for task in tasks:
+                self._changed[task['id']] = task.copy()
+                self._deleted.discard(task['id'])
+            self._idle.clear()
+        self._wake.set()
+
+    def delete(self, *task_ids):
+        with self._lock:
+            for task_id in task_ids:
+                self._changed.pop(task_id, None)
+                self._deleted.add(task_id)
+            self._idle.clear()
+        self._wake.set()
+
+    def replace_all(self, tasks):
+        self.flush()
+        with self._store_lock:
+            self.store.replace_all(tasks)
+
+    def busy(self):
+        """True while changes are queued or being written."""
+        return not self._idle.is_set()
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far has been written (or failed)."""
+        if self._thread is None:
+            self._write_pending()
+            return True
+        self._wake.set()
+        return self._idle.wait(timeout)
+
+    def close(self):
+        """
+        Write whatever is still queued, then close the store. If either
+        fails the error is raised and nothing is dropped: the changes stay
+        queued, the writer thread carries on, and close() can be retried.
+        """
+        if self._thread is not None:
+            self._closing = True
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        try:
+            if not self._write_pending():
+                raise self.last_error
+            with self._store_lock, TRACER.span("close") as span:
+                written = getattr(self.store, 'bytes_written', 0)
+                self.store.close()
+                span.set(bytes=getattr(self.store, 'bytes_written', 0) - written)
+        except (OSError, ValueError):
+            self._closing = False
+            self._start()
+            self._wake.set()
+            raise
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            if not self._closing:
+                # Give the rest of a burst a chance to arrive
+                time.sleep(self.delay)
+            self._wake.clear()
+            ok = self._write_pending()
+            if self._closing:
+                return
+            if not ok:
+                # Keep the changes and retry later instead of spinning
+                time.sleep(max(self.delay, 1.0))
+                self._wake.set()
+
+    def _write_pending(self):
+        with self._lock:
+            changed, self._changed = self._changed, {}
+            deleted, self._deleted = self._deleted, set()
+            if not changed and not deleted:
+                self._idle.set()
+                return True
+
+        start = time.perf_counter()
+        error = None
+        try:
+            with self._store_lock, TRACER.span("save") as span:
+                written = getattr(self.store, 'bytes_written', 0)
+                if changed:
+                    self.store.put(*changed.values())
+                if deleted:
+                    self.store.delete(*deleted)
+                span.set(changes=len(changed) + len(deleted),
+                         bytes=getattr(self.store, 'bytes_written', 0) - written)
+        except (OSError, ValueError) as e:
+            error = e
+            with self._lock:
+                # Newer changes queued meanwhile win over the failed batch
+                for task_id, task in changed.items():
+                    if task_id not in self._changed and task_id not in self._deleted:
+                        self._changed[task_id] = task
+                for task_id in deleted:
+                    if task_id not in self._changed:
+                        self._deleted.add(task_id)
+        elapsed = time.perf_counter() - start
+        self.last_latency = elapsed
+        self.last_error = error
+
+        with self._lock:
+            # A failed write also counts as settled so flush() cannot hang
+            # on a dead disk; the retry loop keeps the changes queued
+            if error is not None or (not self._changed and not self._deleted):
+                self._idle.set()
+        self.results.put((len(changed) + len(deleted), elapsed, error))
+        return error is None
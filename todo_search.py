@@ -0,0 +1,272 @@
+"""
+Incremental full-text index over task descriptions.
+
+The index keeps posting maps that are updated as tasks change:
+
+    word    -> ids of tasks containing that word
+    trigram -> words containing that trigram   (for substring terms)
+    trigram -> ids of tasks containing that trigram (terms with punctuation)
+
+A query is split on whitespace and every term must match (AND). Terms of
+three or more characters match anywhere in the description, like the old
+substring search; shorter terms match the start of a word, since one or
+two letters would otherwise match nearly every task.
+
+A term made of word characters can only occur inside a word, so it is
+looked up in the vocabulary: its result is the union of the postings of
+the words it matches, with no description scanned. Terms are taken
+cheapest first; once the candidates are fewer than a term's postings,
+the candidates are checked against the text instead. match() returns the
+ids unordered and MatchView sorts them only as far as they are read, so
+a window of 20 rows never waits for the whole result to be sorted.
+
+Nothing here touches Tk, so the same index serves the Treeview and any
+headless caller.
+"""
+
+import heapq
+import re
+from bisect import bisect_left, insort
+
+WORD_RE = re.compile(r"\w+")
+WORD_ONLY_RE = re.compile(r"\w+\Z")
+
+# MatchView windows ending before this are picked with a heap, not a sort
+HEAP_WINDOW = 1000
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TaskSearchIndex:
+    """Token and trigram index mapping search terms to task ids."""
+
+    def __init__(self):
+        self.texts = {}
+        self.words = {}
+        self.grams = {}
+        self.word_grams = {}
+        self.sorted_words = []
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, task_id, description):
+        text = description.lower()
+        self.texts[task_id] = text
+        for word in set(WORD_RE.findall(text)):
+            ids = self.words.get(word)
+            if ids is None:
+                ids = self.words[word] = set()
+                insort(self.sorted_words, word)
+                self._add_word_grams(word)
+            ids.add(task_id)
+        for gram in _trigrams(text):
+            self.grams.setdefault(gram, set()).add(task_id)
+
+    def add_many(self, items):
+        """Index (task_id, description) pairs in bulk, e.g. right after loading."""
+        words = self.words
+        grams = self.grams
+        new_words = []
+        for task_id, description in items:
+            text = description.lower()
+            self.texts[task_id] = text
+            for word in set(WORD_RE.findall(text)):
+                ids = words.get(word)
+                if ids is None:
+                    ids = words[word] = set()
+                    new_words.append(word)
+                ids.add(task_id)
+            for i in range(len(text) - 2):
+                gram = text[i:i + 3]
+                ids = grams.get(gram)
+                if ids is None:
+                    ids = grams[gram] = set()
+                ids.add(task_id)
+        if new_words:
+            self.sorted_words.extend(new_words)
+            self.sorted_words.sort()
+            word_grams = self.word_grams
+            for word in new_words:
+                for i in range(len(word) - 2):
+                    gram = word[i:i + 3]
+                    words = word_grams.get(gram)
+                    if words is None:
+                        words = word_grams[gram] = set()
+                    words.add(word)
+
+    def _add_word_grams(self, word):
+        for gram in _trigrams(word):
+            self.word_grams.setdefault(gram, set()).add(word)
+
+    def remove(self, task_id):
+        text = self.texts.pop(task_id, None)
+        if text is None:
+            return
+        for word in set(WORD_RE.findall(text)):
+            ids = self.words[word]
+            ids.discard(task_id)
+            if not ids:
+                del self.words[word]
+                del self.sorted_words[bisect_left(self.sorted_words, word)]
+                for gram in _trigrams(word):
+                    words = self.word_grams[gram]
+                    words.discard(word)
+                    if not words:
+                        del self.word_grams[gram]
+        for gram in _trigrams(text):
+            ids = self.grams[gram]
+            ids.discard(task_id)
+            if not ids:
+                del self.grams[gram]
+
+    def update(self, task_id, description):
+        """Re-index a task; a no-op when its description did not change."""
+        if self.texts.get(task_id) == description.lower():
+            return
+        self.remove(task_id)
+        self.add(task_id, description)
+
+    def clear(self):
+        self.texts.clear()
+        self.words.clear()
+        self.grams.clear()
+        self.word_grams.clear()
+        self.sorted_words.clear()
+
+    def _term_words(self, term):
+        """Vocabulary words a term of word characters matches."""
+        if len(term) < 3:
+            # All words starting with term sit next to each other in sorted order
+            sorted_words = self.sorted_words
+            matched = []
+            for i in range(bisect_left(sorted_words, term), len(sorted_words)):
+                word = sorted_words[i]
+                if not word.startswith(term):
+                    break
+                matched.append(word)
+            return matched
+        grams = [self.word_grams.get(g) for g in _trigrams(term)]
+        if not all(grams):
+            return []
+        return [w for w in min(grams, key=len) if term in w]
+
+    def _substring_ids(self, term):
+        # Terms with punctuation can span words: go by trigrams of whole texts
+        posting = [self.grams.get(g) for g in _trigrams(term)]
+        if not all(posting):
+            return set()
+        posting.sort(key=len)
+        ids = set(posting[0])
+        for other in posting[1:]:
+            ids &= other
+            if not ids:
+                return ids
+        # Trigrams can all be present without being adjacent, so confirm
+        return {i for i in ids if term in self.texts[i]}
+
+    def _plan(self, term):
+        """(cost, postings, check) for one term; check(text) tells if a text matches."""
+        if WORD_ONLY_RE.match(term):
+            postings = [self.words[w] for w in self._term_words(term)]
+            if len(term) < 3:
+                # The start of a word somewhere in the text
+                check = re.compile(r"(?<!\w)" + re.escape(term)).search
+            else:
+                check = lambda text, t=term: t in text
+            return sum(map(len, postings)), postings, check
+        if len(term) < 3:
+            # A word prefix never contains punctuation
+            return 0, [], None
+        ids = self._substring_ids(term)
+        return len(ids), [ids], (lambda text, t=term: t in text)
+
+    def match(self, query):
+        """
+        Ids of the tasks matching every term of query, as a new unordered
+        set. An empty query matches nothing.
+        """
+        plans = sorted((self._plan(t) for t in set(query.lower().split())),
+                       key=lambda plan: plan[0])
+        if not plans:
+            return set()
+        texts = self.texts
+        cost, postings, _ = plans[0]
+        ids = set().union(*postings) if postings else set()
+        for cost, postings, check in plans[1:]:
+            if not ids:
+                break
+            if len(postings) == 1:
+                ids &= postings[0]
+            elif len(ids) <= cost:
+                ids = {i for i in ids if check(texts[i])}
+            else:
+                ids &= set().union(*postings)
+        return ids
+
+    def _score(self, task_id, terms):
+        words = WORD_RE.findall(self.texts[task_id])
+        score = 0
+        for term in terms:
+            if term in words:
+                score += 3
+            elif any(w.startswith(term) for w in words):
+                score += 2
+            else:
+                score += 1
+        # Shorter descriptions are a tighter match for the same terms
+        return score - len(words) / 1000
+
+    def search(self, query, ranked=False, limit=None):
+        """
+        Return ids of tasks matching every term of query. Results are in
+        id order, or best match first when ranked is True. An empty query
+        matches nothing; callers show the unfiltered list instead.
+        """
+        ids = self.match(query)
+        if ranked:
+            terms = query.lower().split()
+            key = lambda i: (-self._score(i, terms), i)
+            return sorted(ids, key=key) if limit is None else heapq.nsmallest(limit, ids, key)
+        return sorted(ids) if limit is None else heapq.nsmallest(limit, ids)
+
+
+class MatchView:
+    """
+    Read-only sequence of the tasks with the given ids, in id order. The
+    ids are only sorted once something past the first HEAP_WINDOW rows is
+    read; before that each window is picked with a heap.
+    """
+
+    def __init__(self, tasks, ids):
+        self.tasks = tasks
+        self.ids = ids
+        self._sorted = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _window(self, start, stop):
+        if self._sorted is None:
+            if stop <= HEAP_WINDOW:
+                return heapq.nsmallest(stop, self.ids)[start:]
+            self._sorted = sorted(self.ids)
+        return self._sorted[start:stop]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return list(self)[item]
+            return [self.tasks[i] for i in self._window(start, stop)]
+        n = len(self)
+        if item < 0:
+            item += n
+        if not 0 <= item < n:
+            raise IndexError(item)
+        return self.tasks[self._window(item, item + 1)[0]]
+
+    def __iter__(self):
+        return (self.tasks[i] for i in self._window(0, len(self)))
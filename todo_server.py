@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Local task server for the To-Do List Manager.
+
+One process owns tasks.json; any number of TodoApp windows and scripts
+talk to it over a Unix socket (or localhost TCP) instead of writing the
+file themselves, so no window can overwrite another's changes.
+
+The protocol is JSON lines. Every request is one object with an "op" and
+an optional "id", which is echoed in its response:
+
+    {"id": 1, "op": "add", "description": "pay rent", "priority": "High"}
+    {"id": 1, "ok": true, "seq": 42, "result": {"id": 7, "description": ...}}
+    {"id": 2, "ok": false, "error": "Task description cannot be empty"}
+
+Operations: add, add_many, complete, edit, set_due, delete, clear_completed (each
+returns what TaskEngine returns), get, list (all tasks in id order, paged
+with after/limit), query, stats, ping, batch (a list of operations) and
+subscribe.
+
+Clients may pipeline: send many requests without waiting, and the
+responses come back in request order. Every request goes through one
+writer task. It takes everything queued at that moment, runs it in order
+inside a single TaskEngine.batch(), and so makes one store write (one
+fsync) for the whole group. That write happens before any of the group's
+responses is sent. A request that fails only fails itself; if the write
+fails, the engine goes back to what the store holds and every request in
+the group is answered with the error.
+
+After a subscribe, the connection also receives an event for every
+commit that changed something:
+
+    {"event": "changed", "seq": 42, "tasks": [...], "deleted": [3]}
+
+The event for commit N is always sent before the responses of commit N,
+so a client that has its response has already seen the change.
+Subscribers that stop reading are disconnected rather than buffered
+without limit.
+
+    python todo_server.py                      # serves tasks.json on tasks.json.sock
+    python todo_server.py --data work.json --tcp 127.0.0.1:8765
+"""
+
+import argparse
+import asyncio
+import heapq
+import json
+import os
+import signal
+import socket
+import sys
+
+from todo_engine import TaskEngine
+from todo_store import StoreLockedError, open_store
+from todo_task import json_default
+
+# Requests handled per writer group at most
+MAX_GROUP = 1024
+
+# A subscriber with more unsent output than this is disconnected (bytes)
+MAX_BACKLOG = 16 << 20
+
+# Longest request line accepted (bytes)
+MAX_LINE = 64 << 20
+
+
+def default_address(data_file):
+    """Unix socket next to the data file."""
+    return data_file + ".sock"
+
+
+def parse_address(text):
+    """'HOST:PORT' -> (host, port) for TCP; anything else is a Unix socket path."""
+    host, sep, port = text.rpartition(":")
+    if sep and port.isdigit() and os.sep not in text:
+        return host or "127.0.0.1", int(port)
+    return text
+
+
+def _dump(message):
+    return json.dumps(message, separators=(",", ":"), default=json_default).encode() + b"\n"
+
+
+class TaskServer:
+    """Serves one TaskEngine to many connections through a single writer."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.seq = 0
+        self.subscribers = set()
+        self.requests = None
+        self.engine.subscribe(self._on_commit)
+
+    # -- operations -----------------------------------------------------------
+
+    def execute(self, request):
+        """Run one request against the engine. Returns its result; raises on bad input."""
+        if not isinstance(request, dict):
+            raise TypeError("request must be a JSON object")
+        op = request.get('op')
+        engine = self.engine
+        if op == 'add':
+            return engine.add(request['description'], request.get('priority') or "Medium",
+                              request.get('due_date', ""), request.get('reminder', ""))
+        if op == 'add_many':
+            return engine.add_many(request['tasks'])
+        if op == 'complete':
+            return engine.complete(*request['ids'])
+        if op == 'edit':
+            return engine.edit(request['task_id'], request['description'])
+        if op == 'set_due':
+            return engine.set_due(request['task_id'], request.get('due_date', ""),
+                                  request.get('reminder', ""))
+        if op == 'delete':
+            return engine.delete(*request['ids'])
+        if op == 'clear_completed':
+            return engine.clear_completed()
+        if op == 'get':
+            return engine.get(request['task_id'])
+        if op == 'list':
+            # Paged by id, so changes between pages cannot shift a page
+            after = request.get('after', 0)
+            ids = (i for i in engine.tasks if i > after)
+            limit = request.get('limit')
+            ids = sorted(ids) if limit is None else heapq.nsmallest(limit, ids)
+            return [engine.tasks[i] for i in ids]
+        if op == 'query':
+            tasks = engine.query(request.get('filter', "All"), request.get('search', ""),
+                                 request.get('sort'), request.get('reverse', False),
+                                 request.get('group_by'))
+            limit = request.get('limit')
+            return list(tasks if limit is None else tasks[:limit])
+        if op == 'stats':
+            counters = engine.counters
+            return {'total': counters.total, 'pending': counters.pending,
+                    'completed': counters.completed, 'priority': dict(counters.priority)}
+        if op == 'ping':
+            return self.seq
+        if op == 'batch':
+            # Parts that fail are reported in place; the others still run
+            return [self._respond(part) for part in request['ops']]
+        raise ValueError(f"Unknown op: {op!r}")
+
+    # -- writer -----------------------------------------------------------------
+
+    async def writer(self):
+        """The only place requests run: one group per pass, one store write per group."""
+        while True:
+            group = [await self.requests.get()]
+            while len(group) < MAX_GROUP and not self.requests.empty():
+                group.append(self.requests.get_nowait())
+            responses = []
+            try:
+                with self.engine.batch():
+                    for request, future in group:
+                        responses.append((future, self._respond(request)))
+            except Exception as e:
+                # _respond catches everything, so this is the store write at
+                # the end of the batch. Nothing of the group was saved (see
+                # JournalStore._append) and no event went out: go back to
+                # what is on disk and report the whole group as failed.
+                print(f"Could not save request group: {e!r}", file=sys.stderr)
+                self._reload()
+                error = f"Could not save: {e}"
+                responses = [(future, {'ok': False, 'error': error}) for _, future in group]
+            for future, response in responses:
+                if not future.done():
+                    response['seq'] = self.seq
+                    future.set_result(response)
+
+    def _respond(self, request):
+        # Any failure belongs to this request alone; the rest of its group
+        # is still committed
+        try:
+            return {'ok': True, 'result': self.execute(request)}
+        except (KeyError, TypeError, ValueError) as e:
+            return {'ok': False, 'error': _error_text(e)}
+        except Exception as e:
+            print(f"Request {request!r} failed: {e!r}", file=sys.stderr)
+            return {'ok': False, 'error': f"Server error: {e}"}
+
+    def _reload(self):
+        """Make the engine match the store again after a failed write."""
+        try:
+            self.engine.load()
+        except Exception as e:
+            print(f"Could not reload tasks: {e!r}", file=sys.stderr)
+
+    def _on_commit(self, changed, deleted):
+        # Called by the engine right after the group's store write
+        self.seq += 1
+        if not self.subscribers:
+            return
+        event = _dump({'event': 'changed', 'seq': self.seq,
+                       'tasks': list(changed), 'deleted': list(deleted)})
+        for writer in list(self.subscribers):
+            if writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                self.subscribers.discard(writer)
+                writer.close()
+            else:
+                writer.write(event)
+
+    # -- connections --------------------------------------------------------------
+
+    async def handle(self, reader, writer):
+        outbox = asyncio.Queue()
+        sender = asyncio.ensure_future(self._send(outbox, writer))
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # over-long line or connection reset
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                future = loop.create_future()
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    future.set_result({'ok': False, 'error': f"Bad request: {e}"})
+                    outbox.put_nowait((None, future))
+                    continue
+                outbox.put_nowait((request.get('id'), future))
+                if request.get('op') == 'subscribe':
+                    # Events start with the next commit; seq tells where that is
+                    self.subscribers.add(writer)
+                    future.set_result({'ok': True, 'result': None, 'seq': self.seq})
+                else:
+                    self.requests.put_nowait((request, future))
+        finally:
+            self.subscribers.discard(writer)
+            outbox.put_nowait(None)
+            await sender
+            writer.close()
+
+    async def _send(self, outbox, writer):
+        """Write responses in request order, as each one completes."""
+        try:
+            while True:
+                item = await outbox.get()
+                if item is None:
+                    return
+                request_id, future = item
+                response = await future
+                if request_id is not None:
+                    response = {'id': request_id, **response}
+                writer.write(_dump(response))
+                if outbox.empty():
+                    await writer.drain()
+        except ConnectionError:
+            # Client went away; keep consuming so pending futures are not awaited forever
+            while await outbox.get() is not None:
+                pass
+
+    async def serve(self, address, ready=None):
+        """Serve until cancelled or signalled. address is a socket path or a (host, port) pair."""
+        self.requests = asyncio.Queue()
+        writer_task = asyncio.ensure_future(self.writer())
+        if isinstance(address, tuple):
+            server = await asyncio.start_server(self.handle, *address, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_unix_server(self.handle, address, limit=MAX_LINE)
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                # Stop between groups, so the engine can close cleanly
+                loop.add_signal_handler(signum, server.close)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass  # Windows, or not the main thread
+        try:
+            if ready is not None:
+                ready(server)
+            async with server:
+                try:
+                    await server.serve_forever()
+                except asyncio.CancelledError:
+                    if server.is_serving():
+                        raise
+        finally:
+            writer_task.cancel()
+            if not isinstance(address, tuple) and os.path.exists(address):
+                os.remove(address)
+
+
+def _error_text(error):
+    if isinstance(error, KeyError):
+        return f"Missing or unknown {error.args[0]!r}"
+    return str(error)
+
+
+def _claim_socket(path):
+    """Remove a stale socket file; refuse if a server is still listening on it."""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.remove(path)
+    else:
+        raise SystemExit(f"A server is already running on {path}")
+    finally:
+        probe.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the to-do list to local clients.")
+    parser.add_argument("--data", default="tasks.json", help="task file (default tasks.json)")
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument("--socket", help="Unix socket path (default <data>.sock)")
+    where.add_argument("--tcp", metavar="HOST:PORT", help="listen on TCP instead")
+    parser.add_argument("--binary-snapshot", action="store_true",
+                        help="keep a binary <data>.snap for fast startup")
+    args = parser.parse_args(argv)
+
+    if args.tcp:
+        address = parse_address(args.tcp)
+        if not isinstance(address, tuple):
+            parser.error("--tcp needs HOST:PORT")
+    elif hasattr(socket, "AF_UNIX"):
+        address = args.socket or default_address(args.data)
+        _claim_socket(address)
+    else:
+        parser.error("Unix sockets are not available here; use --tcp HOST:PORT")
+
+    try:
+        engine = TaskEngine(args.data, store=open_store(args.data, args.binary_snapshot)).load()
+    except StoreLockedError as e:
+        raise SystemExit(f"{e}; close it before starting the server")
+    if engine.load_error:
+        print(f"Warning: {engine.load_error}", file=sys.stderr)
+    server = TaskServer(engine)
+
+    def ready(listener):
+        where = address if isinstance(address, str) else "%s:%d" % address
+        print(f"Serving {len(engine.tasks):,} tasks from {args.data} on {where}",
+              file=sys.stderr, flush=True)
+
+    try:
+        asyncio.run(server.serve(address, ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Sort indexes for the task list.
+
+A SortIndex keeps (key, task id) pairs in a list ordered with bisect, so
+a changed task is moved with one removal and one insertion instead of
+re-sorting every task. Indexes are built the first time a view asks for
+that order and kept up to date from then on.
+"""
+
+from bisect import bisect_left, insort
+
+PRIORITY_RANK = {"High": 0, "Medium": 1, "Low": 2}
+STATUS_RANK = {"Pending": 0, "Completed": 1}
+
+# Treeview column -> function giving the sort key of a task
+SORT_KEYS = {
+    'Task': lambda t: t.description.lower(),
+    'Priority': lambda t: PRIORITY_RANK.get(t.priority, 3),
+    'Status': lambda t: STATUS_RANK.get(t.status, 2),
+    'Created': lambda t: t.created_date,
+    'Completed': lambda t: t.completed_date,
+    # Tasks without a due date sort after those with one
+    'Due': lambda t: (not t.due_date, t.due_date),
+    # No column: keep insertion order (ids only ever grow)
+    None: lambda t: 0,
+}
+
+# Fields a view can be grouped by, with the key that orders the groups
+GROUP_KEYS = {
+    'priority': SORT_KEYS['Priority'],
+    'status': SORT_KEYS['Status'],
+}
+
+# Filters that keep exactly one group of an index grouped by a field:
+# filter -> (group_by, group key). Their view is a slice of that index
+FILTER_GROUPS = {
+    "Pending": ('status', STATUS_RANK["Pending"]),
+    "Completed": ('status', STATUS_RANK["Completed"]),
+    "High Priority": ('priority', PRIORITY_RANK["High"]),
+    "Medium Priority": ('priority', PRIORITY_RANK["Medium"]),
+    "Low Priority": ('priority', PRIORITY_RANK["Low"]),
+}
+
+
+class SortIndex:
+    """Task ids kept in key order; O(log n) search plus a list shift per change."""
+
+    def __init__(self, key):
+        self.key = key
+        self.entries = []
+        self.keys = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def build(self, tasks):
+        self.keys = {t.id: self.key(t) for t in tasks}
+        self.entries = sorted((k, i) for i, k in self.keys.items())
+
+    def update(self, task):
+        task_id = task.id
+        key = self.key(task)
+        if task_id in self.keys:
+            old = self.keys[task_id]
+            if old == key:
+                return
+            del self.entries[bisect_left(self.entries, (old, task_id))]
+        self.keys[task_id] = key
+        insort(self.entries, (key, task_id))
+
+    def remove(self, task_id):
+        if task_id in self.keys:
+            old = self.keys.pop(task_id)
+            del self.entries[bisect_left(self.entries, (old, task_id))]
+
+    def bounds(self, group=None):
+        """Where the entries of one group (all of them for None) start and stop."""
+        if group is None:
+            return 0, len(self.entries)
+        # Grouped keys are (group, key): (group,) sorts before all of them
+        return (bisect_left(self.entries, ((group,),)),
+                bisect_left(self.entries, ((group + 1,),)))
+
+    def ids(self, reverse=False, group=None):
+        lo, hi = self.bounds(group)
+        entries = self.entries[lo:hi]
+        if reverse:
+            entries.reverse()
+        return [task_id for _, task_id in entries]
+
+    def window(self, start, stop, reverse=False, group=None):
+        """Ids at positions start..stop of the ordering, without touching the rest."""
+        lo, hi = self.bounds(group)
+        start, stop = max(start, 0), min(stop, hi - lo)
+        if start >= stop:
+            return []
+        if reverse:
+            return [i for _, i in reversed(self.entries[hi - stop:hi - start])]
+        return [i for _, i in self.entries[lo + start:lo + stop]]
+
+
+class SortedView:
+    """
+    Read-only sequence of tasks straight out of a SortIndex: all of them,
+    or only one group of a grouped index (see FILTER_GROUPS).
+    """
+
+    def __init__(self, tasks, index, reverse=False, group=None):
+        self.tasks = tasks
+        self.index = index
+        self.reverse = reverse
+        self.group = group
+
+    def __len__(self):
+        lo, hi = self.index.bounds(self.group)
+        return hi - lo
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return list(self)[item]
+            return [self.tasks[i] for i in self.index.window(start, stop, self.reverse, self.group)]
+        n = len(self)
+        if item < 0:
+            item += n
+        if not 0 <= item < n:
+            raise IndexError(item)
+        return self.tasks[self.index.window(item, item + 1, self.reverse, self.group)[0]]
+
+    def __iter__(self):
+        return (self.tasks[i] for i in self.index.ids(self.reverse, self.group))
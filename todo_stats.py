@@ -0,0 +1,77 @@
+"""
+Running task counts for the To-Do List Manager.
+
+TaskCounters remembers the status and priority it last counted for every
+task, so each change only moves one task between buckets instead of
+recounting the whole list.
+"""
+
+from collections import Counter
+
+# Filter combobox entries, in display order
+FILTERS = ["All", "Pending", "Completed", "High Priority",
+           "Medium Priority", "Low Priority", "Overdue"]
+
+
+class TaskCounters:
+    """Per-status and per-priority counts, updated in O(1) per task change."""
+
+    def __init__(self):
+        self.status = Counter()
+        self.priority = Counter()
+        self.counted = {}
+        # Ids of overdue tasks; TaskEngine shares its DeadlineIndex's set here
+        self.overdue = set()
+
+    def __len__(self):
+        return len(self.counted)
+
+    def update(self, task):
+        """Count a new task, or move a changed one to its new buckets."""
+        key = (task.status, task.priority)
+        old = self.counted.get(task.id)
+        if old == key:
+            return
+        if old is not None:
+            self.status[old[0]] -= 1
+            self.priority[old[1]] -= 1
+        self.counted[task.id] = key
+        self.status[key[0]] += 1
+        self.priority[key[1]] += 1
+
+    def remove(self, task_id):
+        old = self.counted.pop(task_id, None)
+        if old is not None:
+            self.status[old[0]] -= 1
+            self.priority[old[1]] -= 1
+
+    def clear(self):
+        self.status.clear()
+        self.priority.clear()
+        self.counted.clear()
+
+    @property
+    def total(self):
+        return len(self.counted)
+
+    @property
+    def completed(self):
+        return self.status['Completed']
+
+    @property
+    def pending(self):
+        return self.total - self.completed
+
+    def filter_count(self, filter_val):
+        """Number of tasks a filter from FILTERS would show."""
+        if filter_val == "All":
+            return self.total
+        if filter_val == "Overdue":
+            return len(self.overdue)
+        if filter_val.endswith("Priority"):
+            return self.priority[filter_val.split()[0]]
+        return self.status[filter_val]
+
+    def filter_labels(self):
+        """Combobox labels such as 'High Priority (1,204)'."""
+        return [f"{f} ({self.filter_count(f):,})" for f in FILTERS]
@@ -0,0 +1,851 @@
+"""
+Storage backends for the To-Do List Manager.
+
+Every backend keeps the same small interface so TodoApp does not care where
+its tasks live:
+
+    iter_load(n)      -> yields (tasks, deleted_ids) chunks of at most n tasks
+    load()            -> list of tasks (todo_task.Task), in display order
+    put(*tasks)       insert or update tasks (keyed by 'id')
+    delete(*ids)      remove tasks by id
+    replace_all(tasks) rewrite the whole collection
+    close()
+
+iter_load() lets the GUI show its window first and fill the list as the
+file is read. A later chunk can update or delete tasks from an earlier one
+(the journal is replayed last). A snapshot that cannot be parsed is moved
+aside as <name>.corrupt-<timestamp> and load_error is set; whatever was
+read before the damage is kept rather than silently replaced by [].
+
+JournalStore is the default. It keeps tasks.json as a snapshot and appends
+each change to a small journal next to it, so a mutation costs one short
+append instead of rewriting the whole file. The snapshot is rebuilt
+atomically once the journal grows large enough.
+
+Only one store at a time may write a task file: loading takes an exclusive
+lock on <name>.lock and raises StoreLockedError if another window, script
+or todo_server already holds it. A store opened with read_only=True takes
+no lock and never writes; it loads what the writer has saved so far.
+"""
+
+import json
+import marshal
+import os
+import sqlite3
+import struct
+import time
+from urllib.request import pathname2url
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from todo_task import Task, json_default
+
+# Fields stored as columns in binary snapshots and SQLite
+COLUMNS = ('id', 'description', 'priority', 'status', 'created_date', 'completed_date')
+
+SNAPSHOT_MAGIC = b"TODOSNP2"
+
+# Follows the magic and marshal version byte of a binary snapshot: what it
+# was written against, so a loader can tell whether it is still current.
+# (tasks.json size and st_mtime_ns, or -1 if there was none; the journal
+# offset its changes run up to; the next task id.)
+SNAPSHOT_COVERS = struct.Struct("<4q")
+NO_COVERS = (-1, -1, 0, 0)
+
+# Filled in for tasks written by older versions that lack a field
+TASK_DEFAULTS = {'priority': 'Medium', 'status': 'Pending',
+                 'created_date': '', 'completed_date': ''}
+
+
+class _IdFixer:
+    """Streaming version of id normalization: every task ends up with a unique int id."""
+
+    def __init__(self):
+        self.seen = set()
+        self.held = []
+
+    def feed(self, tasks):
+        good = []
+        for task in tasks:
+            task_id = task.get('id')
+            if not isinstance(task_id, int) or task_id in self.seen:
+                # Renumbered at the end, once the highest valid id is known
+                self.held.append(task)
+            else:
+                self.seen.add(task_id)
+                good.append(task)
+        return good
+
+    def finish(self):
+        next_id = max(self.seen, default=0) + 1
+        for task in self.held:
+            task['id'] = next_id
+            self.seen.add(next_id)
+            next_id += 1
+        held, self.held = self.held, []
+        return held
+
+
+def atomic_write_bytes(path, data):
+    """Write data to path without ever leaving a half-written file. Returns the size."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def atomic_write_json(path, data):
+    """Write data as JSON to path without ever leaving a half-written file. Returns the size."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"), default=json_default)
+        f.flush()
+        os.fsync(f.fileno())
+        size = os.fstat(f.fileno()).st_size
+    os.replace(tmp_path, path)
+    return size
+
+
+class StoreLockedError(OSError):
+    """The task file is already open for writing elsewhere, or this store is read-only."""
+
+
+def lock_data_file(path):
+    """
+    Take an exclusive lock on path + ".lock", held until the returned file
+    is closed. Raises StoreLockedError if it is held already, whether by
+    another process or by another store in this one.
+    """
+    f = open(path + ".lock", "a+b")
+    try:
+        f.seek(0)
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        raise StoreLockedError(f"{path} is already open in another window or program")
+    return f
+
+
+def _is_task(t):
+    """True if t can be loaded as a task: a dict whose text fields hold text."""
+    return (isinstance(t, dict) and type(t.get('description')) is str
+            and type(t.get('priority', '')) is str and type(t.get('status', '')) is str)
+
+
+def _is_json(raw):
+    try:
+        json.loads(raw)
+    except ValueError:
+        return False
+    return True
+
+
+def quarantine(path):
+    """Move a damaged file out of the way so it is never overwritten. Returns the new name."""
+    target = f"{path}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+    os.replace(path, target)
+    return target
+
+
+def iter_json_array(path, chunk_size=5000, read_size=1 << 20):
+    """
+    Yield the elements of the top-level JSON array in path, chunk_size at a
+    time, without reading the whole file into memory. Raises ValueError at
+    the first malformed element, after yielding everything before it.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = f.read(read_size)
+        eof = not buf
+        pos = 0
+        chunk = []
+        expect_value = True
+        started = False
+
+        def more():
+            nonlocal buf, pos, eof
+            data = f.read(read_size)
+            if not data:
+                eof = True
+                return False
+            buf = buf[pos:] + data
+            pos = 0
+            return True
+
+        try:
+            while True:
+                # Skip whitespace, refilling the buffer as needed
+                while True:
+                    while pos < len(buf) and buf[pos] in " \t\r\n":
+                        pos += 1
+                    if pos < len(buf) or not more():
+                        break
+                if pos >= len(buf):
+                    if not started:
+                        # An empty file holds no tasks
+                        return
+                    raise ValueError(f"{path}: unexpected end of file")
+
+                ch = buf[pos]
+                if not started:
+                    if ch != "[":
+                        raise ValueError(f"{path} does not contain a list of tasks")
+                    started = True
+                    pos += 1
+                    continue
+                if ch == "]":
+                    break
+                if not expect_value:
+                    if ch != ",":
+                        raise ValueError(f"{path}: expected ',' between tasks")
+                    pos += 1
+                    expect_value = True
+                    continue
+
+                while True:
+                    try:
+                        value, end = decoder.raw_decode(buf, pos)
+                        # A number cut off by the buffer edge still parses
+                        if end < len(buf) or eof or not more():
+                            break
+                    except ValueError:
+                        if eof or not more():
+                            raise
+                pos = end
+                expect_value = False
+                chunk.append(value)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        except ValueError:
+            # Hand out everything read before the damage, then report it
+            if chunk:
+                yield chunk
+            raise
+        if chunk:
+            yield chunk
+
+
+def write_snapshot(path, tasks, covers=NO_COVERS):
+    """
+    Write tasks as a compact binary snapshot: one marshal blob of columns,
+    with priority and status stored as one byte each. Loading it is mostly
+    a single marshal.loads, which is far faster than parsing JSON. covers
+    goes into the header (see SNAPSHOT_COVERS).
+    """
+    tables = {'priority': [], 'status': []}
+    codes = {'priority': bytearray(), 'status': bytearray()}
+    lookup = {'priority': {}, 'status': {}}
+    ids, descriptions, created, completed, extras = [], [], [], [], []
+    for task in tasks:
+        if type(task) is not Task:
+            task = Task.from_dict(task)
+        ids.append(task.id)
+        descriptions.append(task.description)
+        created.append(task.created_date)
+        completed.append(task.completed_date)
+        for field, value in (('priority', task.priority), ('status', task.status)):
+            code = lookup[field].get(value)
+            if code is None:
+                code = lookup[field][value] = len(tables[field])
+                tables[field].append(value)
+            codes[field].append(code)
+        extras.append(task.extra)
+    if len(tables['priority']) > 256 or len(tables['status']) > 256:
+        raise ValueError("too many distinct priorities/statuses for a binary snapshot")
+    payload = marshal.dumps((ids, descriptions, tables['priority'], bytes(codes['priority']),
+                             tables['status'], bytes(codes['status']), created, completed,
+                             extras))
+    return atomic_write_bytes(path, SNAPSHOT_MAGIC + bytes([marshal.version])
+                              + SNAPSHOT_COVERS.pack(*covers) + payload)
+
+
+def snapshot_covers(path):
+    """
+    The covers tuple from a snapshot's header, or None if it was written by
+    an incompatible Python. Raises ValueError if it is not a task snapshot.
+    """
+    header = len(SNAPSHOT_MAGIC) + 1
+    with open(path, "rb") as f:
+        data = f.read(header + SNAPSHOT_COVERS.size)
+    if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC or len(data) < header + SNAPSHOT_COVERS.size:
+        raise ValueError(f"{path} is not a task snapshot")
+    if data[len(SNAPSHOT_MAGIC)] != marshal.version:
+        return None
+    return SNAPSHOT_COVERS.unpack_from(data, header)
+
+
+def read_snapshot(path):
+    """Read a snapshot written by write_snapshot. Raises ValueError if it is unusable."""
+    with open(path, "rb") as f:
+        data = f.read()
+    header = len(SNAPSHOT_MAGIC) + 1 + SNAPSHOT_COVERS.size
+    if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC or len(data) < header:
+        raise ValueError(f"{path} is not a task snapshot")
+    if data[len(SNAPSHOT_MAGIC)] != marshal.version:
+        raise ValueError(f"{path} was written by an incompatible Python")
+    try:
+        (ids, descriptions, priorities, priority_codes, statuses, status_codes,
+         created, completed, extras) = marshal.loads(memoryview(data)[header:])
+        tasks = [Task(task_id, descriptions[i], priorities[priority_codes[i]],
+                      statuses[status_codes[i]], created[i], completed[i], extras[i])
+                 for i, task_id in enumerate(ids)]
+        if not (all(type(v) is str for v in priorities + statuses)
+                and all(type(t.id) is int and type(t.description) is str for t in tasks)):
+            raise ValueError("it contains something that is not a task")
+    except (EOFError, TypeError, ValueError, IndexError) as e:
+        raise ValueError(f"{path} is damaged: {e}")
+    return tasks
+
+
+class JsonFileStore:
+    """The original behaviour: rewrite the whole file on every change, atomically."""
+
+    def __init__(self, path):
+        self.path = path
+        self.tasks = {}
+        self._max_id = 0
+        self.load_error = None
+        self.read_only = False
+        # Running total, for instrumentation (see todo_trace)
+        self.bytes_written = 0
+
+    def load(self):
+        for _ in self.iter_load():
+            pass
+        return list(self.tasks.values())
+
+    def iter_load(self, chunk_size=5000):
+        self.tasks = {}
+        self._max_id = 0
+        self.load_error = None
+        yield from self._iter_snapshot(chunk_size)
+
+    def _iter_snapshot(self, chunk_size):
+        fixer = _IdFixer()
+        if os.path.exists(self.path):
+            try:
+                for chunk in iter_json_array(self.path, chunk_size):
+                    bad = next((i for i, t in enumerate(chunk) if not _is_task(t)), None)
+                    if bad is not None:
+                        # Keep every task in front of the damage, as for a parse error
+                        if bad:
+                            yield self._take(fixer.feed(chunk[:bad])), ()
+                        raise ValueError(f"{self.path} contains something that is not a task")
+                    yield self._take(fixer.feed(chunk)), ()
+            except (ValueError, UnicodeDecodeError) as e:
+                self._set_aside(self.path, e)
+        held = fixer.finish()
+        if held:
+            yield self._take(held), ()
+
+    def _report(self, error):
+        self.load_error = f"{self.load_error}; {error}" if self.load_error else error
+
+    def _set_aside(self, path, error):
+        """Quarantine a damaged file and report it in load_error."""
+        if self.read_only:
+            # Left for the store that writes the file to deal with
+            self._report(str(error))
+            return
+        moved = quarantine(path)
+        self._report(f"{error} (original kept as {os.path.basename(moved)})")
+
+    def _take(self, tasks):
+        # Parsed dicts become compact Task records; snapshot records are
+        # handed out as they are. put() copies later changes.
+        tasks = [t if type(t) is Task else Task.from_dict(t, TASK_DEFAULTS) for t in tasks]
+        for task in tasks:
+            self.tasks[task.id] = task
+            if task.id > self._max_id:
+                self._max_id = task.id
+        return tasks
+
+    def next_id(self):
+        return self._max_id + 1
+
+    def _remember(self, task):
+        task = Task.from_dict(task)
+        self.tasks[task.id] = task
+        self._max_id = max(self._max_id, task.id)
+        return task
+
+    def put(self, *tasks):
+        for task in tasks:
+            self._remember(task)
+        self._write()
+
+    def delete(self, *task_ids):
+        for task_id in task_ids:
+            self.tasks.pop(task_id, None)
+        self._write()
+
+    def replace_all(self, tasks):
+        self.tasks = {}
+        for task in tasks:
+            self._remember(task)
+        self._write()
+
+    def close(self):
+        pass
+
+    def _write(self):
+        self.bytes_written += atomic_write_json(self.path, list(self.tasks.values()))
+
+
+class JournalStore(JsonFileStore):
+    """
+    tasks.json snapshot plus an append-only journal of changes.
+
+    Each journal line is one JSON object, either {"op": "put", "task": {...}}
+    or {"op": "del", "id": n}. A fresh journal starts with
+    {"op": "seq", "next_id": n} so ids are never reused, even after the
+    newest task was deleted and the snapshot no longer shows it. Replaying
+    puts and deletes is idempotent, so a crash between writing a new
+    snapshot and truncating the journal is harmless, and a torn last line
+    from a crash mid-append is simply dropped. Damage anywhere else gets the
+    journal quarantined like a damaged snapshot (see _replay). A put() or delete() whose
+    append fails leaves the store exactly as it was, so it can be retried.
+
+    With binary_snapshot=True, compaction writes tasks.json.snap (see
+    write_snapshot) instead of tasks.json. The journal is only emptied when
+    tasks.json is rewritten: on close, or once the journal has grown to
+    json_ratio times the size of tasks.json. The .snap header records the
+    tasks.json it was written against and how far into the journal it
+    reaches, so loading uses it (and replays only the rest of the journal)
+    exactly when tasks.json has not been rewritten since. A damaged .snap
+    is quarantined and the tasks rebuilt from tasks.json and the journal.
+    """
+
+    json_ratio = 8
+
+    def __init__(self, path, compact_min=1000, fsync=True, binary_snapshot=False,
+                 read_only=False):
+        super().__init__(path)
+        self.journal_path = path + ".journal"
+        self.snapshot_path = path + ".snap"
+        self.binary_snapshot = binary_snapshot
+        self.compact_min = compact_min
+        self.fsync = fsync
+        self.read_only = read_only
+        self.journal_ops = 0
+        self._journal = None
+        self._lock = None
+
+    def iter_load(self, chunk_size=5000):
+        if self._journal is not None:
+            # Loading again (e.g. after a failed write): reopened at the end
+            self._journal.close()
+            self._journal = None
+        if self._lock is None and not self.read_only:
+            self._lock = lock_data_file(self.path)
+        self.tasks = {}
+        self._max_id = 0
+        self.load_error = None
+        # Read a current .snap even when not writing them: after a crash it
+        # may hold changes that never reached tasks.json
+        covers = self._current_snapshot()
+        tasks = None
+        if covers is not None:
+            try:
+                tasks = read_snapshot(self.snapshot_path)
+            except (OSError, ValueError) as e:
+                self._snapshot_damaged(e)
+        if tasks is not None:
+            for start in range(0, len(tasks), chunk_size):
+                yield self._take(tasks[start:start + chunk_size]), ()
+            tasks = None
+            self._max_id = max(self._max_id, covers[3] - 1)
+            offset = covers[2]
+        else:
+            # tasks.json plus the whole journal, which holds every change since
+            yield from self._iter_snapshot(chunk_size)
+            offset = 0
+
+        changed, deleted = self._replay(offset)
+        changed = [self.tasks[i] for i in changed if i in self.tasks]
+        deleted = [i for i in deleted if i not in self.tasks]
+        if changed or deleted:
+            yield changed, deleted
+        if self.read_only:
+            pass
+        elif self.load_error:
+            # Save what was salvaged so the damaged file is not needed again
+            self.compact(write_json=True)
+        else:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def _json_stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return -1, -1
+        return st.st_size, st.st_mtime_ns
+
+    def _current_snapshot(self):
+        """The covers of the .snap if it is current, else None."""
+        if not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            covers = snapshot_covers(self.snapshot_path)
+        except (OSError, ValueError) as e:
+            self._snapshot_damaged(e)
+            return None
+        # tasks.json rewritten since (by us on close, or by something else)
+        # supersedes it, and so does a journal that was started over
+        if covers is None or covers[:2] != self._json_stat():
+            return None
+        try:
+            journal_size = os.path.getsize(self.journal_path)
+        except OSError:
+            journal_size = 0
+        return covers if covers[2] <= journal_size else None
+
+    def _snapshot_damaged(self, error):
+        try:
+            self._set_aside(self.snapshot_path, error)
+        except OSError:
+            self._report(str(error))
+
+    def _replay(self, offset=0):
+        """
+        Apply the journal from offset on. Returns the ids it put and the
+        ids it deleted.
+
+        Only the last line may be torn (a crash mid-append); it is cut off.
+        A bad line with good ones after it means the journal was damaged:
+        every valid entry is still applied, the file is quarantined and
+        load_error set, and iter_load() then saves a fresh snapshot.
+        """
+        changed = set()
+        deleted = set()
+        self.journal_ops = 0
+        if not os.path.exists(self.journal_path):
+            return changed, deleted
+        size = offset
+        bad_lines = 0
+        bad_start = bad_end = None
+        torn = False
+        with open(self.journal_path, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                start, size = size, size + len(raw)
+                if not raw.endswith(b"\n") or not self._apply_entry(raw, changed, deleted):
+                    bad_lines += 1
+                    bad_start, bad_end = start, size
+                    # Torn: cut short, as opposed to complete but wrong
+                    torn = not raw.endswith(b"\n") or not _is_json(raw)
+        if not bad_lines:
+            return changed, deleted
+        if bad_lines == 1 and bad_end == size and torn:
+            if not self.read_only:
+                # Drop the torn tail so new appends start on a clean line
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(bad_start)
+            return changed, deleted
+        self._set_aside(self.journal_path,
+                        f"{self.journal_path}: skipped {bad_lines} damaged entries")
+        return changed, deleted
+
+    def _apply_entry(self, raw, changed, deleted):
+        """Apply one journal line. False if it is not a valid entry."""
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            return False
+        if not isinstance(entry, dict):
+            return False
+        op = entry.get('op')
+        if op == 'put':
+            task = entry.get('task')
+            if not _is_task(task) or type(task.get('id')) is not int:
+                return False
+            task_id = self._remember(task).id
+            changed.add(task_id)
+            deleted.discard(task_id)
+            self.journal_ops += 1
+        elif op == 'del':
+            task_id = entry.get('id')
+            if type(task_id) is not int:
+                return False
+            self.tasks.pop(task_id, None)
+            changed.discard(task_id)
+            deleted.add(task_id)
+            self.journal_ops += 1
+        elif op == 'seq':
+            if type(entry.get('next_id')) is not int:
+                return False
+            self._max_id = max(self._max_id, entry['next_id'] - 1)
+        else:
+            return False
+        return True
+
+    def _check_writable(self):
+        if self.read_only:
+            raise StoreLockedError(f"{self.path} is open read-only")
+
+    def put(self, *tasks):
+        self._check_writable()
+        lines = []
+        before = {}
+        max_id = self._max_id
+        for task in tasks:
+            before.setdefault(task['id'], self.tasks.get(task['id']))
+            task = self._remember(task)
+            lines.append(json.dumps({'op': 'put', 'task': task}, separators=(",", ":"),
+                                    default=json_default))
+        self._append(lines, before, max_id)
+
+    def delete(self, *task_ids):
+        self._check_writable()
+        lines = []
+        before = {}
+        for task_id in task_ids:
+            task = self.tasks.pop(task_id, None)
+            if task is not None:
+                before[task_id] = task
+                lines.append(json.dumps({'op': 'del', 'id': task_id}, separators=(",", ":")))
+        self._append(lines, before, self._max_id)
+
+    def replace_all(self, tasks):
+        self._check_writable()
+        self.tasks = {}
+        for task in tasks:
+            self._remember(task)
+        self.compact()
+
+    def _append(self, lines, before, max_id):
+        """
+        Append lines to the journal. If that fails, the store is left as it
+        was before the put/delete (before maps id -> old task or None) and
+        the error is raised, so the caller can simply try again.
+        """
+        if not lines:
+            return
+        data = "\n".join(lines) + "\n"
+        size = None
+        try:
+            if self._journal is None:
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+            size = self._journal.tell()
+            self._journal.write(data)
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+        except OSError:
+            self._undo(before, max_id, size)
+            raise
+        self.bytes_written += len(data.encode('utf-8'))
+        self.journal_ops += len(lines)
+        # Compact once the journal is about as big as the snapshot, which
+        # keeps the amortized cost per change constant
+        if self.journal_ops >= max(self.compact_min, len(self.tasks)):
+            try:
+                self.compact()
+            except OSError:
+                pass  # the changes are safe in the journal; compaction is retried later
+
+    def _undo(self, before, max_id, size):
+        for task_id, task in before.items():
+            if task is None:
+                self.tasks.pop(task_id, None)
+            else:
+                self.tasks[task_id] = task
+        self._max_id = max_id
+        journal, self._journal = self._journal, None
+        if journal is not None:
+            try:
+                journal.close()
+            except OSError:
+                pass  # closed all the same
+        try:
+            if size is not None:
+                # Cut off whatever part of the failed append reached the file
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(size)
+        except OSError:
+            pass  # a partial line left behind is dropped or quarantined on replay
+
+    def compact(self, write_json=None):
+        """
+        Fold the journal into a fresh snapshot. Rewriting tasks.json also
+        starts an empty journal; a .snap alone leaves the journal as it is,
+        so tasks.json and the journal still hold everything if the .snap
+        turns out to be damaged.
+        """
+        self._check_writable()
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        if write_json is None:
+            write_json = not self.binary_snapshot or self._journal_outgrew_json()
+        if write_json:
+            self.bytes_written += atomic_write_json(self.path, list(self.tasks.values()))
+            self._journal.close()
+            self._journal = None
+            self._journal = open(self.journal_path, "w", encoding="utf-8")
+            self._journal.write(json.dumps({'op': 'seq', 'next_id': self.next_id()}) + "\n")
+            self._journal.flush()
+        if self.binary_snapshot:
+            covers = self._json_stat() + (self._journal.tell(), self.next_id())
+            self.bytes_written += write_snapshot(self.snapshot_path, self.tasks.values(),
+                                                 covers)
+        self.journal_ops = 0
+
+    def _journal_outgrew_json(self):
+        json_size = self._json_stat()[0]
+        return json_size < 0 or self._journal.tell() >= self.json_ratio * json_size
+
+    def close(self):
+        if self._journal is not None:
+            if self.journal_ops or self.binary_snapshot:
+                # Always leave a current tasks.json behind for other tools
+                self.compact(write_json=True)
+            self._journal.close()
+            self._journal = None
+        # Kept if saving failed, so close() can be tried again
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+
+class SqliteStore:
+    """
+    Tasks in an SQLite database with indexes on status, priority and
+    created_date. An existing tasks.json next to the database is imported
+    the first time the database is created.
+    """
+
+    COLUMNS = COLUMNS
+
+    def __init__(self, path, import_from=None, read_only=False):
+        self.path = path
+        self.import_from = import_from
+        self.read_only = read_only
+        self.conn = None
+        self._max_id = 0
+        self.load_error = None
+        self._lock = None
+
+    def load(self):
+        tasks = []
+        for chunk, _ in self.iter_load():
+            tasks.extend(chunk)
+        return tasks
+
+    def iter_load(self, chunk_size=5000):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        self.load_error = None
+        if self.read_only:
+            yield from self._iter_read_only(chunk_size)
+            return
+        if self._lock is None:
+            self._lock = lock_data_file(self.path)
+        is_new = not os.path.exists(self.path)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id INTEGER PRIMARY KEY, description TEXT NOT NULL, priority TEXT, "
+            "status TEXT, created_date TEXT, completed_date TEXT, extra TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+        for column in ('status', 'priority', 'created_date'):
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_tasks_{column} ON tasks({column})")
+        if is_new and self.import_from:
+            # Read like any tasks.json: defaults filled in, ids made unique,
+            # a damaged file quarantined with what came before it kept
+            legacy = JsonFileStore(self.import_from)
+            legacy.load()
+            self.load_error = legacy.load_error
+            if legacy.tasks:
+                self._upsert(legacy.tasks.values())
+        self.conn.commit()
+
+        yield from self._iter_rows(chunk_size)
+
+    def _iter_read_only(self, chunk_size):
+        if not os.path.exists(self.path):
+            return
+        uri = "file:" + pathname2url(os.path.abspath(self.path)) + "?mode=ro"
+        self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        yield from self._iter_rows(chunk_size)
+
+    def _iter_rows(self, chunk_size):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'max_id'").fetchone()
+        self._max_id = row[0] if row else 0
+        cursor = self.conn.execute(
+            "SELECT id, description, priority, status, created_date, "
+            "completed_date, extra FROM tasks ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            tasks = [Task(*row[:6], json.loads(row[6]) if row[6] else None) for row in rows]
+            self._max_id = max(self._max_id, max(t.id for t in tasks))
+            yield tasks, ()
+
+    def next_id(self):
+        return self._max_id + 1
+
+    def _upsert(self, tasks):
+        rows = []
+        for task in tasks:
+            extra = {k: v for k, v in task.items() if k not in self.COLUMNS}
+            rows.append(tuple(task.get(c, '') for c in self.COLUMNS)
+                        + (json.dumps(extra) if extra else None,))
+            self._max_id = max(self._max_id, task['id'])
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO tasks (id, description, priority, status, "
+            "created_date, completed_date, extra) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('max_id', ?)",
+                          (self._max_id,))
+
+    def _check_writable(self):
+        if self.read_only:
+            raise StoreLockedError(f"{self.path} is open read-only")
+
+    def put(self, *tasks):
+        self._check_writable()
+        with self.conn:
+            self._upsert(tasks)
+
+    def delete(self, *task_ids):
+        self._check_writable()
+        with self.conn:
+            self.conn.executemany("DELETE FROM tasks WHERE id = ?",
+                                  [(i,) for i in task_ids])
+
+    def replace_all(self, tasks):
+        self._check_writable()
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks")
+            self._upsert(tasks)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+
+def open_store(path, binary_snapshot=False, read_only=False):
+    """Pick a backend from the file name: *.db / *.sqlite use SQLite, anything else the journal."""
+    if path.endswith((".db", ".sqlite", ".sqlite3")):
+        legacy = os.path.splitext(path)[0] + ".json"
+        return SqliteStore(path, import_from=legacy, read_only=read_only)
+    return JournalStore(path, binary_snapshot=binary_snapshot, read_only=read_only)
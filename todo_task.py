@@ -0,0 +1,264 @@
+"""
+Compact task records for the To-Do List Manager.
+
+A Task holds the same fields as the dicts tasks.json is made of, in
+__slots__ instead of a per-task dict:
+
+- priority and status are interned, so every task shares one string
+  object per value;
+- created_date and completed_date are kept as day ordinals (plain ints)
+  when they are '%Y-%m-%d' dates, and turned back into the same strings
+  on access; anything else is kept exactly as it was written;
+- the optional due_date and reminder, and keys this version does not
+  know about, live in an `extra` dict, which is None for most tasks.
+
+That cuts the memory per task to about a third of the dict it replaces
+(see benchmarks/bench_memory.py). Task still behaves like a read/write
+mapping (task['status'], task.get(), dict(task), json via to_dict()), so
+the rest of the code and the file formats do not change.
+"""
+
+import sys
+from datetime import date
+
+# Fields with a slot of their own, in tasks.json order
+FIELDS = ('id', 'description', 'priority', 'status', 'created_date', 'completed_date')
+_FIELD_SET = frozenset(FIELDS)
+_DATE_FIELDS = {'created_date': '_created', 'completed_date': '_completed'}
+
+# '%Y-%m-%d' text <-> day ordinal, shared by every task with that date
+_ORDINALS = {}
+_DATES = {}
+
+
+def _pack_date(value):
+    """Day ordinal for a '%Y-%m-%d' string; other values are returned unchanged."""
+    ordinal = _ORDINALS.get(value)
+    if ordinal is not None:
+        return ordinal
+    if type(value) is str and len(value) == 10:
+        try:
+            day = date.fromisoformat(value)
+        except ValueError:
+            return value
+        if day.isoformat() == value:
+            ordinal = _ORDINALS[value] = day.toordinal()
+            _DATES[ordinal] = value
+            return ordinal
+    return value
+
+
+def _unpack_date(value):
+    if type(value) is int:
+        text = _DATES.get(value)
+        if text is None:
+            text = _DATES[value] = date.fromordinal(value).isoformat()
+        return text
+    return value
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Task:
+    """One task, with the dict interface the engine, stores and GUI use."""
+
+    __slots__ = ('id', 'description', 'priority', 'status', '_created', '_completed', 'extra')
+
+    def __init__(self, id, description, priority="Medium", status="Pending",
+                 created_date="", completed_date="", extra=None):
+        self.id = id
+        self.description = description
+        self.priority = _intern(priority)
+        self.status = _intern(status)
+        self.extra = extra or None
+        self._created = self._pack('created_date', created_date)
+        self._completed = self._pack('completed_date', completed_date)
+
+    def _pack(self, key, value):
+        if type(value) is str:
+            return _pack_date(value)
+        # Only str is stored in a date slot, so an int there is always an
+        # ordinal; keep odd values (numbers, null) in extra unchanged
+        if self.extra is None:
+            self.extra = {}
+        self.extra[key] = value
+        return None
+
+    @classmethod
+    def from_dict(cls, data, defaults=None):
+        """A Task from a mapping such as one element of tasks.json."""
+        if type(data) is cls:
+            return data.copy()
+        extra = {k: v for k, v in data.items() if k not in _FIELD_SET} or None
+        if defaults is None:
+            defaults = {}
+        get = data.get
+        return cls(get('id'), get('description', ''),
+                   get('priority', defaults.get('priority', '')),
+                   get('status', defaults.get('status', '')),
+                   get('created_date', defaults.get('created_date', '')),
+                   get('completed_date', defaults.get('completed_date', '')),
+                   extra)
+
+    def to_dict(self):
+        """The task as a plain dict, in tasks.json field order."""
+        created = self._created
+        completed = self._completed
+        # Every ordinal in a slot came through _pack_date, so _DATES has it
+        data = {'id': self.id, 'description': self.description,
+                'priority': self.priority, 'status': self.status,
+                'created_date': _DATES[created] if type(created) is int else created,
+                'completed_date': _DATES[completed] if type(completed) is int else completed}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def copy(self):
+        task = Task.__new__(Task)
+        task.id = self.id
+        task.description = self.description
+        task.priority = self.priority
+        task.status = self.status
+        task._created = self._created
+        task._completed = self._completed
+        task.extra = dict(self.extra) if self.extra else None
+        return task
+
+    @property
+    def created_date(self):
+        value = self._created
+        if value is None:
+            return self.extra['created_date']
+        return _unpack_date(value)
+
+    @created_date.setter
+    def created_date(self, value):
+        self._set_date('created_date', value)
+
+    @property
+    def completed_date(self):
+        value = self._completed
+        if value is None:
+            return self.extra['completed_date']
+        return _unpack_date(value)
+
+    @completed_date.setter
+    def completed_date(self, value):
+        self._set_date('completed_date', value)
+
+    # Optional fields (see todo_schedule), kept in extra: most tasks have neither
+
+    @property
+    def due_date(self):
+        return self.extra.get('due_date', '') if self.extra else ''
+
+    @due_date.setter
+    def due_date(self, value):
+        self._set_optional('due_date', value)
+
+    @property
+    def reminder(self):
+        return self.extra.get('reminder', '') if self.extra else ''
+
+    @reminder.setter
+    def reminder(self, value):
+        self._set_optional('reminder', value)
+
+    def _set_optional(self, key, value):
+        # A new dict rather than an in-place change: a store's writer
+        # thread may be serialising the task at the same moment
+        extra = dict(self.extra) if self.extra else {}
+        if value:
+            extra[key] = value
+        else:
+            extra.pop(key, None)
+        self.extra = extra or None
+
+    def _set_date(self, key, value):
+        if self.extra is not None:
+            self.extra.pop(key, None)
+        setattr(self, _DATE_FIELDS[key], self._pack(key, value))
+
+    # -- mapping interface ---------------------------------------------------
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            if key == 'priority' or key == 'status':
+                value = _intern(value)
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET or self.extra is None or key not in self.extra:
+            raise KeyError(key)
+        del self.extra[key]
+        if not self.extra:
+            self.extra = None
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    def update(self, other=(), **kwargs):
+        for key, value in dict(other, **kwargs).items():
+            self[key] = value
+
+    def __contains__(self, key):
+        return key in _FIELD_SET or (self.extra is not None and key in self.extra)
+
+    def keys(self):
+        if self.extra:
+            return list(FIELDS) + [k for k in self.extra if k not in _FIELD_SET]
+        return list(FIELDS)
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, Task):
+            other = other.to_dict()
+        elif not isinstance(other, dict):
+            return NotImplemented
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Task({self.to_dict()!r})"
+
+
+def json_default(value):
+    """default= hook for json.dump(s): writes Tasks as their dicts."""
+    if isinstance(value, Task):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,196 @@
+"""
+Optional instrumentation for the To-Do app.
+
+The hot paths (refresh, query/search, load, save) wrap their work in
+TRACER.span(name). While tracing is off a span costs one attribute check.
+While it is on, each call is recorded:
+
+- its duration goes into a per-name histogram (log-spaced millisecond
+  buckets), which gives p50/p95/max cheaply;
+- counters such as rows or bytes written are summed per name;
+- the most recent calls are kept as events for a Chrome trace file
+  (chrome://tracing or https://ui.perfetto.dev can open it).
+
+Tracing starts enabled when TODO_TRACE is set in the environment. If
+its value ends in .json, the trace is also written there on exit:
+
+    TODO_TRACE=1 python task1.py
+    TODO_TRACE=/tmp/todo-trace.json python task1.py
+
+The GUI can also switch it on and off from the Debug menu.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+TRACE_ENV = "TODO_TRACE"
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Events kept for the trace file; older ones are dropped first
+MAX_EVENTS = 100000
+
+
+class Histogram:
+    """Call durations in fixed millisecond buckets."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                break
+        else:
+            i = len(BUCKETS_MS)
+        self.counts[i] += 1
+        self.calls += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls (at most the max)."""
+        if not self.calls:
+            return 0.0
+        wanted = fraction * self.calls
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= wanted:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def set(self, **counters):
+        """Attach counters (rows, bytes, ...) known only once the work is done."""
+        self.args.update(counters)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.start, time.perf_counter() - self.start, self.args)
+
+
+class _NullSpan:
+    """Stand-in used while tracing is off."""
+
+    __slots__ = ()
+
+    def set(self, **counters):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Collects span timings from any thread."""
+
+    def __init__(self, enabled=False, export_path=None):
+        self.enabled = enabled
+        self.export_path = export_path
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self.reset()
+
+    @classmethod
+    def from_env(cls):
+        value = os.environ.get(TRACE_ENV, "")
+        if not value or value == "0":
+            return cls()
+        return cls(True, value if value.endswith(".json") else None)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+            self.events = deque(maxlen=MAX_EVENTS)
+
+    def enable(self, on=True):
+        self.enabled = on
+
+    def span(self, name, **counters):
+        """Context manager timing a block: with TRACER.span("save") as span: ..."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, counters)
+
+    def record(self, name, start, seconds, counters=None):
+        """Record one call that started at perf_counter() value start."""
+        ms = seconds * 1000
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(ms)
+            if counters:
+                totals = self.counters.setdefault(name, {})
+                for key, value in counters.items():
+                    totals[key] = totals.get(key, 0) + value
+            self.events.append((name, start, seconds, threading.get_ident(),
+                                dict(counters) if counters else None))
+
+    def summary(self):
+        """Per-name stats: calls, p50/p95/max in ms and summed counters."""
+        with self._lock:
+            return {name: {'calls': h.calls,
+                           'p50_ms': h.percentile(0.5),
+                           'p95_ms': h.percentile(0.95),
+                           'max_ms': h.max_ms,
+                           'mean_ms': h.total_ms / h.calls,
+                           **self.counters.get(name, {})}
+                    for name, h in self.histograms.items()}
+
+    def overlay_text(self, names=("refresh", "query", "save", "load")):
+        """One line for the GUI, e.g. 'refresh p95 ≤5ms ×120 · save p95 ≤25ms ×4'."""
+        summary = self.summary()
+        parts = []
+        for name in names:
+            stats = summary.get(name)
+            if stats:
+                parts.append(f"{name} p95 ≤{stats['p95_ms']:g}ms ×{stats['calls']}")
+        return " · ".join(parts) if parts else "⏱ no samples yet"
+
+    def export(self, path=None):
+        """Write the recorded events as a Chrome trace JSON file. Returns the path."""
+        path = path or self.export_path
+        if not path:
+            raise ValueError("no trace file given")
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+        trace = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                  'ts': (start - self._origin) * 1e6, 'dur': seconds * 1e6,
+                  'args': args or {}}
+                 for name, start, seconds, tid, args in events]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms',
+                       'otherData': {'summary': self.summary()}}, f)
+        return path
+
+
+TRACER = Tracer.from_env()